@@ -0,0 +1,108 @@
+"""
+Analytics shared by the dashboard (app.py) and the API (getahome/src/app.py)
+
+Every query is pure: it never modifies the frame it reads and returns a
+new (read-only by convention) result. An ``Analytics`` instance wraps one
+immutable data version, so its queries are memoized on their arguments;
+``Snapshot.analytics`` gives each data version its own instance.
+
+Changes are computed per (Area, Rooms) series, never across rows of
+different series: an area's change compares the mean of its series'
+first prices with the mean of their last prices over the same set of
+series.
+"""
+from functools import lru_cache
+
+import pandas as pd
+
+from metrics import SERIES_KEYS
+
+
+def select(df, areas=None, rooms=None, start=None, end=None, districts=None, districts_only=False):
+    """Rows of ``df`` matching every given filter (``start`` / ``end`` are inclusive dates)."""
+    mask = pd.Series(True, index=df.index)
+    if areas:
+        mask &= df['Area'].isin(list(areas))
+    if rooms:
+        mask &= df['Rooms'].isin([rooms] if isinstance(rooms, str) else list(rooms))
+    if start is not None:
+        mask &= df['Quarter_ts'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df['Quarter_ts'] <= pd.Timestamp(end)
+    if districts:
+        mask &= df['District'].isin(list(districts))
+    if districts_only:
+        mask &= df['Is_District']
+    return df[mask]
+
+
+def series_changes(df):
+    """First and last price of each series in ``df`` and the change between them."""
+    ordered = df.sort_values('Quarter_ts')
+    grouped = ordered.groupby(SERIES_KEYS, observed=True)
+    out = pd.DataFrame({
+        'Quarters': grouped.size(),
+        # round(6) drops the float32 noise of compact frames (prices have 2 decimals)
+        'Earliest Price': grouped['Average Price'].first().astype(float).round(6),
+        'Latest Price': grouped['Average Price'].last().astype(float).round(6),
+    })
+    out = out[out['Quarters'] >= 2]
+    out['Change %'] = (out['Latest Price'] / out['Earliest Price'] - 1) * 100
+    return out.reset_index()
+
+
+def area_changes(df):
+    """Change per area over the series of ``df``, with the count of anomalous quarters."""
+    series = series_changes(df)
+    changes = series.groupby('Area', observed=True)[['Earliest Price', 'Latest Price']].mean()
+    changes['Change %'] = (changes['Latest Price'] / changes['Earliest Price'] - 1) * 100
+    if 'Anomaly' in df.columns:
+        flagged = df[df['Anomaly']].groupby('Area', observed=True).size()
+        changes['Noisy Quarters'] = flagged.reindex(changes.index, fill_value=0).astype(int)
+    changes = changes.reset_index()
+    changes['Area'] = changes['Area'].astype(str)
+    return changes.sort_values('Change %', ascending=False, ignore_index=True)
+
+
+def rank(changes, n=10, ascending=False, exclude_noisy=False):
+    """Top ``n`` rows of ``area_changes`` (gainers, or losers with ``ascending=True``)."""
+    if exclude_noisy and 'Noisy Quarters' in changes.columns:
+        changes = changes[changes['Noisy Quarters'] == 0]
+    return changes.sort_values('Change %', ascending=ascending).head(n).reset_index(drop=True)
+
+
+def latest(df):
+    """Rows of the latest quarter present in ``df``."""
+    return df[df['Quarter_ts'] == df['Quarter_ts'].max()]
+
+
+class Analytics:
+    """Memoized queries over one immutable data version.
+
+    Arguments must be hashable: pass tuples, not lists, for ``areas`` and
+    ``districts``. Cached frames are shared, callers must not modify them.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.select = lru_cache(maxsize=128)(self._select)
+        self.area_changes = lru_cache(maxsize=64)(self._area_changes)
+
+    def _select(self, areas=None, rooms=None, start=None, end=None, districts=None, districts_only=False):
+        return select(self.df, areas, rooms, start, end, districts, districts_only)
+
+    def _area_changes(self, **filters):
+        return area_changes(self.select(**filters))
+
+    def top_gainers(self, n=10, exclude_noisy=False, **filters):
+        return rank(self.area_changes(**filters), n, ascending=False, exclude_noisy=exclude_noisy)
+
+    def top_losers(self, n=10, exclude_noisy=False, **filters):
+        return rank(self.area_changes(**filters), n, ascending=True, exclude_noisy=exclude_noisy)
+
+    def yoy(self, area, rooms='All'):
+        """Latest YoY % of a series (None when unknown or without a year of history)."""
+        rows = latest(self.select(areas=(area,), rooms=rooms))
+        if rows.empty or pd.isna(rows['YoY %'].iloc[0]):
+            return None
+        return float(rows['YoY %'].iloc[0])
@@ -0,0 +1,101 @@
+"""
+Vectorized detection of implausible quarterly price moves
+
+Small cities publish averages over few transactions, so some quarters jump
+for reasons unrelated to the market. Two robust scores are computed over
+the whole dataset at once (median / MAD instead of mean / std, so the
+outliers do not mask themselves):
+
+- ``QoQ z``: how unusual the QoQ return is for the series' own history
+- ``District Dev z``: how far the QoQ return is from the median return of
+  the other series in the same district, room type and quarter
+
+A point is flagged in ``Anomaly`` when its move is extreme for the series
+and not shared by its district peers.
+"""
+import numpy as np
+import pandas as pd
+
+from metrics import SERIES_KEYS
+
+ANOMALY_COLUMNS = ['QoQ z', 'District Dev z', 'Anomaly']
+
+# Scales the MAD to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+
+# Below this many peers the district median says nothing
+MIN_PEERS = 3
+
+
+def robust_z(values, groups):
+    """Robust z-score of ``values`` within each group (NaN where the MAD is zero)."""
+    grouped = values.groupby(groups, sort=False)
+    median = grouped.transform('median')
+    deviation = (values - median).abs()
+    mad = deviation.groupby(groups, sort=False).transform('median') * MAD_SCALE
+    return (values - median) / mad.replace(0, np.nan)
+
+
+def leave_one_out_median(values, groups):
+    """Median of the other values of each value's group (NaN values and keys are skipped).
+
+    Sorted once, then picks the middle of each group with the value's own
+    rank taken out, so a jump does not pull its own reference towards it.
+    NaN where there is no other value.
+    """
+    codes = values.groupby(groups, sort=False).ngroup()  # NaN for missing keys
+    valid = (values.notna() & codes.notna()).to_numpy()
+    codes = codes.to_numpy()[valid].astype(np.int64)
+    order = np.lexsort((values.to_numpy(dtype=float)[valid], codes))
+    ordered, codes = values.to_numpy(dtype=float)[valid][order], codes[order]
+
+    sizes = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))[codes]
+    rank = np.arange(len(ordered)) - starts
+    others = sizes[codes] - 1
+
+    def other(k):
+        # k-th smallest of the group once the value itself is removed
+        k = np.clip(k, 0, np.maximum(others - 1, 0))
+        return ordered[np.minimum(starts + k + (k >= rank), len(ordered) - 1)]
+
+    low, high = other((others - 1) // 2), other(others // 2)
+    median = np.where(others > 0, (low + high) / 2, np.nan)
+
+    result = np.full(len(values), np.nan)
+    result[np.flatnonzero(valid)[order]] = median
+    return pd.Series(result, index=values.index)
+
+
+def compute_anomalies(df, threshold=3.5):
+    """Return the anomaly columns aligned on ``df`` (which needs ``QoQ %``)."""
+    returns = df['QoQ %']
+    series_z = robust_z(returns, [df[k] for k in SERIES_KEYS])
+
+    peers = [df['District'], df['Rooms'], df['Quarter_ts']]
+    peer_median = leave_one_out_median(returns, peers)
+    peer_count = returns.groupby(peers, sort=False).transform('count')
+    deviation = (returns - peer_median).where(peer_count >= MIN_PEERS)
+    district_z = robust_z(deviation, df['Rooms'])
+
+    # Without enough peers only the series' own history is used
+    off_peers = (district_z.abs() > threshold) | district_z.isna()
+    anomaly = (series_z.abs() > threshold) & off_peers
+
+    return pd.DataFrame({
+        'QoQ z': series_z,
+        'District Dev z': district_z,
+        'Anomaly': anomaly.fillna(False).astype(bool),
+    }, index=df.index)
+
+
+def add_anomaly_flags(df, threshold=3.5):
+    """Return a copy of ``df`` with the anomaly columns appended."""
+    out = df.drop(columns=[c for c in ANOMALY_COLUMNS if c in df.columns])
+    return out.join(compute_anomalies(out, threshold))
+
+
+def noisy_series(df):
+    """(Area, Rooms) pairs with at least one flagged quarter in ``df``."""
+    flagged = df.loc[df['Anomaly'], SERIES_KEYS].drop_duplicates()
+    return pd.MultiIndex.from_frame(flagged)
@@ -2,8 +2,19 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import os
 from datetime import datetime
 
+import currency
+import monte_carlo
+import yields
+from analytics import Analytics, latest, rank
+from anomalies import add_anomaly_flags, noisy_series
+from data_store import DataStore
+from housing_data import compact, data_version
+from metrics import add_derived_metrics
+from revisions import ReleaseStore
+
 # Page config
 st.set_page_config(page_title="GetAHome - Housing Market Analysis", layout="wide", page_icon="🏠")
 
@@ -180,31 +191,45 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load data
+# Load data: one store per process, reloaded in the background when the data file changes
+@st.cache_resource
+def get_data_store():
+    return DataStore().start()
+
+@st.cache_resource
+def load_release(release):
+    return currency.Converter(Analytics(compact(add_anomaly_flags(add_derived_metrics(ReleaseStore().as_of(release))))))
+
 @st.cache_data
-def load_data():
-    df = pd.read_excel('data_housing_unpivoted.xlsx')
-    # Check if Quarter_ts exists, if not create it
-    if 'Quarter_ts' not in df.columns:
-        df['Quarter_ts'] = pd.PeriodIndex(
-            year=df['Year'], 
-            quarter=df['Quarter'].str[0].astype(int), 
-            freq='Q'
-        ).to_timestamp()
-    else:
-        df['Quarter_ts'] = pd.to_datetime(df['Quarter_ts'])
-    
-    # Ensure Is_District column exists
-    if 'Is_District' not in df.columns:
-        df['Is_District'] = df['Area'].str.contains("District", case=False, na=False)
-    
-    # Ensure District column exists
-    if 'District' not in df.columns:
-        df['District'] = ''
-    
-    return df
+def load_yields(version):
+    return yields.load_published()
 
-df = load_data()
+snapshot = get_data_store().current()
+converter = snapshot.converter
+
+# Optionally show the data exactly as CBS published it on an earlier release
+releases = ReleaseStore().releases()
+if releases:
+    published_on = st.sidebar.selectbox(
+        "Data as published on",
+        options=["Latest"] + releases[::-1],
+        help="CBS revises recent quarters; pick a release date to see the numbers as they were then"
+    )
+    if published_on != "Latest":
+        converter = load_release(published_on)
+
+# Optionally show prices in another currency, at 3-month average rates (see currency.py)
+display_currency = currency.BASE
+display_currencies = currency.currencies()
+if len(display_currencies) > 1:
+    display_currency = st.sidebar.selectbox(
+        "Display currency",
+        options=display_currencies,
+        help="Prices are converted with the average exchange rate of each quarter's 3 months"
+    )
+analytics = converter.analytics(display_currency)
+df = analytics.df
+symbol = currency.SYMBOLS.get(display_currency, f"{display_currency} ")
 
 # Header with professional styling
 col1, col2 = st.columns([3, 1])
@@ -258,32 +283,108 @@ with lookup_col3:
             quarter_str = lookup_data['Quarter'].iloc[0]
             year_str = lookup_data['Year'].iloc[0]
             
-            # Calculate YoY change if available
-            year_ago = latest_quarter - pd.DateOffset(years=1)
-            prev_data = df[
-                (df['Area'] == lookup_city) & 
-                (df['Rooms'] == lookup_rooms) & 
-                (df['Quarter_ts'] == year_ago)
-            ]
+            change = analytics.yoy(lookup_city, lookup_rooms)
             
             st.markdown("<br>", unsafe_allow_html=True)
-            if not prev_data.empty:
-                prev_price = prev_data['Average Price'].iloc[0]
-                change = ((price - prev_price) / prev_price) * 100
+            if change is not None:
                 st.metric(
                     label=f"Average Price ({quarter_str} {year_str})",
-                    value=f"₪{price*1000:,.0f}K",
+                    value=f"{symbol}{price*1000:,.0f}K",
                     delta=f"{change:+.1f}% YoY"
                 )
             else:
                 st.metric(
                     label=f"Average Price ({quarter_str} {year_str})",
-                    value=f"₪{price*1000:,.0f}K"
+                    value=f"{symbol}{price*1000:,.0f}K"
                 )
         else:
             st.markdown("<br>", unsafe_allow_html=True)
             st.warning("⚠️ No data available for this combination")
 
+# Areas with the most similar price trajectory to the looked-up city
+if lookup_city and lookup_rooms:
+    similar = snapshot['similarity']['correlation'].top_k(lookup_city, lookup_rooms, k=5)
+    with st.expander(f"🧭 Areas that move like {lookup_city}"):
+        if similar.empty:
+            st.info("Not enough history to compare this series")
+        else:
+            st.dataframe(
+                similar[['Area', 'Similarity']].style.format({'Similarity': '{:.2f}'}),
+                hide_index=True,
+                width='stretch'
+            )
+            st.caption("Correlation of quarterly price changes for the same room size")
+
+    # Simulated price paths (block bootstrap of this series' quarterly returns)
+    fan = snapshot['fan']
+    fan = fan[(fan['Area'] == lookup_city) & (fan['Rooms'] == lookup_rooms) & (fan['Measure'] == 'Price')]
+    with st.expander(f"🔮 Price outlook for {lookup_city} - {lookup_rooms}"):
+        if fan.empty:
+            st.info("Not enough history to simulate this series")
+        else:
+            # The simulation is in NIS, so is the history next to it
+            nis = converter.base.df
+            history = nis[(nis['Area'] == lookup_city) & (nis['Rooms'] == lookup_rooms)].sort_values('Quarter_ts')
+            last_ts = history['Quarter_ts'].max()
+            future_ts = [last_ts + pd.DateOffset(months=3 * q) for q in fan['Quarters Ahead']]
+            
+            fig_fan = go.Figure()
+            for low, high, fill in (('P5', 'P95', 'rgba(17, 109, 255, 0.12)'), ('P25', 'P75', 'rgba(17, 109, 255, 0.25)')):
+                fig_fan.add_trace(go.Scatter(x=future_ts, y=fan[high], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+                fig_fan.add_trace(go.Scatter(x=future_ts, y=fan[low], line=dict(width=0), fill='tonexty',
+                                             fillcolor=fill, name=f'{low}-{high}'))
+            fig_fan.add_trace(go.Scatter(x=history['Quarter_ts'], y=history['Average Price'], name='History',
+                                         line=dict(color='#000000', width=2)))
+            fig_fan.add_trace(go.Scatter(x=future_ts, y=fan['P50'], name='Median path',
+                                         line=dict(color='#116DFF', width=3, dash='dash')))
+            fig_fan.update_layout(
+                height=400,
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(family="Arial, Helvetica, sans-serif", size=12),
+                xaxis=dict(gridcolor='#F5F5F5'),
+                yaxis=dict(gridcolor='#F5F5F5', title='Average Price (₪ Millions)'),
+                margin=dict(l=60, r=20, t=20, b=40)
+            )
+            st.plotly_chart(fig_fan, width='stretch')
+            
+            summary = monte_carlo.horizon_summary(snapshot['fan'], lookup_city, lookup_rooms)
+            st.dataframe(
+                summary.style.format({col: '₪{:,.2f}M' for col in monte_carlo.QUANTILE_COLUMNS}),
+                hide_index=True,
+                width='stretch'
+            )
+            st.caption("Percentiles of 5,000 simulated paths; all-in cost adds purchase tax and fees for a primary residence")
+
+    # The city's district: the other cities in it, and the district next to the national figures
+    rollups = snapshot['rollups']
+    district = rollups.up(lookup_city)
+    if district and district != 'Israel':
+        with st.expander(f"🏘️ {lookup_city} in the {district}"):
+            members = rollups.down(district, lookup_rooms)
+            if members.empty:
+                st.info("No city data for this room size")
+            else:
+                members['Area'] = members['Area'].where(members['Area'] != lookup_city, '➡️ ' + lookup_city)
+                st.dataframe(
+                    members[['Area', 'Average Price']].sort_values('Average Price', ascending=False)
+                    .style.format({'Average Price': '₪{:,.2f}M'}),
+                    hide_index=True,
+                    width='stretch'
+                )
+            levels = pd.DataFrame({
+                name: rollups.series(name, lookup_rooms).iloc[-1]
+                for name in (district, rollups.up(district))
+                if not rollups.series(name, lookup_rooms).empty
+            }).T
+            if not levels.empty:
+                st.dataframe(
+                    levels[['Published', 'Mean', 'Median', 'Min', 'Max', 'Cities']].style.format(
+                        {col: '₪{:,.2f}M' for col in ['Published', 'Mean', 'Median', 'Min', 'Max']}),
+                    width='stretch'
+                )
+                st.caption("Published: CBS figure for the whole district or country; the other columns summarize its cities")
+
 st.markdown("---")
 
 # Sidebar filters
@@ -300,20 +401,17 @@ time_period = st.sidebar.selectbox(
 )
 
 # Calculate date range based on selection
+# Every filter goes through analytics.select, memoized per data version (arguments must be hashable)
+filters = {}
 if time_period == "Last Quarter":
-    start_date = max_date - pd.DateOffset(months=3)
-    df_filtered = df[df['Quarter_ts'] >= start_date]
+    filters['start'] = max_date - pd.DateOffset(months=3)
 elif time_period == "YTD":
-    start_date = pd.Timestamp(f"{max_date.year}-01-01")
-    df_filtered = df[df['Quarter_ts'] >= start_date]
+    filters['start'] = pd.Timestamp(f"{max_date.year}-01-01")
 elif time_period == "Last Year":
-    start_date = max_date - pd.DateOffset(years=1)
-    df_filtered = df[df['Quarter_ts'] >= start_date]
+    filters['start'] = max_date - pd.DateOffset(years=1)
 elif time_period == "Last 5 Years":
-    start_date = max_date - pd.DateOffset(years=5)
-    df_filtered = df[df['Quarter_ts'] >= start_date]
-else:  # All Time
-    df_filtered = df
+    filters['start'] = max_date - pd.DateOffset(years=5)
+df_filtered = analytics.select(**filters)
 
 # District filter (if District column has values)
 if 'District' in df_filtered.columns:
@@ -330,7 +428,8 @@ if 'District' in df_filtered.columns:
             help="Filter by district (cities will be filtered accordingly)"
         )
         if selected_districts:
-            df_filtered = df_filtered[df_filtered['District'].isin(selected_districts)]
+            filters['districts'] = tuple(selected_districts)
+            df_filtered = analytics.select(**filters)
 
 # District filter
 if 'Is_District' in df.columns:
@@ -341,7 +440,8 @@ if 'Is_District' in df.columns:
     )
     
     if show_districts_only:
-        df_filtered = df_filtered[df_filtered['Is_District'] == True]
+        filters['districts_only'] = True
+        df_filtered = analytics.select(**filters)
         st.sidebar.info(f"Showing {len(df_filtered['Area'].unique())} districts")
 else:
     st.sidebar.warning("Is_District column not found. Please regenerate data.")
@@ -365,9 +465,231 @@ selected_room = st.sidebar.selectbox(
 
 # Apply filters
 if selected_areas:
-    df_filtered = df_filtered[df_filtered['Area'].isin(selected_areas)]
+    filters['areas'] = tuple(selected_areas)
 if selected_room:
-    df_filtered = df_filtered[df_filtered['Rooms'] == selected_room]
+    filters['rooms'] = selected_room
+df_filtered = analytics.select(**filters)
+
+# Analysis sections: only the selected one runs. As fragments (Streamlit >= 1.33), a widget
+# inside a section (e.g. the sort order) reruns that section alone, not the whole page
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda f: f)
+
+@fragment
+def area_comparison(filters):
+    st.subheader("Area Comparison")
+    df_filtered = analytics.select(**filters)
+    
+    # Latest prices by area
+    latest_prices = latest(df_filtered)
+    avg_by_area = latest_prices.groupby('Area', observed=True)['Average Price'].mean().sort_values(ascending=False).reset_index()
+    
+    fig3 = px.bar(avg_by_area, 
+                 x='Area', 
+                 y='Average Price',
+                 title='Latest Average Prices by Area',
+                 labels={'Average Price': f'Average Price ({symbol} Thousands)'},
+                 color='Average Price',
+                 color_continuous_scale=[[0, '#E3F2FD'], [0.5, '#116DFF'], [1, '#0D5DD6']])
+    
+    fig3.update_layout(
+        height=500,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Arial, Helvetica, sans-serif", size=13),
+        xaxis=dict(gridcolor='#F5F5F5', tickangle=-45, title_font=dict(size=14, color='#5F6360')),
+        yaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=14, color='#5F6360')),
+        title_font=dict(size=18, color='#000000', family="Arial, Helvetica, sans-serif"),
+        showlegend=False
+    )
+    fig3.update_traces(marker_line_color='#E0E0E0', marker_line_width=1)
+    st.plotly_chart(fig3, width='stretch')
+
+@fragment
+def gainers_losers(filters):
+    st.subheader("Top Gainers and Losers")
+    
+    # Change per area over the selected series (see analytics.py)
+    df_filtered = analytics.select(**filters)
+    changes = analytics.area_changes(**filters)
+
+    # Areas whose selected series contain implausible quarterly jumps
+    noisy = noisy_series(df_filtered)
+    exclude_noisy = st.checkbox(
+        "Exclude areas with anomalous quarters",
+        value=False,
+        help="Quarters whose move is extreme for the series and not shared by the rest of its district"
+    )
+    if exclude_noisy:
+        changes = changes[changes['Noisy Quarters'] == 0]
+    elif len(noisy):
+        st.caption(f"⚠️ {len(noisy)} series in the selection have anomalous quarters; "
+                   "their areas are marked in the tables below")
+    changes = changes.assign(**{'Area Label': changes['Area'].where(changes['Noisy Quarters'] == 0, changes['Area'] + ' ⚠️')})
+
+    col_g, col_l = st.columns(2)
+    
+    with col_g:
+        st.markdown("### 🚀 Top 10 Gainers")
+        top_gainers = rank(changes, 10)
+        
+        fig5 = px.bar(top_gainers, 
+                     x='Area', 
+                     y='Change %',
+                     title='Areas with Highest Price Growth',
+                     labels={'Change %': 'Price Change (%)'},
+                     color='Change %',
+                     color_continuous_scale=[[0, '#C8E6C9'], [0.5, '#4CAF50'], [1, '#2E7D32']])
+        
+        fig5.update_layout(
+            height=450,
+            xaxis_tickangle=-45,
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(family="Arial, Helvetica, sans-serif", size=12),
+            xaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=13)),
+            yaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=13)),
+            title_font=dict(size=16, color='#000000'),
+            showlegend=False
+        )
+        fig5.update_traces(marker_line_color='#E0E0E0', marker_line_width=1)
+        st.plotly_chart(fig5, width='stretch')
+        
+        st.dataframe(
+            top_gainers[['Area Label', 'Change %', 'Earliest Price', 'Latest Price', 'Noisy Quarters']]
+            .rename(columns={'Area Label': 'Area'}).style.format({
+                'Change %': '{:.2f}%',
+                'Earliest Price': symbol + '{:,.0f}K',
+                'Latest Price': symbol + '{:,.0f}K'
+            }).background_gradient(subset=['Change %'], cmap='Greens'),
+            hide_index=True,
+            width='stretch'
+        )
+    
+    with col_l:
+        st.markdown("### 📉 Top 10 Losers")
+        top_losers = rank(changes, 10, ascending=True)
+        
+        fig6 = px.bar(top_losers, 
+                     x='Area', 
+                     y='Change %',
+                     title='Areas with Lowest Price Growth',
+                     labels={'Change %': 'Price Change (%)'},
+                     color='Change %',
+                     color_continuous_scale=[[0, '#EF5350'], [0.5, '#E57373'], [1, '#FFCDD2']])
+        
+        fig6.update_layout(
+            height=450,
+            xaxis_tickangle=-45,
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(family="Arial, Helvetica, sans-serif", size=12),
+            xaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=13)),
+            yaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=13)),
+            title_font=dict(size=16, color='#000000'),
+            showlegend=False
+        )
+        fig6.update_traces(marker_line_color='#E0E0E0', marker_line_width=1)
+        st.plotly_chart(fig6, width='stretch')
+        
+        st.dataframe(
+            top_losers[['Area Label', 'Change %', 'Earliest Price', 'Latest Price', 'Noisy Quarters']]
+            .rename(columns={'Area Label': 'Area'}).style.format({
+                'Change %': '{:.2f}%',
+                'Earliest Price': symbol + '{:,.0f}K',
+                'Latest Price': symbol + '{:,.0f}K'
+            }).background_gradient(subset=['Change %'], cmap='Reds_r'),
+            hide_index=True,
+            width='stretch'
+        )
+
+@fragment
+def detailed_data(filters):
+    st.subheader("Detailed Data Table")
+    df_filtered = analytics.select(**filters)
+    
+    # Display options
+    show_all = st.checkbox("Show all columns", value=False)
+    
+    if show_all:
+        display_df = df_filtered
+    else:
+        display_df = df_filtered[['Area', 'Rooms', 'Year', 'Quarter', 'Average Price', 'Quarter_ts']]
+    
+    # Sort options
+    sort_col = st.selectbox("Sort by", options=display_df.columns.tolist())
+    sort_order = st.radio("Order", options=['Ascending', 'Descending'], horizontal=True)
+    
+    display_df_sorted = display_df.sort_values(
+        sort_col, 
+        ascending=(sort_order == 'Ascending')
+    )
+    
+    st.dataframe(
+        display_df_sorted.style.format({
+            'Average Price': symbol + '{:,.0f}'
+        }),
+        width='stretch',
+        height=400
+    )
+    
+    # Download button
+    csv = display_df_sorted.to_csv(index=False).encode('utf-8')
+    st.download_button(
+        label="📥 Download filtered data as CSV",
+        data=csv,
+        file_name='housing_data_filtered.csv',
+        mime='text/csv'
+    )
+
+@fragment
+def rental_yields(filters):
+    st.subheader("Gross Rental Yields")
+    st.caption("Twelve median monthly rents over the median asking price of the yad2 listings, "
+               "and over the latest CBS transaction price (see yields.py)")
+    report = load_yields(data_version(yields.YIELDS_FILE))
+    if filters.get('areas'):
+        report = report[report['Area'].str.lower().isin([a.lower() for a in filters['areas']])]
+    if filters.get('rooms'):
+        report = report[report['Rooms'] == filters['rooms']]
+    if report.empty:
+        st.info("No published yields for the selected areas and room type.")
+        return
+
+    fig = px.bar(report, x='Area', y='Gross Yield %', color='Rooms', barmode='group',
+                 title='Gross Rental Yield by Area',
+                 labels={'Gross Yield %': 'Gross Yield (%)'},
+                 color_discrete_sequence=['#116DFF', '#00B894', '#FF6B6B', '#6C5CE7', '#FDCB6E', '#74B9FF'])
+    fig.update_layout(
+        height=450,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Arial, Helvetica, sans-serif", size=12),
+        xaxis=dict(gridcolor='#F5F5F5', tickangle=-45),
+        yaxis=dict(gridcolor='#F5F5F5'),
+        title_font=dict(size=16, color='#000000')
+    )
+    st.plotly_chart(fig, width='stretch')
+
+    st.dataframe(
+        report.drop(columns='CBS Quarter', errors='ignore').style.format({
+            'Median Asking': '₪{:,.0f}',
+            'Median Rent': '₪{:,.0f}',
+            'CBS Price': '₪{:,.0f}',
+            'Gross Yield %': '{:.2f}%',
+            'CBS Yield %': '{:.2f}%'
+        }, na_rep='-'),
+        hide_index=True,
+        width='stretch'
+    )
+
+SECTIONS = {
+    "🔄 Area Comparison": area_comparison,
+    "🏆 Top Gainers/Losers": gainers_losers,
+    "📊 Detailed Data": detailed_data,
+}
+# Rental yields appear once a sale and a rent crawl have been published (python yields.py)
+if os.path.exists(yields.YIELDS_FILE):
+    SECTIONS["💸 Rental Yields"] = rental_yields
 
 # Main content
 if df_filtered.empty:
@@ -378,7 +700,7 @@ else:
     
     with col1:
         latest_avg = df_filtered[df_filtered['Quarter_ts'] == df_filtered['Quarter_ts'].max()]['Average Price'].mean()
-        st.metric("Latest Avg Price", f"₪{latest_avg:,.0f}" if pd.notna(latest_avg) else "N/A")
+        st.metric("Latest Avg Price", f"{symbol}{latest_avg:,.0f}" if pd.notna(latest_avg) else "N/A")
     
     with col2:
         earliest_avg = df_filtered[df_filtered['Quarter_ts'] == df_filtered['Quarter_ts'].min()]['Average Price'].mean()
@@ -400,10 +722,11 @@ else:
     st.subheader("📈 Housing Price Trends")
     
     # Create a combined identifier for each unique combination of Area and Rooms
-    df_filtered['Series'] = df_filtered['Area'] + ' - ' + df_filtered['Rooms']
+    # assign() works on a copy: the frame is shared with every other session
+    df_filtered = df_filtered.assign(Series=df_filtered['Area'].astype(str) + ' - ' + df_filtered['Rooms'].astype(str))
     
     # Group by quarter and series
-    trend_data = df_filtered.groupby(['Quarter_ts', 'Series', 'Area', 'Rooms'])['Average Price'].mean().reset_index()
+    trend_data = df_filtered.groupby(['Quarter_ts', 'Series', 'Area', 'Rooms'], observed=True)['Average Price'].mean().reset_index()
     
     # Professional color palette
     colors = ['#116DFF', '#0D5DD6', '#00B894', '#FF6B6B', '#4ECDC4', 
@@ -415,7 +738,7 @@ else:
                  y='Average Price', 
                  color='Series',
                  title=f'Housing Prices Over Time: {len(selected_areas)} Area(s) × {selected_room}',
-                 labels={'Quarter_ts': 'Quarter', 'Average Price': 'Average Price (₪ Thousands)', 'Series': 'Location - Room Size'},
+                 labels={'Quarter_ts': 'Quarter', 'Average Price': f'Average Price ({symbol} Thousands)', 'Series': 'Location - Room Size'},
                  markers=True,
                  color_discrete_sequence=colors)
     
@@ -457,172 +780,13 @@ else:
         ),
         margin=dict(l=60, r=200, t=80, b=60)
     )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, width='stretch')
     
     st.markdown("---")
     
-    # Secondary tabs for detailed analysis
-    tab1, tab2, tab3 = st.tabs(["🔄 Area Comparison", "🏆 Top Gainers/Losers", "📊 Detailed Data"])
-    
-    with tab1:
-        st.subheader("Area Comparison")
-        
-        # Latest prices by area
-        latest_prices = df_filtered[df_filtered['Quarter_ts'] == df_filtered['Quarter_ts'].max()]
-        avg_by_area = latest_prices.groupby('Area')['Average Price'].mean().sort_values(ascending=False).reset_index()
-        
-        fig3 = px.bar(avg_by_area, 
-                     x='Area', 
-                     y='Average Price',
-                     title='Latest Average Prices by Area',
-                     labels={'Average Price': 'Average Price (₪ Thousands)'},
-                     color='Average Price',
-                     color_continuous_scale=[[0, '#E3F2FD'], [0.5, '#116DFF'], [1, '#0D5DD6']])
-        
-        fig3.update_layout(
-            height=500,
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(family="Arial, Helvetica, sans-serif", size=13),
-            xaxis=dict(gridcolor='#F5F5F5', tickangle=-45, title_font=dict(size=14, color='#5F6360')),
-            yaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=14, color='#5F6360')),
-            title_font=dict(size=18, color='#000000', family="Arial, Helvetica, sans-serif"),
-            showlegend=False
-        )
-        fig3.update_traces(marker_line_color='#E0E0E0', marker_line_width=1)
-        st.plotly_chart(fig3, use_container_width=True)
-    
-    with tab2:
-        st.subheader("Top Gainers and Losers")
-        
-        # Calculate percentage change for each area
-        def calculate_change(group):
-            if len(group) < 2:
-                return pd.Series({'Change %': None})
-            earliest = group[group['Quarter_ts'] == group['Quarter_ts'].min()]['Average Price'].mean()
-            latest = group[group['Quarter_ts'] == group['Quarter_ts'].max()]['Average Price'].mean()
-            if pd.notna(earliest) and pd.notna(latest) and earliest != 0:
-                change_pct = ((latest - earliest) / earliest) * 100
-                return pd.Series({
-                    'Change %': change_pct,
-                    'Earliest Price': earliest,
-                    'Latest Price': latest
-                })
-            return pd.Series({'Change %': None, 'Earliest Price': None, 'Latest Price': None})
-        
-        changes = df_filtered.groupby('Area').apply(calculate_change).reset_index()
-        changes = changes.dropna(subset=['Change %']).sort_values('Change %', ascending=False)
-        
-        col_g, col_l = st.columns(2)
-        
-        with col_g:
-            st.markdown("### 🚀 Top 10 Gainers")
-            top_gainers = changes.head(10)
-            
-            fig5 = px.bar(top_gainers, 
-                         x='Area', 
-                         y='Change %',
-                         title='Areas with Highest Price Growth',
-                         labels={'Change %': 'Price Change (%)'},
-                         color='Change %',
-                         color_continuous_scale=[[0, '#C8E6C9'], [0.5, '#4CAF50'], [1, '#2E7D32']])
-            
-            fig5.update_layout(
-                height=450,
-                xaxis_tickangle=-45,
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(family="Arial, Helvetica, sans-serif", size=12),
-                xaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=13)),
-                yaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=13)),
-                title_font=dict(size=16, color='#000000'),
-                showlegend=False
-            )
-            fig5.update_traces(marker_line_color='#E0E0E0', marker_line_width=1)
-            st.plotly_chart(fig5, use_container_width=True)
-            
-            st.dataframe(
-                top_gainers[['Area', 'Change %', 'Earliest Price', 'Latest Price']].style.format({
-                    'Change %': '{:.2f}%',
-                    'Earliest Price': '₪{:,.0f}K',
-                    'Latest Price': '₪{:,.0f}K'
-                }).background_gradient(subset=['Change %'], cmap='Greens'),
-                hide_index=True,
-                use_container_width=True
-            )
-        
-        with col_l:
-            st.markdown("### 📉 Top 10 Losers")
-            top_losers = changes.tail(10).sort_values('Change %', ascending=True)
-            
-            fig6 = px.bar(top_losers, 
-                         x='Area', 
-                         y='Change %',
-                         title='Areas with Lowest Price Growth',
-                         labels={'Change %': 'Price Change (%)'},
-                         color='Change %',
-                         color_continuous_scale=[[0, '#EF5350'], [0.5, '#E57373'], [1, '#FFCDD2']])
-            
-            fig6.update_layout(
-                height=450,
-                xaxis_tickangle=-45,
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(family="Arial, Helvetica, sans-serif", size=12),
-                xaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=13)),
-                yaxis=dict(gridcolor='#F5F5F5', title_font=dict(size=13)),
-                title_font=dict(size=16, color='#000000'),
-                showlegend=False
-            )
-            fig6.update_traces(marker_line_color='#E0E0E0', marker_line_width=1)
-            st.plotly_chart(fig6, use_container_width=True)
-            
-            st.dataframe(
-                top_losers[['Area', 'Change %', 'Earliest Price', 'Latest Price']].style.format({
-                    'Change %': '{:.2f}%',
-                    'Earliest Price': '₪{:,.0f}K',
-                    'Latest Price': '₪{:,.0f}K'
-                }).background_gradient(subset=['Change %'], cmap='Reds_r'),
-                hide_index=True,
-                use_container_width=True
-            )
-    
-    with tab3:
-        st.subheader("Detailed Data Table")
-        
-        # Display options
-        show_all = st.checkbox("Show all columns", value=False)
-        
-        if show_all:
-            display_df = df_filtered
-        else:
-            display_df = df_filtered[['Area', 'Rooms', 'Year', 'Quarter', 'Average Price', 'Quarter_ts']]
-        
-        # Sort options
-        sort_col = st.selectbox("Sort by", options=display_df.columns.tolist())
-        sort_order = st.radio("Order", options=['Ascending', 'Descending'], horizontal=True)
-        
-        display_df_sorted = display_df.sort_values(
-            sort_col, 
-            ascending=(sort_order == 'Ascending')
-        )
-        
-        st.dataframe(
-            display_df_sorted.style.format({
-                'Average Price': '₪{:,.0f}'
-            }),
-            use_container_width=True,
-            height=400
-        )
-        
-        # Download button
-        csv = display_df_sorted.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Download filtered data as CSV",
-            data=csv,
-            file_name='housing_data_filtered.csv',
-            mime='text/csv'
-        )
+    # Secondary analysis, rendered on demand
+    section = st.radio("Analysis", options=list(SECTIONS), horizontal=True, label_visibility="collapsed", key="section")
+    SECTIONS[section](filters)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,171 @@
+"""
+Static artifacts: minified UTF-8 output, pre-compressed siblings and size budgets
+
+Generators write their output through ``write_artifact``, which writes
+UTF-8 with ``\\n`` line endings plus ``.gz`` and ``.br`` copies next to the
+file, so a static host (nginx ``gzip_static`` / ``brotli_static``, a CDN)
+serves them without compressing on the fly. Brotli needs the optional
+``brotli`` package; without it only ``.gz`` is written.
+
+Budgets cap the gzip size of each artifact, which is what browsers
+download. ``write_artifact`` checks every file it writes against them and
+generators end with ``enforce_budgets``, which exits non-zero when one of
+their artifacts went over. Running this module prints the size report of
+every artifact and fails the same way:
+
+    python artifacts.py [--budget housing_searchprice.html=8000 ...]
+"""
+import argparse
+import fnmatch
+import glob
+import gzip
+import json
+import os
+import re
+import sys
+
+try:
+    import brotli
+except ImportError:  # optional, see module docstring
+    brotli = None
+
+from housing_data import BASE_DIR
+
+# Artifact pattern (relative to the repository root) -> max gzip bytes
+BUDGETS = {
+    'housing_searchprice.html': 6_000,
+    'housing_chart.html': 6_000,
+    'embedded_data.js': 3_000,
+    'housing_data_lite.json': 3_000,
+    'housing_data.json': 120_000,
+    'widget_data/*.json': 500,
+    'charts/*.html': 1_000,
+}
+
+# Artifacts written over their budget by this process: name -> (gzip bytes, budget)
+OVER_BUDGET = {}
+
+
+def minify_json(data):
+    """Compact JSON text (no indentation, non-ASCII kept as UTF-8)."""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def minify_html(html):
+    """Drop indentation and blank lines.
+
+    Only meant for the pages generated here: line breaks are kept (so
+    ``//`` comments in inline scripts stay valid), and they contain no
+    ``<pre>``, ``<textarea>`` or multi-line string literals.
+    """
+    lines = (line.strip() for line in html.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def compressed_sizes(data):
+    """Sizes of ``data`` (bytes) raw, gzipped and brotli-compressed (None without brotli)."""
+    return {
+        'raw': len(data),
+        'gz': len(gzip.compress(data, compresslevel=9, mtime=0)),
+        'br': len(brotli.compress(data, quality=11)) if brotli else None,
+    }
+
+
+def artifact_name(path, root=BASE_DIR):
+    """``path`` relative to the repository root, as budget patterns are written."""
+    return os.path.relpath(os.path.abspath(path), root).replace(os.sep, '/')
+
+
+def write_artifact(path, text, budgets=BUDGETS):
+    """Write ``text`` as UTF-8 with its ``.gz`` / ``.br`` siblings; returns the sizes.
+
+    The sizes also give the artifact's ``budget`` and whether it is within
+    it (``ok``); one over budget is reported and recorded in ``OVER_BUDGET``.
+    """
+    data = text.replace('\r\n', '\n').encode('utf-8')
+    outputs = {path: data, path + '.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli:
+        outputs[path + '.br'] = brotli.compress(data, quality=11)
+    elif os.path.exists(path + '.br'):
+        os.remove(path + '.br')  # stale copy of an older version
+
+    for target, payload in outputs.items():
+        tmp = target + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, target)
+
+    sizes = compressed_sizes(data)
+    name = artifact_name(path)
+    limit = budget_for(name, budgets)
+    sizes.update(budget=limit, ok=limit is None or sizes['gz'] <= limit)
+    if not sizes['ok']:
+        OVER_BUDGET[name] = (sizes['gz'], limit)
+        print(f"❌ {name}: {sizes['gz']:,} bytes gzipped, over its {limit:,} byte budget")
+    return sizes
+
+
+def enforce_budgets():
+    """End of a generator: exit with status 1 if it wrote an artifact over budget."""
+    if OVER_BUDGET:
+        print(f"❌ {len(OVER_BUDGET)} artifact(s) over budget: {', '.join(sorted(OVER_BUDGET))}")
+        sys.exit(1)
+
+
+def budget_for(name, budgets=BUDGETS):
+    """Budget of the first pattern matching ``name`` (None if unbudgeted)."""
+    for pattern, limit in budgets.items():
+        if fnmatch.fnmatch(name, pattern):
+            return limit
+    return None
+
+
+def collect(budgets=BUDGETS, root=BASE_DIR):
+    """Size report rows for every existing artifact matching a budget pattern."""
+    rows = []
+    for pattern in budgets:
+        for path in sorted(glob.glob(os.path.join(root, pattern))):
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                sizes = compressed_sizes(f.read())
+            limit = budget_for(name, budgets)
+            rows.append({'artifact': name, **sizes, 'budget': limit, 'ok': sizes['gz'] <= limit})
+    return rows
+
+
+def print_report(rows):
+    def fmt(value):
+        return f"{value:,}" if value is not None else '-'
+
+    print(f"{'Artifact':<40} {'Raw':>10} {'Gzip':>9} {'Brotli':>9} {'Budget':>9}")
+    for row in rows:
+        status = '✅' if row['ok'] else '❌'
+        print(f"{row['artifact']:<40} {fmt(row['raw']):>10} {fmt(row['gz']):>9} "
+              f"{fmt(row['br']):>9} {fmt(row['budget']):>9} {status}")
+    print(f"{'Total':<40} {fmt(sum(r['raw'] for r in rows)):>10} {fmt(sum(r['gz'] for r in rows)):>9}")
+
+
+def parse_budget(value):
+    match = re.fullmatch(r'(.+)=(\d+)', value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Expected PATTERN=BYTES, got '{value}'")
+    return match.group(1), int(match.group(2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report artifact sizes and enforce their gzip byte budgets")
+    parser.add_argument('--budget', type=parse_budget, action='append', default=[],
+                        help="override or add a budget, e.g. housing_chart.html=8000")
+    args = parser.parse_args()
+
+    budgets = {**dict(args.budget), **{k: v for k, v in BUDGETS.items() if k not in dict(args.budget)}}
+    rows = collect(budgets)
+    print_report(rows)
+    if not brotli:
+        print("ℹ️  brotli is not installed, no .br sizes")
+
+    over = [r for r in rows if not r['ok']]
+    if over:
+        print(f"❌ {len(over)} artifact(s) over budget: {', '.join(r['artifact'] for r in over)}")
+        sys.exit(1)
+    print("✅ All artifacts within budget")
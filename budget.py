@@ -0,0 +1,53 @@
+"""
+Purchase costs from the simulator spec (simalator_rules.txt), vectorized
+
+All functions accept scalars or NumPy arrays of purchase prices in NIS.
+Brackets and fees are the indicative values of the spec and must be
+updated yearly.
+"""
+import numpy as np
+
+VAT = 0.18
+
+# Mas rechisha brackets: (lower bound in NIS, marginal rate)
+TAX_BRACKETS = {
+    'primary': [(0, 0.0), (1_919_155, 0.035), (2_276_360, 0.05), (5_872_725, 0.08), (19_575_755, 0.10)],
+    'oleh': [(0, 0.0), (1_978_745, 0.005), (5_872_725, 0.05), (19_575_755, 0.08)],
+}
+INVESTMENT_TAX_RATE = 0.08
+
+AGENT_RATE = 0.02
+LAWYER_RATE = 0.01
+SHAMMAI = 3_500
+CADASTRE = 1_500
+
+
+def acquisition_tax(price, profile='primary'):
+    """Mas rechisha: each marginal rate applies only to its bracket.
+
+    ``profile`` is ``'primary'``, ``'oleh'`` or ``'investment'``.
+    """
+    price = np.asarray(price, dtype=float)
+    if profile == 'investment':
+        return price * INVESTMENT_TAX_RATE
+    brackets = TAX_BRACKETS[profile]
+    lower = np.array([b[0] for b in brackets], dtype=float)
+    rates = np.array([b[1] for b in brackets])
+    upper = np.append(lower[1:], np.inf)
+    taxed = np.clip(price[..., None] - lower, 0, upper - lower)
+    return (taxed * rates).sum(axis=-1)
+
+
+def purchase_fees(price, profile='primary', agent=True):
+    """Total purchase costs excluding financing: tax, agent, lawyer, appraiser, land registry."""
+    price = np.asarray(price, dtype=float)
+    fees = acquisition_tax(price, profile) + price * LAWYER_RATE * (1 + VAT) + SHAMMAI + CADASTRE
+    if agent:
+        fees = fees + price * AGENT_RATE * (1 + VAT)
+    return fees
+
+
+def all_in_cost(price, profile='primary', agent=True):
+    """Budget_total = Prix_achat + Total_frais (without financing)."""
+    price = np.asarray(price, dtype=float)
+    return price + purchase_fees(price, profile, agent)
@@ -0,0 +1,208 @@
+"""
+Streaming, parallel ingestion of CBS Excel workbooks
+
+Replaces the ``pd.read_excel(..., skiprows=20)`` step of data_parser.ipynb:
+each sheet is streamed row by row with openpyxl in read-only mode (no full
+DOM in memory), several workbooks/sheets are parsed concurrently in a
+process pool, and every table is normalized into the unpivoted schema
+used by the apps (Area, Rooms, Currency, Year, Quarter, Quarter_ts,
+Average Price, Is_District, District).
+
+Each workbook is one CBS table (sale prices, rents, ...) and its rows are
+tagged with it in a ``Table`` column (the workbook's file name), so the
+keys of different tables never collide; sheets of the same workbook are
+parts of its table. One table is published at a time.
+
+The result is only published if it passes the data-quality gate
+(data_quality.py); its report is written next to it as
+``<output>.quality.json``.
+
+Usage:
+    python cbs_ingest.py data_housing_fullhisto.xlsx [other.xlsx ...] [--table NAME] [-o data_housing_unpivoted.xlsx]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+import pandas as pd
+
+import data_quality
+
+LABEL = 'Area and rooms of apartment'
+QUARTERS = {'January-March': '1Q', 'April-June': '2Q', 'July-September': '3Q', 'October-December': '4Q'}
+ID_COLUMNS = ['Code', LABEL, 'Currency', 'Year']
+COLUMNS = ['Area', 'Rooms', 'Currency', 'Year', 'Quarter', 'Quarter_ts', 'Average Price', 'Is_District', 'District']
+
+# Published unit -> (unit used in the dataset, divisor)
+UNITS = {'NIS thousand': ('NIS millions', 1000)}
+
+# Cities are grouped into four districts in the dashboard, so the
+# Haifa and Tel Aviv district series are not published. The cities' District
+# is spelled as in the published dataset ('center District'; rollups.py
+# matches it to the 'Center District' area case-insensitively).
+EXCLUDED_AREAS = {'Haifa District', 'Tel Aviv District'}
+CITY_DISTRICTS = {
+    'Ashdod': 'South District',
+    'Ashkelon': 'South District',
+    'Beer Sheva': 'South District',
+    'Beit Shemesh': 'Jerusalem District',
+    'Jerusalem': 'Jerusalem District',
+    'Haifa': 'North District',
+    'Hadera': 'North District',
+    'Bnei Brak': 'center District',
+    'Bat Yam': 'center District',
+    'Holon': 'center District',
+    'Kfar Saba': 'center District',
+    'Netanya': 'center District',
+    'Petah Tiqwa': 'center District',
+    'Rishon Lezion': 'center District',
+    'Rehovot': 'center District',
+    'Ramat Gan': 'center District',
+    'Tel Aviv': 'center District',
+    'Herzlliya': 'center District',
+}
+
+
+def stream_rows(path, sheet=None):
+    """Yield the data rows of a CBS sheet as dicts, streaming in read-only mode.
+
+    The metadata block above the table is skipped by looking for the
+    ``Code`` header row instead of a fixed ``skiprows``.
+    """
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        for row in rows:
+            if row and row[0] == 'Code':
+                header = [str(c).strip() if c is not None else None for c in row]
+                break
+        else:
+            return
+
+        wanted = [(i, name) for i, name in enumerate(header) if name in ID_COLUMNS or name in QUARTERS]
+        for row in rows:
+            if not row or row[0] is None or row[1] is None:
+                continue  # blank lines and footnotes
+            yield {name: row[i] if i < len(row) else None for i, name in wanted}
+    finally:
+        wb.close()
+
+
+def normalize(raw, exclude_areas=EXCLUDED_AREAS):
+    """Unpivot raw CBS rows (one column per quarter) into the dataset schema."""
+    if raw.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    df = raw.rename(columns=QUARTERS)
+    quarters = [q for q in QUARTERS.values() if q in df.columns]
+    df = df.melt(id_vars=ID_COLUMNS, value_vars=quarters, var_name='Quarter', value_name='Average Price')
+
+    # '-' marks quarters without enough transactions
+    df['Average Price'] = pd.to_numeric(df['Average Price'], errors='coerce')
+    df = df.dropna(subset=['Average Price'])
+
+    label = df[LABEL].astype(str)
+    rooms = label.str.extract(r'(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)')
+    df['Rooms'] = (rooms[0] + '-' + rooms[1]).fillna('All')
+
+    area = label.str.extract(r'\(([^)]+)\)')[0].fillna(label)
+    area = area.str.replace(r'\s*-\s*\d+(?:\.\d+)?(?:-\d+(?:\.\d+)?)?', '', regex=True).str.strip()
+    area = area.mask(area.str.lower() == 'total', 'Israel')
+    df['Area'] = area.str[:1].str.upper() + area.str[1:]
+    df = df[~df['Area'].isin(exclude_areas)]
+
+    for published, (unit, divisor) in UNITS.items():
+        mask = df['Currency'] == published
+        # Python's round() (correctly rounded) matches the historical snapshots, numpy's does not
+        df.loc[mask, 'Average Price'] = [round(v / divisor, 2) for v in df.loc[mask, 'Average Price']]
+        df.loc[mask, 'Currency'] = unit
+
+    df['Year'] = df['Year'].astype(int)
+    df['Quarter_ts'] = pd.to_datetime(pd.DataFrame({
+        'year': df['Year'],
+        'month': df['Quarter'].str[0].astype(int) * 3 - 2,
+        'day': 1,
+    }))
+    df['Is_District'] = df['Area'].str.contains('District', case=False)
+    df['District'] = df['Area'].map(CITY_DISTRICTS).fillna('Israel')
+
+    return df.sort_values('Quarter_ts', kind='stable')[COLUMNS].reset_index(drop=True)
+
+
+def table_name(path):
+    """Name of the CBS table held by a workbook: its file name without extension."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def parse_sheet(path, sheet=None):
+    """Stream and normalize one sheet, tagged with its table (runs in a worker process)."""
+    raw = pd.DataFrame(stream_rows(path, sheet), columns=ID_COLUMNS + list(QUARTERS))
+    return normalize(raw).assign(Table=table_name(path))
+
+
+def sheet_tasks(paths):
+    """(path, sheet) for every sheet of every workbook."""
+    tasks = []
+    for path in paths:
+        wb = openpyxl.load_workbook(path, read_only=True)
+        tasks.extend((path, name) for name in wb.sheetnames)
+        wb.close()
+    return tasks
+
+
+def ingest(paths, workers=None):
+    """Parse every sheet of ``paths`` concurrently and return one normalized frame.
+
+    Rows keep the name of their table in a ``Table`` column (see
+    ``tables``). Sheets without a CBS table (no ``Code`` header)
+    contribute nothing.
+    """
+    tasks = sheet_tasks(paths)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        frames = [parse_sheet(path, sheet) for path, sheet in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            frames = list(pool.map(parse_sheet, *zip(*tasks)))
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS + ['Table'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def tables(df):
+    """Split an ``ingest`` result into one dataset-schema frame per table, in input order."""
+    return {name: rows[COLUMNS].reset_index(drop=True)
+            for name, rows in df.groupby('Table', sort=False)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Normalize CBS workbooks into the unpivoted housing dataset")
+    parser.add_argument('workbooks', nargs='+')
+    parser.add_argument('-o', '--output', default='data_housing_unpivoted.xlsx')
+    parser.add_argument('-t', '--table', help="table to publish (a workbook name) when several are ingested")
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    ingested = tables(ingest(args.workbooks, args.workers))
+    if args.table is None and len(ingested) > 1:
+        sys.exit(f"❌ Several tables ingested ({', '.join(ingested)}), pick one with --table")
+    name = args.table if args.table is not None else next(iter(ingested), None)
+    if name not in ingested:
+        sys.exit(f"❌ No CBS table '{name}' in {', '.join(args.workbooks)}")
+    df = ingested[name]
+    try:
+        report = data_quality.require(df, report_path=args.output + '.quality.json')
+    except data_quality.DataQualityError as e:
+        print(e.report.summary())
+        sys.exit(f"❌ {args.output} not written: {e}")
+    print(report.summary())
+
+    # The apps watch the output file: swap it in whole (see data_store.py)
+    root, ext = os.path.splitext(args.output)
+    tmp = f"{root}.tmp{ext}"
+    df.to_excel(tmp, index=False)
+    os.replace(tmp, args.output)
+    print(f"✅ Wrote {len(df)} records of table {name} to {args.output}")
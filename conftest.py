@@ -0,0 +1,38 @@
+"""
+Shared pytest fixtures: small hand-made frames in the unpivoted dataset's schema
+"""
+import pandas as pd
+import pytest
+
+
+def make_housing(series, start='2017-01-01', districts=None):
+    """Unpivoted frame from ``{(area, rooms): [price per quarter, ...]}``.
+
+    Prices are in NIS millions, one per consecutive quarter from ``start``;
+    ``None`` leaves that quarter out (CBS gaps). ``districts`` maps an area
+    to its district (default: the area itself).
+    """
+    districts = districts or {}
+    quarters = pd.date_range(start, periods=max(len(p) for p in series.values()), freq='QS')
+    rows = []
+    for (area, rooms), prices in series.items():
+        for quarter, price in zip(quarters, prices):
+            if price is None:
+                continue
+            rows.append({
+                'Area': area,
+                'Rooms': rooms,
+                'Currency': 'NIS millions',
+                'Year': quarter.year,
+                'Quarter': f'{quarter.quarter}Q',
+                'Quarter_ts': quarter,
+                'Average Price': float(price),
+                'Is_District': False,
+                'District': districts.get(area, area),
+            })
+    return pd.DataFrame(rows).sort_values(['Quarter_ts', 'Area', 'Rooms'], ignore_index=True)
+
+
+@pytest.fixture
+def housing():
+    return make_housing
@@ -0,0 +1,191 @@
+"""
+Crawl scheduler for many yad2 (section, category, item) feeds
+
+Jobs run on a pool of worker threads under a global concurrency limit and
+a per-host request rate budget; higher priority jobs start first. Each job
+records its progress and throughput so a full crawl has a predictable
+duration, and every page request goes to a shared ``CrawlTelemetry``
+(timings, retries, status) whose report is written as JSON at the end.
+"""
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+from scrapper import CrawlTelemetry, fetch_json, page_cache, to_csv
+
+
+class RateLimiter:
+    """Token bucket per host: at most ``rate`` requests/second, bursts up to ``burst``."""
+
+    def __init__(self, rate=2.0, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until a request to ``url``'s host fits in the budget."""
+        host = urlparse(url).netloc
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+
+
+@dataclass
+class CrawlJob:
+    """One feed to crawl and where to write it."""
+    section: str
+    category: int
+    item: int
+    priority: int = 0
+    limit: int = None
+    output: str = None
+    status: str = 'pending'
+    items: int = 0
+    requests: int = 0
+    started: float = None
+    finished: float = None
+    error: str = None
+    _seq: int = field(default=0, repr=False)
+
+    def __post_init__(self):
+        if self.output is None:
+            self.output = f"{self.section}_{self.category}_{self.item}.csv"
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def throughput(self):
+        """Items per second."""
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+
+class CrawlScheduler:
+    """Run crawl jobs by priority with bounded concurrency and per-host rate limits.
+
+    Args:
+        max_workers: jobs crawled at the same time
+        rate_per_host: requests per second allowed to each host
+        burst: requests a host may receive back to back
+        deadline: seconds after which pending jobs are skipped (None = no limit)
+        report: JSON file for the telemetry report of the crawl (None = not written)
+        cache: DiskCache shared by the jobs for feed pages, revalidated with conditional
+            requests (None = no cache)
+    """
+
+    def __init__(self, max_workers=4, rate_per_host=2.0, burst=2, deadline=None, verbose=True, report=None,
+                 cache=page_cache):
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate_per_host, burst)
+        self.deadline = deadline
+        self.verbose = verbose
+        self.report = report
+        self.cache = cache
+        self.telemetry = CrawlTelemetry(progress=None if verbose else False)
+        self.jobs = []
+        self._queue = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, section, category, item, priority=0, limit=None, output=None):
+        """Queue a feed; higher ``priority`` runs first. Returns the job."""
+        job = CrawlJob(section, category, item, priority, limit, output, _seq=next(self._counter))
+        self.jobs.append(job)
+        heapq.heappush(self._queue, (-priority, job._seq, job))
+        return job
+
+    def _next_job(self):
+        with self._lock:
+            return heapq.heappop(self._queue)[2] if self._queue else None
+
+    def _log(self, message):
+        if self.verbose:
+            with self._lock:
+                self.telemetry.clear()
+                print(message, flush=True)
+
+    def _throttle(self, job):
+        def throttle(url):
+            self.limiter.wait(url)
+            job.requests += 1
+        return throttle
+
+    def _counted(self, job, feed):
+        for item in feed:
+            job.items += 1
+            yield item
+
+    def _run_job(self, job):
+        job.status = 'running'
+        job.started = time.monotonic()
+        feed = fetch_json(job.section, job.category, job.item, limit=job.limit, cache=self.cache,
+                          throttle=self._throttle(job), telemetry=self.telemetry)
+        try:
+            to_csv(job.output, self._counted(job, feed))
+            job.status = 'done'
+        except StopIteration:
+            job.status = 'empty'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        job.finished = time.monotonic()
+        self._log(f"{'✅' if job.status == 'done' else '⚠️'} {job.section}/{job.category}/{job.item}: "
+                  f"{job.status}, {job.items} items, {job.requests} requests in {job.elapsed:.1f}s "
+                  f"({job.throughput:.1f} items/s)")
+
+    def _worker(self, started):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if self.deadline is not None and time.monotonic() - started > self.deadline:
+                job.status = 'skipped'
+                continue
+            self._run_job(job)
+
+    def run(self):
+        """Crawl every queued job and return the summary."""
+        started = time.monotonic()
+        workers = [threading.Thread(target=self._worker, args=(started,), daemon=True)
+                   for _ in range(min(self.max_workers, len(self._queue)))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        summary = self.summary(time.monotonic() - started)
+        if self.report:
+            telemetry = self.telemetry.write_report(self.report)
+            self._log(f"⏱️ latency p50 {telemetry['latency_ms']['p50']} ms, p95 {telemetry['latency_ms']['p95']} ms, "
+                      f"{telemetry['throttled_s']:.1f}s throttled, {telemetry['retries']} retries, "
+                      f"error rate {telemetry['error_rate']:.1%} (see {self.report})")
+        self._log(f"📊 {summary['done']}/{summary['jobs']} jobs, {summary['items']} items "
+                  f"in {summary['elapsed']:.1f}s ({summary['throughput']:.1f} items/s)")
+        return summary
+
+    def summary(self, elapsed):
+        items = sum(job.items for job in self.jobs)
+        return {
+            'jobs': len(self.jobs),
+            'done': sum(job.status == 'done' for job in self.jobs),
+            'failed': [f"{job.section}/{job.category}/{job.item}: {job.error}" for job in self.jobs if job.status == 'failed'],
+            'skipped': sum(job.status == 'skipped' for job in self.jobs),
+            'items': items,
+            'requests': sum(job.requests for job in self.jobs),
+            'elapsed': elapsed,
+            'throughput': items / elapsed if elapsed else 0.0,
+        }
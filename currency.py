@@ -0,0 +1,149 @@
+"""
+Display currencies for the NIS prices, from a local exchange rates file
+
+The rates file (``exchange_rates.csv``, not shipped: export it from the
+Bank of Israel representative rates) has one row per date and currency:
+
+    Date,Currency,Rate
+    2025-01-02,EUR,3.7712
+
+where ``Rate`` is the NIS price of one unit of the currency. As the
+simulator spec asks (simalator_rules.txt, VI), amounts are converted with
+the average rate of the last 3 months, precomputed for every date when
+the file is loaded. A dataset is converted with one ``merge_asof`` of its
+distinct quarters onto those averages (the 3 months ending with the
+quarter) and a vectorized division; a ``Converter`` keeps the converted
+frames of one data version per (currency, rates file version).
+
+Without a rates file only NIS is available.
+"""
+import logging
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import housing_data
+from analytics import Analytics
+
+RATES_FILE = os.environ.get('GETAHOME_RATES_FILE', os.path.join(housing_data.BASE_DIR, 'exchange_rates.csv'))
+BASE = 'ILS'
+SYMBOLS = {'ILS': '₪', 'EUR': '€', 'USD': '$', 'GBP': '£'}
+PRICE_COLUMNS = ['Average Price']
+
+# "Average of the last 3 months" of daily rates
+WINDOW = '91D'
+# A quarter without a rate in its last month is left unconverted (NaN) rather than given a stale rate
+TOLERANCE = pd.Timedelta(days=31)
+
+log = logging.getLogger(__name__)
+
+
+def rates_version(path=RATES_FILE):
+    """Version token of the rates file, or None when there is none."""
+    try:
+        return housing_data.data_version(path)
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=2)
+def _load(path, version):
+    rates = pd.read_csv(path, parse_dates=['Date'])
+    rates['Currency'] = rates['Currency'].str.strip().str.upper()
+    rates = rates.dropna(subset=['Rate']).sort_values(['Currency', 'Date'], ignore_index=True)
+    rolling = rates.set_index('Date').groupby('Currency')['Rate'].rolling(WINDOW).mean()
+    rates['Rate 3M'] = rolling.to_numpy()  # same (Currency, Date) order as rates
+    return rates
+
+
+def load_rates(path=RATES_FILE):
+    """The rates file with its 3-month averages (``Rate 3M``), cached per file version.
+
+    Returns an empty frame when the file does not exist.
+    """
+    version = rates_version(path)
+    if version is None:
+        return pd.DataFrame(columns=['Date', 'Currency', 'Rate', 'Rate 3M'])
+    return _load(path, version)
+
+
+def currencies(path=RATES_FILE):
+    """Currencies prices can be shown in, NIS first."""
+    return [BASE] + sorted(set(load_rates(path)['Currency']) - {BASE})
+
+
+def _unavailable(currency, path=RATES_FILE):
+    """KeyError for a currency without rates; the message is shown to users, the path only logged."""
+    log.warning("No '%s' exchange rates in %s", currency, path)
+    return KeyError(f"Exchange rates unavailable for {currency}")
+
+
+def quarter_rates(quarters, currency, rates):
+    """3-month average rate for each quarter start in ``quarters`` (the quarter's own 3 months)."""
+    table = rates.loc[rates['Currency'] == currency, ['Date', 'Rate 3M']]
+    if table.empty:
+        raise _unavailable(currency)
+    distinct = pd.DataFrame({'Quarter_ts': pd.to_datetime(pd.unique(quarters))})
+    distinct['Date'] = distinct['Quarter_ts'] + pd.offsets.QuarterEnd(0)
+    joined = pd.merge_asof(distinct.sort_values('Date'), table, on='Date',
+                           direction='backward', tolerance=TOLERANCE)
+    return joined.set_index('Quarter_ts')['Rate 3M']
+
+
+def convert(df, currency, rates=None, columns=PRICE_COLUMNS):
+    """Copy of ``df`` with its price columns (and ``Currency`` label) in ``currency``."""
+    if currency == BASE:
+        return df
+    rates = load_rates() if rates is None else rates
+    rate = df['Quarter_ts'].map(quarter_rates(df['Quarter_ts'], currency, rates)).to_numpy(dtype=float)
+    out = df.assign(**{col: (df[col].to_numpy(dtype=float) / rate).astype(df[col].dtype) for col in columns})
+    if 'Currency' in out.columns:
+        # 'NIS millions' -> 'EUR millions', kept categorical in compact frames
+        label = out['Currency'].astype(str).str.replace('NIS', currency, regex=False)
+        out['Currency'] = label.astype('category') if isinstance(df['Currency'].dtype, pd.CategoricalDtype) else label
+    return out
+
+
+def to_currency(amounts, currency, rates=None, on=None):
+    """NIS ``amounts`` (scalar or array, e.g. a simulator batch) in ``currency``.
+
+    Uses the latest 3-month average, or the one as of date ``on``
+    (Montant_EUR = Montant_ILS / Taux_EUR_ILS).
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    if currency == BASE:
+        return amounts
+    rates = load_rates() if rates is None else rates
+    table = rates[rates['Currency'] == currency]
+    if on is not None:
+        table = table[table['Date'] <= pd.Timestamp(on)]
+    if table.empty:
+        raise _unavailable(currency)
+    return amounts / table['Rate 3M'].iloc[-1]
+
+
+class Converter:
+    """Converted copies of one data version, memoized per (currency, rates file version).
+
+    Wraps the NIS ``Analytics`` of a snapshot (see ``Snapshot.converter``);
+    cached frames are shared, callers must not modify them.
+    """
+
+    def __init__(self, analytics, path=RATES_FILE):
+        self.base = analytics
+        self.path = path
+        self._analytics = lru_cache(maxsize=8)(self._convert)
+
+    def _convert(self, currency, version):
+        return Analytics(convert(self.base.df, currency, _load(self.path, version)))
+
+    def analytics(self, currency):
+        """``Analytics`` over the data in ``currency`` (KeyError when it has no rates)."""
+        if currency == BASE:
+            return self.base
+        version = rates_version(self.path)
+        if version is None:
+            raise _unavailable(currency, self.path)
+        return self._analytics(currency, version)
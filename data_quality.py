@@ -0,0 +1,170 @@
+"""
+Data-quality gate for new snapshots of the unpivoted housing dataset
+
+Every check is a vectorized pass over the whole frame (a few milliseconds
+for the full CBS history):
+
+- schema: the columns every consumer relies on are present
+- unique_key: one row per (Area, Rooms, Quarter) -- duplicates would be
+  silently averaged by the dashboard's groupbys
+- numeric_price: every price is a positive number ('-' or other strings
+  left over from the Excel sheets fail)
+- is_district: ``Is_District`` is the same on every row of an area
+- continuity: quarters missing inside a series (a warning: CBS withholds
+  quarters with too few transactions)
+
+Errors refuse the snapshot (``DataQualityError``), warnings are reported
+only. ``validate`` returns a ``QualityReport``; its ``to_dict`` is the
+machine-readable form written next to the published file.
+
+Usage:
+    python data_quality.py [data_housing_unpivoted.xlsx] [--json report.json] [--strict]
+"""
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+import pandas as pd
+
+import housing_data
+
+KEY = ['Area', 'Rooms', 'Quarter_ts']
+REQUIRED_COLUMNS = ['Area', 'Rooms', 'Year', 'Quarter', 'Quarter_ts', 'Average Price', 'Is_District']
+MAX_EXAMPLES = 10
+
+
+@dataclass
+class CheckResult:
+    name: str
+    severity: str  # 'error' or 'warning'
+    failures: int
+    examples: list = field(default_factory=list)
+
+    @property
+    def passed(self):
+        return self.failures == 0
+
+
+@dataclass
+class QualityReport:
+    rows: int
+    checks: list
+    elapsed_ms: float
+    strict: bool = False
+
+    @property
+    def errors(self):
+        blocking = ('error', 'warning') if self.strict else ('error',)
+        return [c for c in self.checks if not c.passed and c.severity in blocking]
+
+    @property
+    def passed(self):
+        return not self.errors
+
+    def to_dict(self):
+        return {
+            'passed': self.passed,
+            'rows': self.rows,
+            'elapsed_ms': round(self.elapsed_ms, 3),
+            'checks': [dict(asdict(c), passed=c.passed) for c in self.checks],
+        }
+
+    def summary(self):
+        lines = [f"{'✅' if self.passed else '❌'} {self.rows} rows checked in {self.elapsed_ms:.1f} ms"]
+        for check in self.checks:
+            mark = '✅' if check.passed else ('❌' if check in self.errors else '⚠️')
+            lines.append(f"  {mark} {check.name}: {check.failures} failure(s)")
+            lines.extend(f"      {example}" for example in check.examples[:3])
+        return '\n'.join(lines)
+
+
+class DataQualityError(ValueError):
+    """A snapshot failed the quality gate; ``report`` says why."""
+
+    def __init__(self, report):
+        super().__init__(f"Data quality gate failed: {', '.join(c.name for c in report.errors)}")
+        self.report = report
+
+
+def _examples(rows, columns):
+    return housing_data.to_records(rows[columns].head(MAX_EXAMPLES))
+
+
+def check_schema(df):
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    return CheckResult('schema', 'error', len(missing), missing)
+
+
+def check_unique_key(df):
+    duplicated = df.duplicated(KEY, keep=False)
+    rows = df[duplicated].sort_values(KEY)
+    return CheckResult('unique_key', 'error', int(duplicated.sum()), _examples(rows, KEY + ['Average Price']))
+
+
+def check_numeric_price(df):
+    prices = pd.to_numeric(df['Average Price'], errors='coerce')
+    bad = ~(prices > 0)  # NaN (missing or not a number) compares False
+    return CheckResult('numeric_price', 'error', int(bad.sum()), _examples(df[bad], KEY + ['Average Price']))
+
+
+def check_is_district(df):
+    flags = df.groupby('Area', observed=True)['Is_District'].nunique()
+    areas = flags.index[flags > 1]
+    return CheckResult('is_district', 'error', len(areas), [str(a) for a in areas[:MAX_EXAMPLES]])
+
+
+def check_continuity(df):
+    quarters = pd.to_datetime(df['Quarter_ts'])
+    ordinal = pd.Series(quarters.dt.year * 4 + quarters.dt.quarter, index=df.index)
+    ordered = df[['Area', 'Rooms']].assign(_q=ordinal).sort_values(['Area', 'Rooms', '_q'])
+    step = ordered.groupby(['Area', 'Rooms'], observed=True)['_q'].diff()
+    gaps = ordered[step > 1].assign(**{'Missing Quarters': (step[step > 1] - 1).astype(int)})
+    gaps = gaps.assign(Quarter_ts=quarters[gaps.index])
+    return CheckResult('continuity', 'warning', int(gaps['Missing Quarters'].sum()),
+                       _examples(gaps, KEY + ['Missing Quarters']))
+
+
+CHECKS = [check_unique_key, check_numeric_price, check_is_district, check_continuity]
+
+
+def validate(df, strict=False):
+    """Run every check on ``df``; ``strict`` makes warnings block too."""
+    started = time.perf_counter()
+    checks = [check_schema(df)]
+    if checks[0].passed:
+        checks += [check(df) for check in CHECKS]
+    return QualityReport(len(df), checks, (time.perf_counter() - started) * 1000, strict)
+
+
+def require(df, strict=False, report_path=None):
+    """Validate ``df`` before it is published; raises ``DataQualityError`` on failure.
+
+    The report is written to ``report_path`` (JSON) either way; returns it.
+    """
+    report = validate(df, strict)
+    if report_path:
+        write_report(report, report_path)
+    if not report.passed:
+        raise DataQualityError(report)
+    return report
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check a housing dataset before publishing it")
+    parser.add_argument('path', nargs='?', default=housing_data.DATA_FILE)
+    parser.add_argument('--json', help="write the machine-readable report to this file")
+    parser.add_argument('--strict', action='store_true', help="warnings (quarter gaps) fail too")
+    args = parser.parse_args()
+
+    report = validate(housing_data.load_data(args.path), args.strict)
+    print(report.summary())
+    if args.json:
+        write_report(report, args.json)
+    sys.exit(0 if report.passed else 1)
@@ -0,0 +1,140 @@
+"""
+Versioned, hot-reloadable housing data for the dashboard and the API
+
+A ``DataStore`` holds one immutable ``Snapshot``: the dataset with its
+derived metrics and anomaly flags plus every derived structure
+(similarity indexes, ...).
+A background thread watches the data file; when a new version appears the
+next snapshot is fully built off to the side and then swapped in with a
+single reference assignment. Callers take ``store.current()`` once per
+request, so in-flight work keeps the version it started with.
+"""
+import os
+import threading
+import time
+import traceback
+
+import data_quality
+import housing_data
+from analytics import Analytics
+from currency import Converter
+import monte_carlo
+import sql_engine
+from rollups import Rollups
+from anomalies import add_anomaly_flags
+from metrics import add_derived_metrics
+from similarity import METHODS, SimilarityIndex
+
+
+def build_similarity(df):
+    return {method: SimilarityIndex(df, method=method) for method in METHODS}
+
+
+# Processes simulating the fan charts of a snapshot (None = one per CPU).
+# In-process by default: the spawned workers re-import the main module, which
+# re-runs the whole app when it is started as a script (python getahome/src/app.py);
+# under waitress or Streamlit a pool is safe
+FAN_WORKERS = int(os.environ.get('GETAHOME_FAN_WORKERS', '1')) or None
+
+
+def build_fan(df):
+    return monte_carlo.simulate_all(df, workers=FAN_WORKERS)
+
+
+# Derived structures built for every snapshot: name -> builder(df)
+DEFAULT_BUILDERS = {
+    'similarity': build_similarity,
+    'fan': build_fan,
+    'rollups': Rollups,
+}
+if sql_engine.available():
+    DEFAULT_BUILDERS['sql'] = sql_engine.QueryEngine
+
+
+class Snapshot:
+    """One data version and everything derived from it (read-only by convention).
+
+    ``df`` is shared by every session and request of the process: filter it
+    or ``assign`` to a copy, never add or modify columns in place.
+    """
+
+    def __init__(self, version, df, derived):
+        self.version = version
+        self.df = df
+        self.derived = derived
+        self.loaded_at = time.time()
+        # Memoized queries live as long as the version they were computed on
+        self.analytics = Analytics(df)
+        # ... and so are its conversions to other currencies
+        self.converter = Converter(self.analytics)
+
+    def __getitem__(self, name):
+        return self.derived[name]
+
+
+class DataStore:
+    """Current snapshot of the data file, rebuilt in the background when it changes.
+
+    Args:
+        path: data file to watch
+        builders: derived structures to build for each snapshot
+        interval: seconds between checks of the data file
+    """
+
+    def __init__(self, path=housing_data.DATA_FILE, builders=None, interval=30):
+        self.path = path
+        self.builders = dict(DEFAULT_BUILDERS if builders is None else builders)
+        self.interval = interval
+        self._snapshot = self.build(housing_data.data_version(path))
+        self._failed_version = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        """The latest fully built snapshot."""
+        return self._snapshot
+
+    def build(self, version):
+        raw = housing_data.load_data(self.path)
+        # A file that fails the quality gate is never served (refresh keeps the previous version)
+        data_quality.require(raw)
+        df = add_anomaly_flags(add_derived_metrics(raw))
+        derived = {name: builder(df) for name, builder in self.builders.items()}
+        # Builders work in full precision; the frame kept for the life of the snapshot is compact
+        return Snapshot(version, housing_data.compact(df), derived)
+
+    def refresh(self):
+        """Build and swap in a new snapshot if the data file changed; returns True if swapped."""
+        with self._reload_lock:
+            try:
+                version = housing_data.data_version(self.path)
+            except OSError:
+                # File being replaced right now, try again next time
+                return False
+            if version in (self._snapshot.version, self._failed_version):
+                return False
+            try:
+                snapshot = self.build(version)
+            except Exception:
+                # Keep serving the previous version; a broken file is not retried until it changes
+                self._failed_version = version
+                traceback.print_exc()
+                return False
+            self._snapshot = snapshot
+            print(f"🔄 Data reloaded (version {version})")
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        """Start the background watcher (idempotent); returns self."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="data-store-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,197 @@
+"""
+Batch export of embeddable charts: one page per area / district and room type
+
+Batch version of export_chart.py. Every page loads the same two shared
+scripts, both named after a hash of their content so a static host can
+serve them with ``Cache-Control: immutable``:
+
+- ``plotly.<hash>.min.js``: plotly.js from the installed plotly package
+  (hosted locally instead of the CDN)
+- ``chart.<hash>.js``: the chart layout and ``renderChart``
+
+A page itself only embeds its series as compact JSON (quarter labels and
+prices), about a kilobyte. Pages are rendered and written in a process
+pool; a page whose content hash is unchanged in ``manifest.json`` is not
+rewritten (nor recompressed), so a rebuild after a data update only
+touches the series that moved.
+
+Usage:
+    python export_all_charts.py [--out charts] [--base-url URL] [-j WORKERS]
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly
+import plotly.offline
+
+import housing_data
+import artifacts
+from artifacts import enforce_budgets, minify_html, minify_json, write_artifact
+
+CHART_DIR = 'charts'
+# Where pages load the shared scripts from (the CDN URL if the charts are hosted elsewhere)
+BASE_URL = os.environ.get('CHARTS_URL', '')
+
+CONFIG = {
+    'displayModeBar': True,
+    'displaylogo': False,
+    'modeBarButtonsToRemove': ['pan2d', 'lasso2d', 'select2d'],
+    'responsive': True,
+}
+
+# Same look as export_chart.py, without the plotly_white template (that alone is ~10 KB per page)
+CHART_JS = '''
+function renderChart(id, d) {
+  Plotly.newPlot(id, [{
+    x: d.x, y: d.y, name: d.series, mode: 'lines+markers',
+    line: {shape: 'spline', width: 3, color: '#116DFF'}, marker: {size: 6},
+    hovertemplate: '%{x}: ₪%{y:.2f}M<extra></extra>'
+  }], {
+    title: {text: d.title, font: {size: 20, family: 'Arial', color: '#333'}},
+    autosize: true,
+    hovermode: 'x unified',
+    font: {family: 'Arial', size: 12},
+    xaxis: {title: {text: 'Quarter', font: {size: 14}}, tickangle: -45, gridcolor: '#f0f0f0'},
+    yaxis: {title: {text: 'Average Price (₪M)', font: {size: 14}}, gridcolor: '#e0e0e0'},
+    margin: {l: 60, r: 20, t: 60, b: 70},
+    plot_bgcolor: 'white',
+    paper_bgcolor: 'white'
+  }, __CONFIG__);
+}
+'''
+
+PAGE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>%(title)s</title>
+    <style>html, body { margin: 0; background: white; } #chart { width: 100%%; height: 100vh; min-height: 400px; }</style>
+</head>
+<body>
+    <div id="chart"></div>
+    <script src="%(plotly)s"></script>
+    <script src="%(chart_js)s"></script>
+    <script>renderChart('chart', %(data)s);</script>
+</body>
+</html>
+'''
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-')
+
+
+def hashed_name(stem, text, ext='.js'):
+    return f"{stem}.{hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]}{ext}"
+
+
+def write_shared(name, text, directory):
+    """Write a content-hashed script once; older versions of it are removed."""
+    stem = name.split('.')[0]
+    for path in glob.glob(os.path.join(directory, f'{stem}.*.js*')):
+        if not os.path.basename(path).startswith(name):
+            os.remove(path)
+    if not os.path.exists(os.path.join(directory, name)):
+        write_artifact(os.path.join(directory, name), text)
+
+
+def series_pages(df):
+    """(file name, title, data) of every Area x Rooms series, oldest quarter first."""
+    df = df.sort_values('Quarter_ts')
+    labels = df['Quarter'].astype(str) + df['Year'].astype(str).str[-2:]
+    pages = []
+    for (area, rooms), rows in df.assign(Label=labels).groupby(['Area', 'Rooms'], observed=True):
+        series = f"{area} - {rooms}"
+        title = f"{area} - {'all apartments' if rooms == 'All' else f'{rooms} rooms'}"
+        data = {
+            'title': title,
+            'series': series,
+            'x': rows['Label'].tolist(),
+            'y': [round(float(p), 4) for p in rows['Average Price']],
+        }
+        pages.append((f"{slugify(area)}_{slugify(rooms)}.html", title, data))
+    return pages
+
+
+def render_pages(jobs, directory, scripts):
+    """Render a chunk of pages; writes those whose hash differs.
+
+    Returns [(name, hash, written)] and the pages written over budget
+    (``artifacts.OVER_BUDGET`` of a worker process is not shared).
+    """
+    results, over = [], {}
+    for name, title, data, previous in jobs:
+        # Escape '</' so the JSON cannot close the inline script
+        payload = minify_json(data).replace('</', '<\\/')
+        html = minify_html(PAGE % dict(scripts, title=title, data=payload))
+        digest = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        path = os.path.join(directory, name)
+        written = digest != previous or not os.path.exists(path)
+        if written:
+            sizes = write_artifact(path, html)
+            if not sizes['ok']:
+                over[artifacts.artifact_name(path)] = (sizes['gz'], sizes['budget'])
+        results.append((name, digest, written))
+    return results, over
+
+
+def export_all(df, directory=CHART_DIR, base_url=BASE_URL, workers=None):
+    """Export every series of ``df``; returns (pages written, pages unchanged)."""
+    os.makedirs(directory, exist_ok=True)
+    plotly_js = plotly.offline.get_plotlyjs()
+    chart_js = CHART_JS.replace('__CONFIG__', minify_json(CONFIG))
+    scripts = {'plotly': hashed_name('plotly', plotly_js, '.min.js'), 'chart_js': hashed_name('chart', chart_js)}
+    write_shared(scripts['plotly'], plotly_js, directory)
+    write_shared(scripts['chart_js'], chart_js, directory)
+    urls = {key: base_url + name for key, name in scripts.items()}
+
+    manifest_path = os.path.join(directory, 'manifest.json')
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            previous = json.load(f).get('pages', {})
+    except (OSError, ValueError):
+        previous = {}
+
+    jobs = [(name, title, data, previous.get(name)) for name, title, data in series_pages(df)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    chunks = [jobs[i::workers * 4] for i in range(workers * 4)]
+    if workers == 1:
+        rendered = [render_pages(chunk, directory, urls) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(render_pages, chunk, directory, urls) for chunk in chunks if chunk]
+            rendered = [future.result() for future in futures]
+    results = [r for chunk_results, _ in rendered for r in chunk_results]
+    for _, over in rendered:
+        artifacts.OVER_BUDGET.update(over)
+
+    pages = {name: digest for name, digest, _ in sorted(results)}
+    # Pages of series that no longer exist
+    for path in glob.glob(os.path.join(directory, '*.html*')):
+        if re.sub(r'\.(gz|br)$', '', os.path.basename(path)) not in pages:
+            os.remove(path)
+    write_artifact(manifest_path, minify_json({'plotly': plotly.__version__, 'scripts': scripts, 'pages': pages}))
+
+    written = sum(w for _, _, w in results)
+    return written, len(results) - written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export one embeddable chart page per area and room type")
+    parser.add_argument('--out', default=CHART_DIR, help="output directory")
+    parser.add_argument('--base-url', default=BASE_URL, help="URL prefix of the shared scripts")
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written, unchanged = export_all(housing_data.load_data(), args.out, args.base_url, args.workers)
+    print(f"✅ {written} chart page(s) written, {unchanged} unchanged, in {time.perf_counter() - started:.1f}s")
+    print(f"📊 Embed {args.out}/<area>_<rooms>.html, e.g. {args.out}/tel-aviv_all.html")
+    enforce_budgets()
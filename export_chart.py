@@ -1,6 +1,8 @@
 import pandas as pd
 import plotly.express as px
 
+from artifacts import enforce_budgets, write_artifact
+
 # Load data
 df = pd.read_excel('data_housing_unpivoted.xlsx')
 df['Quarter_ts'] = pd.to_datetime(df['Quarter_ts'])
@@ -63,15 +65,17 @@ fig.update_layout(
     paper_bgcolor='white'
 )
 
-# Export to HTML
-fig.write_html('housing_chart.html', 
-               include_plotlyjs='cdn',
-               config={
-                   'displayModeBar': True,
-                   'displaylogo': False,
-                   'modeBarButtonsToRemove': ['pan2d', 'lasso2d', 'select2d']
-               })
+# Export to HTML (UTF-8, with pre-compressed copies)
+html = fig.to_html(include_plotlyjs='cdn',
+                   config={
+                       'displayModeBar': True,
+                       'displaylogo': False,
+                       'modeBarButtonsToRemove': ['pan2d', 'lasso2d', 'select2d']
+                   })
+write_artifact('housing_chart.html', html)
 
 print("✅ Chart exported to housing_chart.html")
 print("📊 You can now embed this file in your Wix website")
 print(f"📈 Showing data for: {', '.join(top_areas)}")
+
+enforce_budgets()
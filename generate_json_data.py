@@ -1,42 +1,31 @@
 """
 Generate JSON data file from Excel for the housing price lookup widget
 """
-import pandas as pd
-import json
+import housing_data
+from artifacts import enforce_budgets, minify_json, write_artifact
+from metrics import METRIC_COLUMNS, add_derived_metrics
 
 print("🔄 Converting Excel data to JSON...")
 
 try:
     # Load the Excel data
-    df = pd.read_excel('data_housing_unpivoted.xlsx')
+    df = housing_data.load_data()
     
     print(f"✅ Loaded {len(df)} records from Excel")
     
-    # Ensure Quarter_ts is datetime
-    if 'Quarter_ts' not in df.columns:
-        df['Quarter_ts'] = pd.PeriodIndex(
-            year=df['Year'], 
-            quarter=df['Quarter'].str[0].astype(int), 
-            freq='Q'
-        ).to_timestamp()
-    else:
-        df['Quarter_ts'] = pd.to_datetime(df['Quarter_ts'])
+    # Add QoQ / YoY / 5Y / CAGR / volatility columns
+    df = add_derived_metrics(df)
     
-    # Ensure Is_District column exists
-    if 'Is_District' not in df.columns:
-        df['Is_District'] = df['Area'].str.contains("District", case=False, na=False)
+    # Two decimals are all the widget displays and keep the file small
+    df[METRIC_COLUMNS] = df[METRIC_COLUMNS].round(2)
     
-    # Convert Quarter_ts to string format for JSON
-    df['Quarter_ts'] = df['Quarter_ts'].dt.strftime('%Y-%m-%d')
+    # Convert to JSON (ISO dates, null for missing metrics)
+    json_data = housing_data.to_records(df)
     
-    # Convert to JSON
-    json_data = df.to_dict(orient='records')
+    # Save to file (minified UTF-8, with pre-compressed copies)
+    sizes = write_artifact('housing_data.json', minify_json(json_data))
     
-    # Save to file
-    with open('housing_data.json', 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
-    
-    print(f"✅ Generated housing_data.json with {len(df)} records")
+    print(f"✅ Generated housing_data.json with {len(df)} records ({sizes['raw']:,} bytes, {sizes['gz']:,} gzipped)")
     
     # Print some statistics
     print(f"\n📊 Data Summary:")
@@ -56,3 +45,5 @@ except Exception as e:
     print(f"❌ Error: {str(e)}")
     import traceback
     traceback.print_exc()
+
+enforce_budgets()
@@ -1,59 +1,41 @@
 """
-Generate a lightweight version of housing data with only the latest quarter,
-one year ago, and five years ago for comparison
+Generate a lightweight version of housing data with only the latest quarter;
+the 1-year and 5-year changes come precomputed from the metrics layer
 """
-import pandas as pd
-import json
+import housing_data
+from artifacts import enforce_budgets, minify_json, write_artifact
+from metrics import add_derived_metrics
 
 print("🔄 Creating lightweight housing data...")
 
 try:
     # Load the Excel data
-    df = pd.read_excel('data_housing_unpivoted.xlsx')
+    df = housing_data.load_data()
     
     print(f"✅ Loaded {len(df)} records from Excel")
     
-    # Ensure Quarter_ts is datetime
-    if 'Quarter_ts' not in df.columns:
-        df['Quarter_ts'] = pd.PeriodIndex(
-            year=df['Year'], 
-            quarter=df['Quarter'].str[0].astype(int), 
-            freq='Q'
-        ).to_timestamp()
-    else:
-        df['Quarter_ts'] = pd.to_datetime(df['Quarter_ts'])
+    # Add QoQ / YoY / 5Y / CAGR / volatility columns
+    df = add_derived_metrics(df)
     
-    # Ensure Is_District column exists
-    if 'Is_District' not in df.columns:
-        df['Is_District'] = df['Area'].str.contains("District", case=False, na=False)
-    
-    # Get the latest quarter
+    # Keep only the latest quarter, the changes are already in its rows
     latest_quarter = df['Quarter_ts'].max()
-    year_ago = latest_quarter - pd.DateOffset(years=1)
-    five_years_ago = latest_quarter - pd.DateOffset(years=5)
-    
-    # Filter for only latest quarter, year ago, and 5 years ago
-    df_filtered = df[
-        (df['Quarter_ts'] == latest_quarter) | 
-        (df['Quarter_ts'] == year_ago) |
-        (df['Quarter_ts'] == five_years_ago)
-    ].copy()
+    df_filtered = df[df['Quarter_ts'] == latest_quarter].copy()
     
     # Select only necessary columns
     df_filtered = df_filtered[[
         'Area', 'Rooms', 'Year', 'Quarter', 
-        'Average Price', 'Quarter_ts', 'Is_District'
+        'Average Price', 'Quarter_ts', 'Is_District',
+        'YoY %', '5Y %'
     ]]
     
-    # Convert Quarter_ts to string format for JSON
-    df_filtered['Quarter_ts'] = df_filtered['Quarter_ts'].dt.strftime('%Y-%m-%d')
-    
-    # Convert to JSON
-    json_data = df_filtered.to_dict(orient='records')
+    # Round the changes and convert to JSON (ISO dates, null for missing changes)
+    df_filtered[['YoY %', '5Y %']] = df_filtered[['YoY %', '5Y %']].round(2)
+    json_data = housing_data.to_records(df_filtered)
     
-    # Save to file (for reference)
-    with open('housing_data_lite.json', 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    # Save to file, and as a script for pages that embed the data
+    js_data = minify_json(json_data)
+    write_artifact('housing_data_lite.json', js_data)
+    sizes = write_artifact('embedded_data.js', f"const housingData = {js_data};\n")
     
     print(f"✅ Generated lightweight data with {len(df_filtered)} records")
     print(f"   Original: {len(df)} records")
@@ -61,15 +43,12 @@ try:
     
     # Print some statistics
     print(f"\n📊 Data Summary:")
-    print(f"   - Latest quarter: {df_filtered[df_filtered['Quarter_ts'] == df_filtered['Quarter_ts'].max()]['Quarter'].iloc[0]} {df_filtered[df_filtered['Quarter_ts'] == df_filtered['Quarter_ts'].max()]['Year'].iloc[0]}")
+    print(f"   - Latest quarter: {df_filtered['Quarter'].iloc[0]} {df_filtered['Year'].iloc[0]}")
     print(f"   - Cities (excluding districts): {df_filtered[~df_filtered['Is_District']]['Area'].nunique()}")
     print(f"   - Room types: {df_filtered['Rooms'].nunique()}")
     
-    # Create JavaScript data string
-    js_data = json.dumps(json_data, ensure_ascii=False)
-    
     print(f"\n✅ JSON data size: {len(js_data):,} characters")
-    print(f"✅ Ready to embed in HTML!")
+    print(f"✅ embedded_data.js: {sizes['raw']:,} bytes, {sizes['gz']:,} gzipped")
     
 except FileNotFoundError:
     print("❌ Error: data_housing_unpivoted.xlsx not found")
@@ -77,3 +56,5 @@ except Exception as e:
     print(f"❌ Error: {str(e)}")
     import traceback
     traceback.print_exc()
+
+enforce_budgets()
@@ -1,11 +1,66 @@
+import glob
+import hashlib
 import json
+import os
+import re
+
+from artifacts import enforce_budgets, minify_html, minify_json, write_artifact
+
+# Dossier des fragments par ville et URL d'où le widget les charge
+# (à remplacer par l'URL du CDN si le widget est hébergé ailleurs)
+SHARD_DIR = 'widget_data'
+SHARD_URL = os.environ.get('WIDGET_DATA_URL', SHARD_DIR + '/')
 
 # Lire les données JSON
 with open('housing_data_lite.json', 'r', encoding='utf-8') as f:
     housing_data = json.load(f)
 
-# Convertir en format compact pour JavaScript
-json_data = json.dumps(housing_data, separators=(',', ':'), ensure_ascii=False)
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def write_shards(records, directory=SHARD_DIR):
+    """Un fichier JSON par ville, nommé d'après le hash de son contenu.
+
+    Le nom change dès que les données changent, donc les fragments peuvent
+    être servis avec ``Cache-Control: immutable``. Retourne le manifeste
+    ville -> nom de fichier.
+    """
+    os.makedirs(directory, exist_ok=True)
+    by_city = {}
+    for item in records:
+        by_city.setdefault(item['Area'], []).append(
+            {k: v for k, v in item.items() if k not in ('Area', 'Is_District', 'Quarter_ts')}
+        )
+
+    shards = {}
+    for city, rows in sorted(by_city.items()):
+        payload = minify_json(rows)
+        name = f"{slugify(city)}.{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:10]}.json"
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            write_artifact(path, payload)
+        shards[city] = name
+
+    # Supprimer les fragments des versions précédentes (et leurs copies compressées)
+    for path in glob.glob(os.path.join(directory, '*.json*')):
+        name = re.sub(r'\.(gz|br)$', '', os.path.basename(path))
+        if name not in shards.values() and name != 'manifest.json':
+            os.remove(path)
+    return shards
+
+
+shards = write_shards([item for item in housing_data if not item['Is_District']])
+manifest = {
+    'base': SHARD_URL,
+    'rooms': sorted({item['Rooms'] for item in housing_data}),
+    'cities': shards,
+}
+json_data = minify_json(manifest)
+write_artifact(os.path.join(SHARD_DIR, 'manifest.json'), json_data)
+
+# Le manifeste (quelques centaines d'octets) est intégré à la page, les prix sont chargés à la demande
 
 # Créer le HTML complet
 html_content = f'''<!DOCTYPE html>
@@ -295,8 +350,27 @@ html_content = f'''<!DOCTYPE html>
     </div>
 
     <script>
-        // Embedded housing data - Latest quarter, year ago, and 5 years ago for comparison
-        const housingData = {json_data};
+        // Manifest: room types and the content-hashed data file of each city
+        const manifest = {json_data};
+
+        // City data already fetched (or being fetched), by city name
+        const shardCache = new Map();
+
+        function loadCity(city) {{
+            if (!shardCache.has(city)) {{
+                const request = fetch(manifest.base + manifest.cities[city])
+                    .then(response => {{
+                        if (!response.ok) throw new Error(`HTTP ${{response.status}}`);
+                        return response.json();
+                    }})
+                    .catch(error => {{
+                        shardCache.delete(city);  // Retry on the next selection
+                        throw error;
+                    }});
+                shardCache.set(city, request);
+            }}
+            return shardCache.get(city);
+        }}
 
         // Load data function - now just initializes the dropdowns
         async function loadData() {{
@@ -309,14 +383,8 @@ html_content = f'''<!DOCTYPE html>
 
         // Populate city and room dropdowns
         function populateDropdowns() {{
-            // Get unique cities (excluding districts)
-            const cities = [...new Set(housingData
-                .filter(item => !item.Is_District)
-                .map(item => item.Area))]
-                .sort();
-
-            // Get unique room types
-            const roomTypes = [...new Set(housingData.map(item => item.Rooms))].sort();
+            const cities = Object.keys(manifest.cities).sort();
+            const roomTypes = manifest.rooms;
 
             // Populate city dropdown
             const citySelect = document.getElementById('citySelect');
@@ -350,7 +418,7 @@ html_content = f'''<!DOCTYPE html>
         }}
 
         // Update price display based on selection
-        function updatePrice() {{
+        async function updatePrice() {{
             const city = document.getElementById('citySelect').value;
             const rooms = document.getElementById('roomSelect').value;
 
@@ -360,15 +428,22 @@ html_content = f'''<!DOCTYPE html>
                 return;
             }}
 
-            // Get latest quarter
-            const maxQuarter = Math.max(...housingData.map(item => new Date(item.Quarter_ts).getTime()));
+            // Each city file only holds the latest quarter
+            let cityData;
+            try {{
+                cityData = await loadCity(city);
+            }} catch (error) {{
+                console.error(`Error loading data for ${{city}}:`, error);
+                cityData = [];
+            }}
 
-            // Filter data for selected city, rooms, and latest quarter
-            const latestData = housingData.filter(item => 
-                item.Area === city && 
-                item.Rooms === rooms && 
-                new Date(item.Quarter_ts).getTime() === maxQuarter
-            );
+            // Ignore the answer if the selection changed while loading
+            if (city !== document.getElementById('citySelect').value ||
+                rooms !== document.getElementById('roomSelect').value) {{
+                return;
+            }}
+
+            const latestData = cityData.filter(item => item.Rooms === rooms);
 
             if (latestData.length === 0) {{
                 document.getElementById('resultCard').classList.remove('show');
@@ -379,26 +454,6 @@ html_content = f'''<!DOCTYPE html>
             const data = latestData[0];
             const price = data['Average Price'];
 
-            // Calculate YoY change
-            const yearAgo = new Date(maxQuarter);
-            yearAgo.setFullYear(yearAgo.getFullYear() - 1);
-
-            const prevData = housingData.filter(item => 
-                item.Area === city && 
-                item.Rooms === rooms && 
-                Math.abs(new Date(item.Quarter_ts).getTime() - yearAgo.getTime()) < 100 * 24 * 60 * 60 * 1000 // Within 100 days
-            );
-
-            // Calculate 5-year change
-            const fiveYearsAgo = new Date(maxQuarter);
-            fiveYearsAgo.setFullYear(fiveYearsAgo.getFullYear() - 5);
-
-            const prevData5y = housingData.filter(item => 
-                item.Area === city && 
-                item.Rooms === rooms && 
-                Math.abs(new Date(item.Quarter_ts).getTime() - fiveYearsAgo.getTime()) < 100 * 24 * 60 * 60 * 1000 // Within 100 days
-            );
-
             // Update display
             document.getElementById('resultPeriod').textContent = `T${{data.Quarter}} ${{data.Year}}`;
             // Display full price in shekels (data is in millions, multiply by 1,000,000)
@@ -409,9 +464,8 @@ html_content = f'''<!DOCTYPE html>
 
             // Update 1-year change
             const changeEl = document.getElementById('resultChange');
-            if (prevData.length > 0) {{
-                const prevPrice = prevData[0]['Average Price'];
-                const change = ((price - prevPrice) / prevPrice) * 100;
+            const change = data['YoY %'];
+            if (change !== null && change !== undefined) {{
                 changeEl.textContent = `${{change > 0 ? '+' : ''}}${{change.toFixed(1)}}% sur 1 an`;
                 changeEl.className = 'result-change ' + (change >= 0 ? 'positive' : 'negative');
             }} else {{
@@ -421,9 +475,8 @@ html_content = f'''<!DOCTYPE html>
 
             // Update 5-year change
             const change5yEl = document.getElementById('resultChange5y');
-            if (prevData5y.length > 0) {{
-                const prevPrice5y = prevData5y[0]['Average Price'];
-                const change5y = ((price - prevPrice5y) / prevPrice5y) * 100;
+            const change5y = data['5Y %'];
+            if (change5y !== null && change5y !== undefined) {{
                 change5yEl.textContent = `${{change5y > 0 ? '+' : ''}}${{change5y.toFixed(1)}}% sur 5 ans`;
                 change5yEl.className = 'result-change-5y ' + (change5y >= 0 ? 'positive' : 'negative');
                 change5yEl.style.display = 'inline-block';
@@ -441,10 +494,12 @@ html_content = f'''<!DOCTYPE html>
 </body>
 </html>'''
 
-# Écrire le fichier HTML
-with open('housing_searchprice.html', 'w', encoding='utf-8') as f:
-    f.write(html_content)
+# Écrire le fichier HTML (minifié, avec ses copies .gz / .br)
+sizes = write_artifact('housing_searchprice.html', minify_html(html_content))
 
 print("✅ Fichier HTML créé avec succès!")
-print(f"📊 Taille du fichier: {len(html_content):,} caractères")
+print(f"📊 Taille du fichier: {sizes['raw']:,} octets ({sizes['gz']:,} compressé gzip)")
 print(f"📊 Nombre d'enregistrements: {len(housing_data)}")
+print(f"📦 {len(shards)} fragments par ville dans {SHARD_DIR}/ (manifeste: {len(json_data):,} caractères)")
+
+enforce_budgets()
@@ -1,46 +1,215 @@
-from flask import Flask, render_template, request, jsonify
+import functools
+import hashlib
+import os
+import sys
+
+from flask import Flask, g, jsonify, make_response, render_template, request
 import pandas as pd
 
+# Shared data modules live at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import currency
+import housing_data
+import similarity
+import sql_engine
+from analytics import Analytics
+from anomalies import add_anomaly_flags
+from data_store import DataStore
+from metrics import add_derived_metrics
+from revisions import ReleaseStore
+
 app = Flask(__name__)
 
-# Load the data
-data_file = '../data/data_housing_unpivoted.xlsx'
-df = pd.read_excel(data_file)
+# Load the data; a new data file is picked up in the background without a restart
+store = DataStore().start()
+releases = ReleaseStore()
+
+# Responses are revalidated after a minute; unchanged data then costs a 304 with no body
+CACHE_CONTROL = 'public, max-age=60, must-revalidate'
+
+def versioned(view):
+    """Serve a GET view with a strong ETag and answer ``If-None-Match`` with 304.
+
+    The ETag is derived from the data version and the query string, so a
+    matching request is answered before the view does any work. The view
+    reads the data from ``g.snapshot``, the same version the ETag names.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.snapshot = store.current()
+        if request.method != 'GET':
+            return view(*args, **kwargs)
+
+        key = [g.snapshot.version, request.path, sorted(request.args.items(multi=True))]
+        if 'as_of' in request.args:
+            key.append(releases.releases()[-1:])  # a new release can change what as_of resolves to
+        if 'currency' in request.args:
+            key.append(currency.rates_version())
+        etag = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32]
+
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        return response
+    return wrapper
+
+INVALID_DATE = {'error': "Invalid 'start' or 'end' date, expected YYYY-MM-DD"}
+
+def parse_date(name):
+    """Optional ISO date query parameter (raises ValueError when malformed)."""
+    value = request.args.get(name)
+    return pd.Timestamp(value) if value else None
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/api/areas', methods=['GET'])
+@versioned
+def get_areas():
+    df = g.snapshot.df
+    areas = df[['Area', 'Is_District']].drop_duplicates('Area').sort_values('Area')
+    return jsonify({
+        'areas': housing_data.to_records(areas),
+        'rooms': sorted(df['Rooms'].unique()),
+        'first_quarter': df['Quarter_ts'].min().strftime('%Y-%m-%d'),
+        'last_quarter': df['Quarter_ts'].max().strftime('%Y-%m-%d'),
+        'currencies': currency.currencies(),
+    })
+
 @app.route('/api/data', methods=['GET'])
+@versioned
 def get_data():
     area = request.args.get('area')
+    rooms = request.args.get('rooms')
     start_year = request.args.get('start_year', type=int)
     end_year = request.args.get('end_year', type=int)
+    as_of = request.args.get('as_of')
+    display_currency = request.args.get('currency', currency.BASE).upper()
+    try:
+        start, end = parse_date('start'), parse_date('end')
+    except ValueError:
+        return jsonify(INVALID_DATE), 400
 
-    filtered_data = df
+    # Prices in another currency, converted once per data version (see currency.py)
+    try:
+        analytics = g.snapshot.converter.analytics(display_currency)
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 400
 
-    if area:
-        filtered_data = filtered_data[filtered_data['Area'] == area]
+    if as_of:
+        # Data as published on that date, see revisions.py
+        try:
+            release = releases.release_for(as_of)
+        except ValueError:
+            return jsonify({'error': f"Invalid 'as_of' date '{as_of}'"}), 400
+        if release is None:
+            return jsonify({'error': f"No release published on or before {as_of}"}), 404
+        analytics = release_analytics(release, display_currency, currency.rates_version())
 
-    if start_year:
-        filtered_data = filtered_data[filtered_data['Year'] >= start_year]
+    filtered_data = analytics.select(
+        areas=(area,) if area else None,
+        rooms=rooms,
+        start=start or (f'{start_year}-01-01' if start_year else None),
+        end=end or (f'{end_year}-12-31' if end_year else None),
+    )
+    return jsonify(housing_data.to_records(filtered_data))
 
-    if end_year:
-        filtered_data = filtered_data[filtered_data['Year'] <= end_year]
+@functools.lru_cache(maxsize=16)
+def release_analytics(release, display_currency, rates_version):
+    """``Analytics`` over a past release, built once per (release, currency, rates version)."""
+    df = housing_data.compact(add_anomaly_flags(add_derived_metrics(releases.as_of(release))))
+    return Analytics(currency.convert(df, display_currency))
 
-    return jsonify(filtered_data.to_dict(orient='records'))
+def ranking_args():
+    """Optional ``?n=``, ``?rooms=``, ``?start=`` / ``?end=`` and ``?exclude_anomalies=1`` of the ranking endpoints."""
+    return {
+        'n': request.args.get('n', 5, type=int),
+        'exclude_noisy': bool(request.args.get('exclude_anomalies', 0, type=int)),
+        'rooms': request.args.get('rooms'),
+        'start': parse_date('start'),
+        'end': parse_date('end'),
+    }
 
 @app.route('/api/top_gainers', methods=['GET'])
+@versioned
 def top_gainers():
-    gainers = df.groupby('Area')['Average Price'].last() - df.groupby('Area')['Average Price'].first()
-    top_gainers = gainers.nlargest(5).reset_index()
-    return jsonify(top_gainers.to_dict(orient='records'))
+    try:
+        args = ranking_args()
+    except ValueError:
+        return jsonify(INVALID_DATE), 400
+    top = g.snapshot.analytics.top_gainers(**args)
+    return jsonify(housing_data.to_records(top))
 
 @app.route('/api/top_losers', methods=['GET'])
+@versioned
 def top_losers():
-    losers = df.groupby('Area')['Average Price'].last() - df.groupby('Area')['Average Price'].first()
-    top_losers = losers.nsmallest(5).reset_index()
-    return jsonify(top_losers.to_dict(orient='records'))
+    try:
+        args = ranking_args()
+    except ValueError:
+        return jsonify(INVALID_DATE), 400
+    top = g.snapshot.analytics.top_losers(**args)
+    return jsonify(housing_data.to_records(top))
+
+@app.route('/api/similar', methods=['GET'])
+@versioned
+def similar_areas():
+    area = request.args.get('area')
+    rooms = request.args.get('rooms', 'All')
+    k = request.args.get('k', 5, type=int)
+    method = request.args.get('method', 'correlation')
+
+    if not area:
+        return jsonify({'error': "Missing 'area' parameter"}), 400
+    if method not in similarity.METHODS:
+        return jsonify({'error': f"Unknown method '{method}'"}), 400
+    if k is None or k < 1:
+        return jsonify({'error': "'k' must be a positive integer"}), 400
+
+    similar = g.snapshot['similarity'][method].top_k(area, rooms, k)
+    return jsonify(housing_data.to_records(similar))
+
+@app.route('/api/rollup', methods=['GET'])
+@versioned
+def rollup():
+    area = request.args.get('area', 'Israel')
+    rooms = request.args.get('rooms', 'All')
+
+    rollups = g.snapshot['rollups']
+    if area not in rollups.members and area not in rollups.parent:
+        return jsonify({'error': f"Unknown area '{area}'"}), 404
+
+    return jsonify({
+        'area': area,
+        'parent': rollups.up(area),
+        'members': rollups.members.get(area, []),
+        'latest_members': housing_data.to_records(rollups.down(area, rooms)),
+        'series': housing_data.to_records(rollups.series(area, rooms).reset_index()),
+    })
+
+@app.route('/api/query', methods=['GET', 'POST'])
+@versioned
+def sql_query():
+    payload = request.get_json(silent=True) or {}
+    sql = payload.get('sql') or request.args.get('sql')
+    params = payload.get('params')
+
+    if not sql_engine.available():
+        return jsonify({'error': 'SQL queries need the duckdb package'}), 501
+    if not sql:
+        return jsonify({'error': "Missing 'sql' parameter"}), 400
+
+    try:
+        result = g.snapshot['sql'].query(sql, params)
+    except sql_engine.QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(housing_data.to_records(result))
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -1,57 +1,107 @@
 // This file contains the JavaScript code for the web application. It handles user interactions, such as adjusting the time frame, comparing areas, and displaying top gainers and losers.
+//
+// Filtering happens on the server: only the selected area and date range are
+// transferred. API responses carry an ETag and a short max-age, so the browser
+// cache answers repeat requests and revalidates them with If-None-Match
+// afterwards (a 304 without a body while the data is unchanged).
 
 document.addEventListener('DOMContentLoaded', function() {
     const areaSelect = document.getElementById('area-select');
-    const timeframeSelect = document.getElementById('timeframe-select');
-    const compareButton = document.getElementById('compare-button');
-    const resultsDiv = document.getElementById('results');
+    const startDate = document.getElementById('start-date');
+    const endDate = document.getElementById('end-date');
+    const updateButton = document.getElementById('update-button');
+    const chartContainer = document.getElementById('chart-container');
+    const gainersList = document.getElementById('gainers-list');
+    const losersList = document.getElementById('losers-list');
 
-    // Load data from the server
-    async function loadData() {
-        const response = await fetch('/api/data');
+    async function getJSON(path, params) {
+        const query = new URLSearchParams();
+        Object.entries(params || {}).forEach(([key, value]) => {
+            if (value) query.set(key, value);
+        });
+        const url = query.toString() ? `${path}?${query}` : path;
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`${url}: ${response.status}`);
+        }
         return await response.json();
     }
 
-    // Update the visualization based on selected area and timeframe
+    // Populate the area select and the default date range
+    async function loadAreas() {
+        const meta = await getJSON('/api/areas');
+        meta.areas.forEach(item => {
+            const option = document.createElement('option');
+            option.value = item.Area;
+            option.textContent = item.Area;
+            areaSelect.appendChild(option);
+        });
+        startDate.min = endDate.min = meta.first_quarter;
+        startDate.max = endDate.max = meta.last_quarter;
+        startDate.value = startDate.value || meta.first_quarter;
+        endDate.value = endDate.value || meta.last_quarter;
+    }
+
+    // Fetch the selected area and time frame and display it
     async function updateVisualization() {
-        const selectedArea = areaSelect.value;
-        const selectedTimeframe = timeframeSelect.value;
-        const data = await loadData();
-
-        // Filter data based on user selection
-        const filteredData = data.filter(item => 
-            item.Area === selectedArea && 
-            item.Quarter_ts >= selectedTimeframe.start && 
-            item.Quarter_ts <= selectedTimeframe.end
-        );
-
-        // Display results
-        displayResults(filteredData);
+        const data = await getJSON('/api/data', {
+            area: areaSelect.value,
+            start: startDate.value,
+            end: endDate.value,
+        });
+        displayResults(data);
     }
 
-    // Display results in the resultsDiv
+    // Display results in the chart container
     function displayResults(data) {
-        resultsDiv.innerHTML = ''; // Clear previous results
+        chartContainer.innerHTML = ''; // Clear previous results
         if (data.length === 0) {
-            resultsDiv.innerHTML = '<p>No data available for the selected criteria.</p>';
+            chartContainer.innerHTML = '<p>No data available for the selected criteria.</p>';
             return;
         }
 
         // Create a table to display the data
         const table = document.createElement('table');
         const headerRow = document.createElement('tr');
-        headerRow.innerHTML = '<th>Area</th><th>Rooms</th><th>Average Price</th>';
+        headerRow.innerHTML = '<th>Quarter</th><th>Rooms</th><th>Average Price</th>';
         table.appendChild(headerRow);
 
         data.forEach(item => {
             const row = document.createElement('tr');
-            row.innerHTML = `<td>${item.Area}</td><td>${item.Rooms}</td><td>${item['Average Price']}</td>`;
+            row.innerHTML = `<td>${item.Quarter_ts}</td><td>${item.Rooms}</td><td>${item['Average Price']}</td>`;
             table.appendChild(row);
         });
 
-        resultsDiv.appendChild(table);
+        chartContainer.appendChild(table);
     }
 
-    // Event listener for the compare button
-    compareButton.addEventListener('click', updateVisualization);
-});
\ No newline at end of file
+    function displayRanking(list, items) {
+        list.innerHTML = '';
+        items.forEach(item => {
+            const li = document.createElement('li');
+            li.textContent = `${item.Area}: ${item['Change %'].toFixed(1)}%`;
+            list.appendChild(li);
+        });
+    }
+
+    async function loadRankings() {
+        const params = {start: startDate.value, end: endDate.value};
+        const [gainers, losers] = await Promise.all([
+            getJSON('/api/top_gainers', params),
+            getJSON('/api/top_losers', params),
+        ]);
+        displayRanking(gainersList, gainers);
+        displayRanking(losersList, losers);
+    }
+
+    function update() {
+        return Promise.all([updateVisualization(), loadRankings()]).catch(error => {
+            chartContainer.innerHTML = `<p>Could not load the data (${error.message}).</p>`;
+        });
+    }
+
+    // Event listener for the update button
+    updateButton.addEventListener('click', update);
+
+    loadAreas().then(update);
+});
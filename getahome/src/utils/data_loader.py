@@ -1,24 +1,32 @@
-import pandas as pd
+"""Thin wrappers over the shared analytics module (repository root), kept for existing callers.
+
+None of these modify the frame they are given; changes are computed per
+(Area, Rooms) series, see analytics.py.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+import analytics
+import housing_data
 
 def load_data(file_path):
     """Load historical average price data from an Excel file."""
-    df = pd.read_excel(file_path)
-    return df
+    return housing_data.load_data(file_path)
 
 def get_area_data(df, area):
     """Filter data for a specific area."""
-    return df[df['Area'] == area]
+    return analytics.select(df, areas=[area])
 
 def get_top_gainers(df, n=5):
-    """Identify top gainers based on average price increase."""
-    df['Price Change'] = df['Average Price'].diff()
-    return df.nlargest(n, 'Price Change')
+    """Areas with the largest price change (%) over the period of ``df``."""
+    return analytics.rank(analytics.area_changes(df), n, ascending=False)
 
 def get_top_losers(df, n=5):
-    """Identify top losers based on average price decrease."""
-    df['Price Change'] = df['Average Price'].diff()
-    return df.nsmallest(n, 'Price Change')
+    """Areas with the smallest price change (%) over the period of ``df``."""
+    return analytics.rank(analytics.area_changes(df), n, ascending=True)
 
 def filter_data_by_timeframe(df, start_year, end_year):
-    """Filter data based on a specified time frame."""
-    return df[(df['Year'] >= start_year) & (df['Year'] <= end_year)]
\ No newline at end of file
+    """Filter data based on a specified time frame (inclusive years)."""
+    return analytics.select(df, start=f'{start_year}-01-01', end=f'{end_year}-12-31')
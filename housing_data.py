@@ -0,0 +1,96 @@
+"""
+Shared loading helpers for the unpivoted housing dataset
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# GETAHOME_DATA_FILE points the apps at another snapshot (e.g. a synthetic one, see loadtest.py)
+DATA_FILE = os.environ.get('GETAHOME_DATA_FILE', os.path.join(BASE_DIR, 'data_housing_unpivoted.xlsx'))
+
+
+def data_version(path=DATA_FILE):
+    """Return a token that changes whenever the data file is rewritten."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def prepare(df):
+    """Make sure the derived columns every consumer relies on are present."""
+    if 'Quarter_ts' not in df.columns:
+        df['Quarter_ts'] = pd.PeriodIndex(
+            year=df['Year'],
+            quarter=df['Quarter'].str[0].astype(int),
+            freq='Q'
+        ).to_timestamp()
+    else:
+        df['Quarter_ts'] = pd.to_datetime(df['Quarter_ts'])
+
+    if 'Is_District' not in df.columns:
+        df['Is_District'] = df['Area'].str.contains("District", case=False, na=False)
+
+    if 'District' not in df.columns:
+        df['District'] = ''
+
+    return df
+
+
+def load_data(path=DATA_FILE):
+    """Load the unpivoted Excel (or CSV) file and normalize its columns."""
+    if str(path).endswith('.csv'):
+        return prepare(pd.read_csv(path))
+    return prepare(pd.read_excel(path))
+
+
+def compact(df):
+    """Return ``df`` with compact dtypes for holding it in memory once per process.
+
+    Label columns become categoricals, Year int16 and floats float32
+    (prices have 2 decimals, well within float32 precision). ``Quarter``
+    stays a label ('3Q') since the apps display it; its number is in
+    ``Quarter_ts``, which is datetime64.
+    """
+    out = df.copy()
+    for col in ['Area', 'Rooms', 'Currency', 'Quarter', 'District']:
+        if col in out.columns:
+            out[col] = out[col].astype('category')
+    if 'Year' in out.columns:
+        out['Year'] = out['Year'].astype('int16')
+    floats = out.select_dtypes('float64').columns
+    out[floats] = out[floats].astype('float32')
+    out['Quarter_ts'] = pd.to_datetime(out['Quarter_ts'])
+    return out
+
+
+def _plain(value):
+    """Nested value (list / struct cell, e.g. from a DuckDB query) as plain JSON types."""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat() if pd.notna(value) else None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def to_records(df):
+    """Convert a frame to JSON-safe records (ISO dates, None instead of NaN, lists for arrays)."""
+    out = df.copy()
+    for col in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].dt.strftime('%Y-%m-%d')
+        elif out[col].dtype == 'float32':
+            # 3.69 in float32 is 3.690000057220459 in float64
+            out[col] = out[col].astype('float64').round(6)
+        elif out[col].dtype == object:
+            out[col] = out[col].map(_plain)
+    out = out.astype(object).where(out.notna(), None)
+    return out.to_dict(orient='records')
@@ -0,0 +1,252 @@
+"""
+Streaming comparison of yad2 asking prices with CBS transaction prices
+
+Scraped listings are consumed one by one (straight from ``fetch_json`` or
+from a CSV written by ``to_csv``) and mapped onto the CBS Area x Rooms
+buckets. Each bucket keeps constant-size running statistics, so a crawl of
+any length is aggregated without holding it in memory.
+"""
+import ast
+import csv
+import math
+import re
+import sys
+
+import pandas as pd
+
+from scrapper import extract_rooms
+
+# yad2 city names (Hebrew) -> CBS area names
+CITY_NAMES = {
+    'תל אביב יפו': 'Tel Aviv',
+    'ירושלים': 'Jerusalem',
+    'חיפה': 'Haifa',
+    'אשדוד': 'Ashdod',
+    'אשקלון': 'Ashkelon',
+    'באר שבע': 'Beer Sheva',
+    'בית שמש': 'Beit Shemesh',
+    'בני ברק': 'Bnei Brak',
+    'בת ים': 'Bat Yam',
+    'חולון': 'Holon',
+    'כפר סבא': 'Kfar Saba',
+    'נתניה': 'Netanya',
+    'פתח תקווה': 'Petah Tiqwa',
+    'ראשון לציון': 'Rishon Lezion',
+    'רחובות': 'Rehovot',
+    'רמת גן': 'Ramat Gan',
+    'הרצליה': 'Herzlliya',
+    'חדרה': 'Hadera',
+}
+
+# CBS room labels -> (min rooms, max rooms)
+ROOM_BUCKETS = {
+    '1-2': (1, 2),
+    '3-2.5': (2.5, 3),
+    '4-3.5': (3.5, 4),
+    '5-4.5': (4.5, 5),
+    '6-5.5': (5.5, 6),
+}
+
+
+class P2Quantile:
+    """Streaming quantile estimate in O(1) memory (P-square algorithm, Jain & Chlamtac)."""
+
+    def __init__(self, p=0.5):
+        self.p = p
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(x)
+            heights.sort()
+            return
+
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if heights[i] <= x < heights[i + 1])
+
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Adjust the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - self.positions[i]
+            if (d >= 1 and self.positions[i + 1] - self.positions[i] > 1) or \
+                    (d <= -1 and self.positions[i - 1] - self.positions[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not heights[i - 1] < candidate < heights[i + 1]:
+                    candidate = heights[i] + d * (heights[i + d] - heights[i]) / (self.positions[i + d] - self.positions[i])
+                heights[i] = candidate
+                self.positions[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        if not self.heights:
+            return math.nan
+        if len(self.heights) < 5:
+            # Exact quantile of the few values seen so far
+            return self.heights[min(len(self.heights) - 1, int(round(self.p * (len(self.heights) - 1))))]
+        return self.heights[2]
+
+
+class BucketStats:
+    """Count, mean and streaming median of the asking prices in one bucket."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.median = P2Quantile(0.5)
+
+    def add(self, price):
+        self.count += 1
+        self.total += price
+        self.median.add(price)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+
+def parse_price(value):
+    """Asking price in NIS from a yad2 value such as ``'1,850,000 ₪'``."""
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    digits = re.sub(r'[^\d]', '', str(value or ''))
+    return float(digits) if digits else None
+
+
+def listing_rooms(item):
+    """Number of rooms of a listing, or the middle of its room range."""
+    value = item.get('rooms', item.get('Rooms_text'))
+    if value in (None, ''):
+        fields = item.get('row_4') or []
+        if isinstance(fields, str):
+            # to_csv writes the list of fields as its repr
+            try:
+                fields = ast.literal_eval(fields)
+            except (ValueError, SyntaxError):
+                fields = []
+        for field in fields:
+            if isinstance(field, dict) and field.get('key') == 'rooms':
+                value = field.get('value')
+    room_range = extract_rooms(value)
+    if room_range:
+        low, high = (float(x) for x in room_range.split('-'))
+        return (low + high) / 2
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def rooms_bucket(rooms):
+    """CBS room label for a room count, or None when it falls outside every bucket."""
+    if rooms is None:
+        return None
+    for label, (low, high) in ROOM_BUCKETS.items():
+        if low <= rooms <= high:
+            return label
+    return None
+
+
+class ListingAggregator:
+    """Running asking-price statistics per CBS (Area, Rooms) bucket.
+
+    Every listing also feeds the city's ``'All'`` bucket, matching the CBS
+    all-rooms series.
+    """
+
+    def __init__(self, city_names=None):
+        self.city_names = dict(CITY_NAMES if city_names is None else city_names)
+        self.buckets = {}
+        self.seen = 0
+        self.skipped = 0
+
+    def _area(self, city):
+        city = str(city or '').strip()
+        return self.city_names.get(city, city)
+
+    def add(self, item):
+        """Aggregate one listing; returns False when it could not be mapped."""
+        self.seen += 1
+        area = self._area(item.get('city'))
+        price = parse_price(item.get('price'))
+        if not area or price is None:
+            self.skipped += 1
+            return False
+
+        for rooms in ('All', rooms_bucket(listing_rooms(item))):
+            if rooms is not None:
+                self.buckets.setdefault((area, rooms), BucketStats()).add(price)
+        return True
+
+    def consume(self, listings):
+        """Aggregate an iterable of listings as it is produced; returns self."""
+        for item in listings:
+            self.add(item)
+        return self
+
+    def report(self, cbs_df):
+        """Asking vs. transaction price per (Area, Rooms) bucket.
+
+        ``cbs_df`` is the unpivoted CBS dataset; its latest quarter (in NIS
+        millions) is used as the transaction price.
+        """
+        stats = pd.DataFrame(
+            [(area, rooms, s.count, s.mean, s.median.value()) for (area, rooms), s in self.buckets.items()],
+            columns=['Area', 'Rooms', 'Listings', 'Mean Asking', 'Median Asking']
+        )
+        latest = cbs_df[cbs_df['Quarter_ts'] == cbs_df['Quarter_ts'].max()]
+        cbs = latest[['Area', 'Rooms', 'Average Price']].assign(
+            **{'CBS Price': latest['Average Price'] * 1_000_000}
+        ).drop(columns='Average Price')
+
+        # Match area names case-insensitively (yad2 and CBS spellings differ)
+        stats['_key'] = stats['Area'].str.lower()
+        cbs = cbs.assign(_key=cbs['Area'].str.lower()).drop(columns='Area')
+        result = stats.merge(cbs, on=['_key', 'Rooms'], how='inner').drop(columns='_key')
+        result['Premium %'] = (result['Median Asking'] / result['CBS Price'] - 1) * 100
+        return result.sort_values(['Area', 'Rooms']).reset_index(drop=True)
+
+    def city_report(self, cbs_df):
+        """Listing-weighted asking premium per city over its room buckets."""
+        buckets = self.report(cbs_df)
+        buckets = buckets[buckets['Rooms'] != 'All']
+        weighted = buckets['Premium %'] * buckets['Listings']
+        per_city = pd.DataFrame({
+            'Listings': buckets.groupby('Area')['Listings'].sum(),
+            'Premium %': weighted.groupby(buckets['Area']).sum() / buckets.groupby('Area')['Listings'].sum(),
+        })
+        return per_city.sort_values('Premium %', ascending=False).reset_index()
+
+
+def iter_csv(name):
+    """Stream listings back from a file written by ``scrapper.to_csv``."""
+    with open(name, newline='', encoding='utf-16') as csvfile:
+        yield from csv.DictReader(csvfile, delimiter='\t')
+
+
+if __name__ == '__main__':
+    import housing_data
+
+    aggregator = ListingAggregator().consume(iter_csv(sys.argv[1] if len(sys.argv) > 1 else "realestate_sale_data.csv"))
+    print(f"✅ Aggregated {aggregator.seen - aggregator.skipped} listings ({aggregator.skipped} skipped)")
+    print(aggregator.city_report(housing_data.load_data()).to_string(index=False))
@@ -0,0 +1,226 @@
+"""
+Local load test of the Flask API (getahome/src/app.py)
+
+Starts the app under waitress (the production WSGI server from
+getahome/requirements.txt, which also lists the requests client used
+here) in a subprocess, then replays a weighted mix of
+endpoint / parameter requests with closed-loop client threads at
+increasing concurrency. Every level reports throughput and latency
+percentiles per endpoint.
+
+``--scale N`` runs the same test against a synthetic dataset with N times
+as many areas as today (jittered copies of the real series), to see how
+the endpoints degrade with data size.
+
+Usage:
+    python loadtest.py [--scale 50] [--concurrency 1 2 4 8 16 32] [--duration 10] [--json report.json]
+
+The client threads share the machine with the server, so absolute numbers
+are only comparable between runs on the same host.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import requests
+
+import housing_data
+
+APP_DIR = os.path.join(housing_data.BASE_DIR, 'getahome', 'src')
+
+
+@dataclass
+class Endpoint:
+    """One kind of request in the mix; ``params(areas)`` draws its query parameters."""
+    name: str
+    path: str
+    weight: float
+    params: object = None
+
+
+# Weighted mix of what the front end (main.js) and widget callers ask for
+DEFAULT_MIX = [
+    Endpoint('data (area)', '/api/data', 4, lambda areas: {'area': random.choice(areas)}),
+    Endpoint('data (area, years)', '/api/data', 2,
+             lambda areas: {'area': random.choice(areas), 'start_year': random.randint(2015, 2024)}),
+    Endpoint('data (all)', '/api/data', 0.5),
+    Endpoint('top_gainers', '/api/top_gainers', 2),
+    Endpoint('top_losers', '/api/top_losers', 1),
+    Endpoint('similar', '/api/similar', 1, lambda areas: {'area': random.choice(areas), 'k': 5}),
+]
+
+
+@dataclass
+class Samples:
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+
+
+def synthetic_dataset(df, scale, seed=0):
+    """``scale`` jittered copies of every series, as extra areas (``Tel Aviv #2``, ...)."""
+    rng = np.random.default_rng(seed)
+    copies = [df]
+    for k in range(2, scale + 1):
+        copy = df.copy()
+        copy['Area'] = copy['Area'] + f' #{k}'
+        # One level shift per series plus a little noise per quarter
+        series = copy.groupby(['Area', 'Rooms']).ngroup().to_numpy()
+        level = rng.uniform(0.7, 1.3, series.max() + 1)[series]
+        noise = rng.normal(1, 0.02, len(copy))
+        copy['Average Price'] = (copy['Average Price'] * level * noise).round(2)
+        copies.append(copy)
+    return housing_data.prepare(pd.concat(copies, ignore_index=True))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, data_file=None, threads=8, log=None, timeout=300):
+    """Run the app under waitress and wait until it answers; returns the process.
+
+    The server output (including waitress' queue depth warnings, a sign of
+    saturation) goes to the ``log`` file object.
+    """
+    env = dict(os.environ)
+    if data_file:
+        env['GETAHOME_DATA_FILE'] = data_file
+    cmd = [sys.executable, '-m', 'waitress', f'--listen=127.0.0.1:{port}', f'--threads={threads}', 'app:app']
+    server = subprocess.Popen(cmd, cwd=APP_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}, see {getattr(log, 'name', 'its output')}")
+        try:
+            requests.get(f'http://127.0.0.1:{port}/api/top_gainers', timeout=5)
+            return server
+        except requests.ConnectionError:
+            time.sleep(0.5)
+    server.terminate()
+    raise TimeoutError(f"Server not ready after {timeout}s (the data snapshot may be too large)")
+
+
+def run_level(base_url, mix, areas, concurrency, duration):
+    """Closed-loop load: ``concurrency`` threads send requests back to back for ``duration`` seconds."""
+    samples = {e.name: Samples() for e in mix}
+    weights = [e.weight for e in mix]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def worker():
+        session = requests.Session()
+        local = {e.name: Samples() for e in mix}
+        while time.monotonic() < stop_at:
+            endpoint = random.choices(mix, weights)[0]
+            params = endpoint.params(areas) if endpoint.params else None
+            start = time.perf_counter()
+            try:
+                ok = session.get(base_url + endpoint.path, params=params, timeout=60).ok
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            if ok:
+                local[endpoint.name].latencies.append(elapsed)
+            else:
+                local[endpoint.name].errors += 1
+        with lock:
+            for name, s in local.items():
+                samples[name].latencies.extend(s.latencies)
+                samples[name].errors += s.errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    rows = []
+    for name, s in samples.items():
+        lat = np.array(s.latencies) * 1000
+        rows.append({
+            'concurrency': concurrency,
+            'endpoint': name,
+            'requests': len(lat),
+            'errors': s.errors,
+            'rps': len(lat) / elapsed,
+            'p50_ms': float(np.percentile(lat, 50)) if len(lat) else None,
+            'p95_ms': float(np.percentile(lat, 95)) if len(lat) else None,
+            'p99_ms': float(np.percentile(lat, 99)) if len(lat) else None,
+        })
+    total = sum(r['requests'] for r in rows)
+    rows.append({'concurrency': concurrency, 'endpoint': 'TOTAL', 'requests': total,
+                 'errors': sum(r['errors'] for r in rows), 'rps': total / elapsed,
+                 'p50_ms': None, 'p95_ms': None, 'p99_ms': None})
+    return rows
+
+
+def print_rows(rows):
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else '-'
+
+    for row in rows:
+        print(f"{row['concurrency']:>4} {row['endpoint']:<20} {row['requests']:>8} {row['errors']:>6} "
+              f"{fmt(row['rps'], '.1f'):>8} {fmt(row['p50_ms'], '.1f'):>8} "
+              f"{fmt(row['p95_ms'], '.1f'):>8} {fmt(row['p99_ms'], '.1f'):>8}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test the Flask API under waitress")
+    parser.add_argument('--scale', type=int, default=1, help="synthetic dataset with N times the areas")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--duration', type=float, default=10, help="seconds per concurrency level")
+    parser.add_argument('--threads', type=int, default=8, help="waitress worker threads")
+    parser.add_argument('--json', help="also write the results to this file")
+    parser.add_argument('--server-log', default='loadtest_server.log', help="where the server output goes")
+    args = parser.parse_args()
+
+    random.seed(0)
+    df = housing_data.load_data()
+    data_file = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.scale > 1:
+            df = synthetic_dataset(df, args.scale)
+            data_file = os.path.join(tmp, f'synthetic_x{args.scale}.csv')
+            df.to_csv(data_file, index=False)
+            print(f"🧪 Synthetic dataset: {len(df):,} rows, {df['Area'].nunique()} areas")
+
+        port = free_port()
+        log = open(args.server_log, 'w', encoding='utf-8')
+        server = start_server(port, data_file, args.threads, log)
+        try:
+            areas = sorted(df['Area'].unique())
+            results = []
+            print(f"{'conc':>4} {'endpoint':<20} {'requests':>8} {'errors':>6} "
+                  f"{'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+            for concurrency in args.concurrency:
+                rows = run_level(f'http://127.0.0.1:{port}', DEFAULT_MIX, areas, concurrency, args.duration)
+                print_rows(rows)
+                results.extend(rows)
+        finally:
+            server.terminate()
+            server.wait()
+            log.close()
+
+    saturated = sum('Task queue depth' in line for line in open(args.server_log, encoding='utf-8'))
+    if saturated:
+        print(f"⚠️  waitress queued requests {saturated} times (all worker threads busy), see {args.server_log}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'threads': args.threads, 'results': results}, f, indent=2)
+        print(f"✅ Results written to {args.json}")
@@ -0,0 +1,84 @@
+"""
+Derived per-series price metrics (QoQ, YoY, 5Y, CAGR, volatility)
+
+Computed once per data version and stored as extra columns of the dataset,
+so the dashboard, the API and the widget all read the same numbers.
+"""
+import numpy as np
+import pandas as pd
+
+SERIES_KEYS = ['Area', 'Rooms']
+
+# Output column -> number of quarters to look back
+CHANGE_COLUMNS = {
+    'QoQ %': 1,
+    'YoY %': 4,
+    '5Y %': 20,
+}
+METRIC_COLUMNS = list(CHANGE_COLUMNS) + ['CAGR 5Y %', 'Volatility %']
+
+
+def quarter_number(df):
+    """Consecutive integer per quarter (year * 4 + quarter - 1)."""
+    return df['Quarter_ts'].dt.year * 4 + df['Quarter_ts'].dt.quarter - 1
+
+
+def _quarter_grid(df):
+    """Expand every Area x Rooms series onto a gap-free quarterly grid.
+
+    CBS does not publish every quarter for every series, so a plain
+    ``shift(4)`` would not always mean "one year ago". On the grid, missing
+    quarters are NaN and the shifted lookups stay aligned.
+    """
+    observed = pd.DataFrame({
+        'Area': df['Area'].to_numpy(),
+        'Rooms': df['Rooms'].to_numpy(),
+        '_q': quarter_number(df).to_numpy(),
+        'Average Price': df['Average Price'].to_numpy(dtype=float),
+    })
+    bounds = observed.groupby(SERIES_KEYS, sort=True)['_q'].agg(['min', 'max'])
+    span = (bounds['max'] - bounds['min'] + 1).to_numpy()
+    starts = np.cumsum(span) - span
+    offset = np.arange(span.sum()) - np.repeat(starts, span)
+
+    grid = pd.DataFrame({
+        'Area': np.repeat(bounds.index.get_level_values('Area').to_numpy(), span),
+        'Rooms': np.repeat(bounds.index.get_level_values('Rooms').to_numpy(), span),
+        '_q': np.repeat(bounds['min'].to_numpy(), span) + offset,
+    })
+    return grid.merge(observed, on=SERIES_KEYS + ['_q'], how='left')
+
+
+def compute_metrics(df, vol_window=8):
+    """Return the metric columns for each (Area, Rooms, quarter) of ``df``.
+
+    All values are percentages. Volatility is the annualized rolling
+    standard deviation of quarterly returns over ``vol_window`` quarters.
+    """
+    grid = _quarter_grid(df)
+    price = grid['Average Price']
+    grouped = price.groupby([grid['Area'], grid['Rooms']], sort=False)
+
+    for col, lag in CHANGE_COLUMNS.items():
+        grid[col] = (price / grouped.shift(lag) - 1) * 100
+
+    grid['CAGR 5Y %'] = ((price / grouped.shift(20)) ** (1 / 5) - 1) * 100
+
+    returns = grid['QoQ %'] / 100
+    volatility = (
+        returns.groupby([grid['Area'], grid['Rooms']], sort=False)
+        .rolling(vol_window, min_periods=4)
+        .std()
+        .reset_index(level=[0, 1], drop=True)
+    )
+    grid['Volatility %'] = volatility * np.sqrt(4) * 100
+
+    return grid.dropna(subset=['Average Price'])[SERIES_KEYS + ['_q'] + METRIC_COLUMNS]
+
+
+def add_derived_metrics(df, vol_window=8):
+    """Return a copy of ``df`` with the derived metric columns appended."""
+    out = df.drop(columns=[c for c in METRIC_COLUMNS if c in df.columns])
+    out['_q'] = quarter_number(out)
+    out = out.merge(compute_metrics(out, vol_window), on=SERIES_KEYS + ['_q'], how='left')
+    return out.drop(columns='_q')
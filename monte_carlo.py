@@ -0,0 +1,97 @@
+"""
+Monte Carlo price paths per (Area, Rooms) series
+
+Future quarterly returns are drawn by moving-block bootstrap from each
+series' own history (blocks keep the short-term momentum of housing
+prices). Paths are simulated as one array per series, and series are
+spread over a pool of spawned (not forked) processes, so the pool is also
+safe from the threads of a server (``workers=1`` runs in-process). Only quantiles are kept, per quarter ahead,
+for the price and the all-in purchase cost (see budget.py), which is what
+the fan charts need.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from budget import all_in_cost
+from metrics import SERIES_KEYS
+
+HORIZONS = {'1Y': 4, '3Y': 12, '5Y': 20}
+QUANTILES = (5, 25, 50, 75, 95)
+QUANTILE_COLUMNS = [f'P{q}' for q in QUANTILES]
+
+# Below this many series the pool start-up costs more than it saves
+MIN_SERIES_PER_WORKER = 64
+
+
+def block_bootstrap(returns, n_paths, n_quarters, block=4, rng=None):
+    """Resample ``returns`` into an (n_paths, n_quarters) array of consecutive blocks."""
+    rng = np.random.default_rng(rng)
+    returns = np.asarray(returns, dtype=float)
+    block = max(1, min(block, len(returns)))
+    n_blocks = -(-n_quarters // block)
+    starts = rng.integers(0, len(returns) - block + 1, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :n_quarters]
+    return returns[idx]
+
+
+def simulate_series(returns, last_price, n_paths=5000, n_quarters=20, block=4, rng=None):
+    """Price paths of shape (n_paths, n_quarters) starting from ``last_price``."""
+    sampled = block_bootstrap(returns, n_paths, n_quarters, block, rng)
+    return last_price * np.cumprod(1 + sampled, axis=1)
+
+
+def _simulate_chunk(chunk, n_paths, n_quarters, block):
+    """Quantile rows for a list of (area, rooms, returns, last_price, seed)."""
+    rows = []
+    for area, rooms, returns, last_price, seed in chunk:
+        paths = simulate_series(returns, last_price, n_paths, n_quarters, block, seed)
+        prices = np.percentile(paths, QUANTILES, axis=0).T
+        # The all-in cost increases with the price, so its quantiles are the cost of
+        # the price quantiles (prices are in NIS millions, costs computed in NIS)
+        costs = all_in_cost(prices * 1_000_000) / 1_000_000
+        for measure, quantiles in (('Price', prices), ('All-in Cost', costs)):
+            for ahead in range(n_quarters):
+                rows.append((area, rooms, measure, ahead + 1, *quantiles[ahead]))
+    return rows
+
+
+def simulate_all(df, n_paths=5000, n_quarters=20, block=4, min_history=8, seed=0, workers=None):
+    """Simulate every series of ``df`` (which needs the ``QoQ %`` metric column).
+
+    Returns one row per series, measure and quarter ahead with the ``P5`` ..
+    ``P95`` quantiles, in NIS millions like the dataset. Results are
+    reproducible for a given ``seed``.
+    """
+    data = df.dropna(subset=['QoQ %']).sort_values('Quarter_ts')
+    latest = df.sort_values('Quarter_ts').groupby(SERIES_KEYS)['Average Price'].last()
+    history = data.groupby(SERIES_KEYS)['QoQ %'].agg(list)
+    history = history[history.str.len() >= min_history]
+
+    seeds = np.random.SeedSequence(seed).spawn(len(history))
+    tasks = [(area, rooms, np.asarray(r) / 100, latest[(area, rooms)], s)
+             for ((area, rooms), r), s in zip(history.items(), seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks) // MIN_SERIES_PER_WORKER))
+    if workers == 1:
+        rows = _simulate_chunk(tasks, n_paths, n_quarters, block)
+    else:
+        chunks = [tasks[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            parts = pool.map(_simulate_chunk, chunks, [n_paths] * workers, [n_quarters] * workers, [block] * workers)
+            rows = [row for part in parts for row in part]
+
+    columns = SERIES_KEYS + ['Measure', 'Quarters Ahead'] + QUANTILE_COLUMNS
+    return pd.DataFrame(rows, columns=columns).sort_values(SERIES_KEYS + ['Measure', 'Quarters Ahead'], ignore_index=True)
+
+
+def horizon_summary(fan, area, rooms='All'):
+    """Quantiles at the 1-, 3- and 5-year horizons for one series."""
+    series = fan[(fan['Area'] == area) & (fan['Rooms'] == rooms)]
+    rows = series[series['Quarters Ahead'].isin(HORIZONS.values())].copy()
+    rows['Horizon'] = rows['Quarters Ahead'].map({v: k for k, v in HORIZONS.items()})
+    return rows[['Measure', 'Horizon'] + QUANTILE_COLUMNS].reset_index(drop=True)
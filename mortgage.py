@@ -0,0 +1,137 @@
+"""
+Vectorized multi-track mortgage amortization
+
+Israeli mortgages mix several tracks (maslulim): prime, fixed non-linked
+(kalatz) and fixed CPI-linked (katz). Each track is an annuity on its share
+of the loan; CPI-linked tracks amortize at the real rate and their payments
+and balance are indexed to an assumed inflation.
+
+Everything is computed with NumPy broadcasting over
+loans x track mixes x terms x tracks x months, so hundreds of financing
+options are compared in one call.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Indicative annual rates, to update with current bank offers
+TRACKS = {
+    'prime': {'rate': 0.060, 'cpi_linked': False},      # Bank of Israel rate + 1.5%
+    'fixed': {'rate': 0.050, 'cpi_linked': False},      # kalatz
+    'cpi_fixed': {'rate': 0.035, 'cpi_linked': True},   # katz, real rate
+}
+INFLATION = 0.025
+
+# Track shares (prime, fixed, cpi_fixed) of a few typical mixes
+MIXES = {
+    'Prime 1/3 - Fixed 1/3 - CPI 1/3': (1 / 3, 1 / 3, 1 / 3),
+    'Prime 2/3 - Fixed 1/3': (2 / 3, 1 / 3, 0),
+    'Prime 1/3 - Fixed 2/3': (1 / 3, 2 / 3, 0),
+    'Fixed 100%': (0, 1, 0),
+    'Prime 1/3 - CPI 2/3': (1 / 3, 0, 2 / 3),
+}
+TERMS = (15, 20, 25, 30)
+
+
+def amortize(principal, mixes, years, rates=None, cpi_linked=None, inflation=INFLATION):
+    """Monthly payment schedules for every loan x mix x term.
+
+    Args:
+        principal: loan amounts, shape (L,)
+        mixes: track shares per mix, shape (M, T), rows summing to 1
+        years: loan terms in years, shape (N,)
+        rates: annual rate per track, shape (T,) (defaults to TRACKS)
+        cpi_linked: whether each track is CPI-linked, shape (T,)
+        inflation: assumed annual CPI inflation for linked tracks
+
+    Returns:
+        dict of arrays: ``payments`` and ``balance`` with shape
+        (L, M, N, months), and ``first_payment``, ``max_payment``,
+        ``total_paid``, ``total_interest`` with shape (L, M, N).
+        ``total_interest`` includes CPI indexation.
+    """
+    if rates is None:
+        rates = [t['rate'] for t in TRACKS.values()]
+    if cpi_linked is None:
+        cpi_linked = [t['cpi_linked'] for t in TRACKS.values()]
+
+    principal = np.asarray(principal, dtype=float).reshape(-1, 1, 1, 1, 1)
+    mixes = np.atleast_2d(np.asarray(mixes, dtype=float))[None, :, None, :, None]
+    n = (np.asarray(years, dtype=float).reshape(1, 1, -1, 1, 1) * 12).astype(int)
+    r = (np.asarray(rates, dtype=float) / 12).reshape(1, 1, 1, -1, 1)
+    linked = np.asarray(cpi_linked, dtype=bool).reshape(1, 1, 1, -1, 1)
+
+    months = np.arange(1, n.max() + 1).reshape(1, 1, 1, 1, -1)
+    active = months <= n
+
+    # Annuity factor (falls back to straight-line repayment at a zero rate)
+    growth_n = (1 + r) ** n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = np.where(r > 0, r * growth_n / (growth_n - 1), 1 / n)
+        remaining = np.where(r > 0, (growth_n - (1 + r) ** months) / (growth_n - 1), 1 - months / n)
+
+    monthly_inflation = (1 + inflation) ** (1 / 12) - 1
+    index = np.where(linked, (1 + monthly_inflation) ** months, 1.0)
+
+    track_principal = principal * mixes
+    payments = np.where(active, track_principal * factor * index, 0.0).sum(axis=3)
+    balance = np.where(active, track_principal * remaining * index, 0.0).sum(axis=3)
+
+    total_paid = payments.sum(axis=-1)
+    return {
+        'payments': payments,
+        'balance': balance,
+        'first_payment': payments[..., 0],
+        'max_payment': payments.max(axis=-1),
+        'total_paid': total_paid,
+        'total_interest': total_paid - principal.reshape(-1, 1, 1),
+    }
+
+
+def compare_financing(price, down_payment_pct, monthly_income, mixes=None, terms=TERMS, **kwargs):
+    """Compare every mix x term for one purchase price.
+
+    The loan follows the simulator rule
+    ``Montant_pret = Prix_achat x (1 - Apport_%)``. ``down_payment_pct`` may
+    be a list to compare several down payments at once. Returns one row per
+    option, cheapest total interest first; ``PTI %`` is the highest monthly
+    payment relative to ``monthly_income``.
+    """
+    mixes = MIXES if mixes is None else mixes
+    down = np.atleast_1d(np.asarray(down_payment_pct, dtype=float))
+    loans = price * (1 - down / 100)
+    result = amortize(loans, list(mixes.values()), terms, **kwargs)
+
+    shape = result['total_paid'].shape
+    grid = np.indices(shape).reshape(3, -1)
+    options = pd.DataFrame({
+        'Down Payment %': down[grid[0]],
+        'Mix': np.array(list(mixes))[grid[1]],
+        'Years': np.asarray(terms)[grid[2]],
+        'Loan': loans[grid[0]],
+        'First Payment': result['first_payment'].ravel(),
+        'Max Payment': result['max_payment'].ravel(),
+        'Total Interest': result['total_interest'].ravel(),
+    })
+    options['PTI %'] = options['Max Payment'] / monthly_income * 100
+    return options.sort_values('Total Interest').reset_index(drop=True)
+
+
+def latest_price(df, area, rooms='All'):
+    """Latest CBS average price in NIS for an area and room type (data is in NIS millions)."""
+    series = df[(df['Area'] == area) & (df['Rooms'] == rooms)]
+    if series.empty:
+        raise KeyError(f"No data for {area} - {rooms}")
+    return series.loc[series['Quarter_ts'].idxmax(), 'Average Price'] * 1_000_000
+
+
+if __name__ == '__main__':
+    import housing_data
+
+    area = sys.argv[1] if len(sys.argv) > 1 else 'Tel Aviv'
+    rooms = sys.argv[2] if len(sys.argv) > 2 else '4-3.5'
+    price = latest_price(housing_data.load_data(), area, rooms)
+    options = compare_financing(price, [25, 30, 40], monthly_income=40_000)
+    print(f"🏠 {area} - {rooms}: ₪{price:,.0f}, {len(options)} financing options")
+    print(options.head(10).to_string(index=False, float_format=lambda x: f"{x:,.0f}"))
@@ -0,0 +1,168 @@
+"""
+As-of versioned storage of CBS releases
+
+CBS revises recent quarters, so every ingest is recorded as a release keyed
+by its publication date. A release only stores the cells that changed since
+the previous one (plus the rows that disappeared); a full checkpoint is
+written every ``checkpoint_every`` releases so reconstructing any release
+replays at most that many deltas.
+
+Usage:
+    python revisions.py ingest data_housing_unpivoted.xlsx 2025-11-15
+    python revisions.py list
+"""
+import glob
+import gzip
+import json
+import os
+import sys
+from functools import lru_cache
+
+import pandas as pd
+
+import data_quality
+import housing_data
+
+RELEASES_DIR = os.path.join(housing_data.BASE_DIR, 'releases')
+KEY = ['Area', 'Rooms', 'Quarter_ts']
+
+
+def _cells(df):
+    """Long form of a snapshot: one row per (Area, Rooms, Quarter_ts, column) cell."""
+    df = df.copy()
+    df['Quarter_ts'] = pd.to_datetime(df['Quarter_ts']).dt.strftime('%Y-%m-%d')
+    values = [c for c in df.columns if c not in KEY]
+    cells = df.astype({c: object for c in values}).melt(
+        id_vars=KEY, value_vars=values, var_name='column', value_name='value'
+    )
+    return cells
+
+
+def _changed_cells(old, new):
+    """Cells of ``new`` that are missing from or different in ``old``."""
+    merged = new.merge(old, on=KEY + ['column'], how='left', suffixes=('', '_old'), indicator=True)
+    both_missing = merged['value'].isna() & merged['value_old'].isna()
+    changed = (merged['_merge'] == 'left_only') | ((merged['value'] != merged['value_old']) & ~both_missing)
+    return merged.loc[changed, KEY + ['column', 'value']]
+
+
+def _removed_rows(old, new):
+    old_keys = old[KEY].drop_duplicates()
+    merged = old_keys.merge(new[KEY].drop_duplicates(), on=KEY, how='left', indicator=True)
+    return merged.loc[merged['_merge'] == 'left_only', KEY]
+
+
+def _json_ready(df):
+    return df.astype(object).where(df.notna(), None).values.tolist()
+
+
+class ReleaseStore:
+    """Directory of CBS releases, one gzipped JSON file per release date."""
+
+    def __init__(self, directory=RELEASES_DIR, checkpoint_every=12):
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        # Reconstructed releases are immutable, so they can be memoized per store
+        self._frame = lru_cache(maxsize=8)(self._reconstruct)
+
+    def _path(self, release):
+        return os.path.join(self.directory, f"{release}.json.gz")
+
+    def _read(self, release):
+        with gzip.open(self._path(release), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def releases(self):
+        """Release dates (ISO strings), oldest first."""
+        files = glob.glob(os.path.join(self.directory, '*.json.gz'))
+        return sorted(os.path.basename(f)[:-len('.json.gz')] for f in files)
+
+    def release_for(self, as_of):
+        """Latest release published on or before ``as_of`` (None if there is none)."""
+        as_of = pd.Timestamp(as_of).date().isoformat()
+        candidates = [r for r in self.releases() if r <= as_of]
+        return candidates[-1] if candidates else None
+
+    def ingest(self, df, release_date):
+        """Record ``df`` as the release published on ``release_date``; returns the number of stored cells.
+
+        Raises ``data_quality.DataQualityError`` if ``df`` fails the quality gate.
+        """
+        release = pd.Timestamp(release_date).date().isoformat()
+        existing = self.releases()
+        if existing and release <= existing[-1]:
+            raise ValueError(f"Release {release} is not newer than the latest release {existing[-1]}")
+        data_quality.require(df)
+
+        new = _cells(df)
+        checkpoint = len(existing) % self.checkpoint_every == 0
+        if checkpoint:
+            cells, removed = new, new.iloc[:0][KEY]
+        else:
+            old = self._cells_for(existing[-1])
+            cells, removed = _changed_cells(old, new), _removed_rows(old, new)
+
+        record = {
+            'release': release,
+            'checkpoint': checkpoint,
+            'columns': list(df.columns),
+            'cells': _json_ready(cells),
+            'removed': _json_ready(removed),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(release) + '.tmp'
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, self._path(release))
+        return len(cells)
+
+    def _cells_for(self, release):
+        """Cells of a release: latest checkpoint at or before it plus the deltas since."""
+        chain = [r for r in self.releases() if r <= release]
+        records = []
+        for r in reversed(chain):
+            records.append(self._read(r))
+            if records[-1]['checkpoint']:
+                break
+        records.reverse()
+
+        cells = pd.DataFrame(records[0]['cells'], columns=KEY + ['column', 'value'])
+        for record in records[1:]:
+            if record['removed']:
+                removed = pd.DataFrame(record['removed'], columns=KEY)
+                keep = cells.merge(removed, on=KEY, how='left', indicator=True)['_merge'] == 'left_only'
+                cells = cells[keep.to_numpy()]
+            delta = pd.DataFrame(record['cells'], columns=KEY + ['column', 'value'])
+            cells = pd.concat([cells, delta], ignore_index=True).drop_duplicates(KEY + ['column'], keep='last')
+        return cells
+
+    def _reconstruct(self, release):
+        columns = self._read(release)['columns']
+        cells = self._cells_for(release)
+        df = cells.pivot(index=KEY, columns='column', values='value').reset_index()
+        df.columns.name = None
+        df = df[[c for c in columns if c in df.columns]].infer_objects()
+        df['Quarter_ts'] = pd.to_datetime(df['Quarter_ts'])
+        return df.sort_values(['Quarter_ts', 'Area', 'Rooms']).reset_index(drop=True)
+
+    def as_of(self, date):
+        """The dataset as it was published on ``date`` (a copy, safe to modify)."""
+        release = self.release_for(date)
+        if release is None:
+            raise KeyError(f"No release published on or before {date}")
+        return self._frame(release).copy()
+
+
+if __name__ == '__main__':
+    store = ReleaseStore()
+    if len(sys.argv) == 4 and sys.argv[1] == 'ingest':
+        try:
+            cells = store.ingest(housing_data.load_data(sys.argv[2]), sys.argv[3])
+        except data_quality.DataQualityError as e:
+            print(e.report.summary())
+            sys.exit(f"❌ Release {sys.argv[3]} not stored: {e}")
+        print(f"✅ Release {sys.argv[3]} stored ({cells} changed cells)")
+    elif len(sys.argv) == 2 and sys.argv[1] == 'list':
+        print('\n'.join(store.releases()) or "No releases yet")
+    else:
+        print(__doc__)
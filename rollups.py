@@ -0,0 +1,89 @@
+"""
+Materialized city -> district -> Israel rollups
+
+Built once per data version (see data_store.py): for every district and
+for Israel, per Rooms x quarter, the mean, median, min and max of the
+member cities' average prices and the number of contributing cities,
+next to the figure CBS publishes for that level. The hierarchy is stored
+as parent / member lookups, so views drill down or up with an index
+lookup instead of a groupby.
+
+CBS district figures are transaction-weighted, the rollups are plain
+statistics over cities, so both are kept.
+"""
+import pandas as pd
+
+NATIONAL = 'Israel'
+KEY = ['Name', 'Rooms', 'Quarter_ts']
+STAT_COLUMNS = ['Mean', 'Median', 'Min', 'Max', 'Cities']
+
+
+class Rollups:
+    """City -> district -> Israel hierarchy and its per Rooms x quarter aggregates.
+
+    Attributes:
+        parent: area -> enclosing area (city -> district -> Israel)
+        members: district or Israel -> sorted list of its direct members
+        table: aggregates indexed by (Name, Rooms, Quarter_ts), with the
+            ``Level``, ``Published`` and ``STAT_COLUMNS`` columns
+    """
+
+    def __init__(self, df):
+        districts = sorted(df.loc[df['Is_District'], 'Area'].unique())
+        cities = df[~df['Is_District'] & (df['Area'] != NATIONAL)]
+
+        # The District column may not be spelled like the district's own Area ('center District')
+        by_lower = {d.lower(): d for d in districts}
+        city_district = cities.drop_duplicates('Area').set_index('Area')['District']
+        city_district = city_district.map(lambda d: by_lower.get(str(d).lower(), d))
+
+        self.parent = {**city_district.to_dict(), **{d: NATIONAL for d in districts}}
+        self.members = {d: sorted(city_district.index[city_district == d]) for d in districts}
+        self.members[NATIONAL] = districts
+
+        prices = cities[['Area', 'Rooms', 'Quarter_ts', 'Average Price']].assign(
+            District=cities['Area'].map(city_district).to_numpy()
+        )
+        stats = {'Mean': 'mean', 'Median': 'median', 'Min': 'min', 'Max': 'max', 'Cities': 'count'}
+        by_district = prices.groupby(['District', 'Rooms', 'Quarter_ts'], observed=True)['Average Price'].agg(
+            list(stats.values()))
+        by_district.index = by_district.index.set_names(KEY)
+        national = prices.groupby(['Rooms', 'Quarter_ts'], observed=True)['Average Price'].agg(list(stats.values()))
+        national.index = pd.MultiIndex.from_arrays(
+            [[NATIONAL] * len(national), national.index.get_level_values(0), national.index.get_level_values(1)],
+            names=KEY)
+
+        table = pd.concat([by_district.assign(Level='District'), national.assign(Level='National')])
+        table = table.rename(columns={v: k for k, v in stats.items()})
+        published = df.set_index(['Area', 'Rooms', 'Quarter_ts'])['Average Price']
+        published.index = published.index.set_names(KEY)
+        table['Published'] = published.reindex(table.index).to_numpy()
+        self.table = table[['Level', 'Published'] + STAT_COLUMNS].sort_index()
+
+        # City prices by (Area, Rooms, Quarter_ts), for drill-down lookups
+        self._prices = df.set_index(['Area', 'Rooms', 'Quarter_ts'])['Average Price'].sort_index()
+
+    def series(self, name, rooms='All'):
+        """Aggregates of a district (or Israel) over time, one row per quarter."""
+        try:
+            return self.table.loc[(name, rooms)]
+        except KeyError:
+            return self.table.iloc[:0].droplevel([0, 1])
+
+    def up(self, area):
+        """The area one level up (None for Israel or an unknown area)."""
+        return self.parent.get(area)
+
+    def down(self, area, rooms='All', quarter=None):
+        """Latest (or ``quarter``) published prices of the direct members of ``area``."""
+        members = self.members.get(area, [])
+        rows = []
+        for member in members:
+            try:
+                series = self._prices.loc[(member, rooms)]
+            except KeyError:
+                continue
+            ts = series.index.max() if quarter is None else pd.Timestamp(quarter)
+            if ts in series.index:
+                rows.append((member, ts, series.loc[ts]))
+        return pd.DataFrame(rows, columns=['Area', 'Quarter_ts', 'Average Price'])
@@ -1,10 +1,266 @@
 LinkTemplate = """https://gw.yad2.co.il/feed-search-legacy/products/%s?category=%d&item=%d&page=%d&forceLdLoad=true"""
+OptionsTemplate = """https://gw.yad2.co.il/search-options/products/%s?fields=%s&category=%d"""
 import requests 
 import csv
+import hashlib
 import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from itertools import chain
 
-def fetch_json(section : str  , catgeory : int, item : int , printIt= False , page : int =0, limit : int = None, count : int = 0):
+# next to this script, wherever the crawl is started from
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".yad2_cache")
+OPTIONS_TTL = 7 * 24 * 3600  # search options (categories, areas) rarely change
+
+TIMEOUT = 30  # seconds per attempt
+RETRIES = 3  # extra attempts on connection errors, timeouts and RETRY_STATUSES
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF = 1.0  # seconds before the first retry, doubled on each one (unless Retry-After says otherwise)
+MAX_BACKOFF = 60.0  # longest wait before a retry, whatever Retry-After asks for
+RATE_WINDOW = 10.0  # seconds of recent pages behind the progress line's rate estimate
+
+class DiskCache:
+    '''persistent JSON cache with a time-to-live, one file per key
+    
+    Args:
+        directory: folder holding the cache files
+        ttl: seconds an entry stays fresh (None = never expires)
+    '''
+    def __init__(self, directory : str = CACHE_DIR, ttl : float = OPTIONS_TTL):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, key):
+        digest = hashlib.sha1(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".json")
+
+    def get(self, key, fresh_only : bool = True):
+        '''return the cached entry for key, or None if missing (or expired when fresh_only)'''
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if fresh_only and self.ttl is not None and time.time() - entry["stored_at"] > self.ttl:
+            return None
+        return entry
+
+    def set(self, key, value, **meta):
+        os.makedirs(self.directory, exist_ok=True)
+        # unique temp file: concurrent crawl jobs may store the same key at once
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump(dict(meta, key=key, value=value, stored_at=time.time()), f, ensure_ascii=False)
+            os.replace(tmp, self._path(key))  # atomic, readers never see a half-written file
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+options_cache = DiskCache()
+page_cache = DiskCache(os.path.join(CACHE_DIR, "pages"), ttl=None)  # feed pages, always revalidated
+
+@dataclass
+class RequestRecord:
+    '''timing and outcome of one page request (all times in seconds)'''
+    url : str
+    status : object = None  # HTTP status of the last attempt, or "error" when none succeeded
+    latency : float = 0.0  # last attempt, request sent -> body received
+    throttled : float = 0.0  # waiting for the rate limiter
+    backoff : float = 0.0  # sleeping between retries
+    parse : float = 0.0  # decoding the JSON body
+    size : int = 0  # body bytes
+    retries : int = 0
+    items : int = 0
+    error : str = None
+    retry_after : str = None  # Retry-After header of the last retried response, as sent
+
+class CrawlTelemetry:
+    '''per-request measurements of a crawl, a live progress line and a JSON report
+    
+    Thread safe: the jobs of a CrawlScheduler can share one instance.
+    
+    Args:
+        name: crawl name shown in the progress line and the report
+        progress: print a live progress line (overwritten in place) to stream,
+            by default only when stream is a terminal
+        stream: where the progress line goes
+    '''
+    def __init__(self, name : str = "crawl", progress : bool = None, stream = sys.stderr):
+        self.name = name
+        self.progress = stream.isatty() if progress is None else progress
+        self.stream = stream
+        self.records = []
+        self.finished = []  # monotonic time each record was added, for the recent rate
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._last_progress = 0.0
+
+    def add(self, record : RequestRecord):
+        with self._lock:
+            self.records.append(record)
+            self.finished.append(time.monotonic())
+            if self.progress and time.monotonic() - self._last_progress >= 0.5:
+                self._last_progress = time.monotonic()
+                self.stream.write("\r" + self.progress_line())
+                self.stream.flush()
+
+    def clear(self):
+        '''erase the progress line, so other output can be printed'''
+        if self.progress:
+            self.stream.write("\r\x1b[K")
+            self.stream.flush()
+
+    def progress_line(self):
+        now = time.monotonic()
+        elapsed = now - self.started
+        items = sum(r.items for r in self.records)
+        errors = sum(r.status == "error" for r in self.records)
+        retries = sum(r.retries for r in self.records)
+        # rate over the last RATE_WINDOW seconds, so a slowdown shows up quickly
+        window = min(RATE_WINDOW, elapsed)
+        recent = sum(r.items for r, t in zip(self.records, self.finished) if now - t <= RATE_WINDOW)
+        rate = recent / window if window else 0.0
+        return (f"📡 {self.name}: {len(self.records)} pages, {items} items in {elapsed:.0f}s, "
+                f"~{rate:.1f} items/s, {retries} retries, {errors} errors   ")
+
+    def report(self):
+        '''aggregate of every request so far (JSON-serializable)'''
+        with self._lock:
+            records = list(self.records)
+        elapsed = time.monotonic() - self.started
+        ok = [r for r in records if r.status != "error"]
+        statuses = {}
+        for r in records:
+            statuses[str(r.status)] = statuses.get(str(r.status), 0) + 1
+        items = sum(r.items for r in records)
+
+        def ms(values):
+            values = sorted(values)
+            if not values:
+                return {"p50": None, "p95": None, "max": None}
+            pick = lambda q: values[min(len(values) - 1, int(q * len(values)))] * 1000
+            return {"p50": round(pick(0.5), 1), "p95": round(pick(0.95), 1), "max": round(values[-1] * 1000, 1)}
+
+        return {
+            "name": self.name,
+            "elapsed_s": round(elapsed, 3),
+            "requests": len(records),
+            "items": items,
+            "bytes": sum(r.size for r in records),
+            "items_per_s": round(items / elapsed, 3) if elapsed else 0.0,
+            "requests_per_s": round(len(records) / elapsed, 3) if elapsed else 0.0,
+            "items_per_page": round(items / len(ok), 2) if ok else None,
+            "empty_pages": sum(r.items == 0 for r in ok),
+            "latency_ms": ms([r.latency for r in ok]),
+            "parse_ms": ms([r.parse for r in ok]),
+            "throttled_s": round(sum(r.throttled for r in records), 3),
+            "backoff_s": round(sum(r.backoff for r in records), 3),
+            "retries": sum(r.retries for r in records),
+            "retried_requests": sum(r.retries > 0 for r in records),
+            "status": statuses,
+            "error_rate": round(statuses.get("error", 0) / len(records), 4) if records else 0.0,
+            "not_modified": statuses.get("304", 0),
+            "errors": [f"{r.url}: {r.error}" for r in records if r.error][:20],
+        }
+
+    def write_report(self, path : str):
+        '''end the progress line and write report() as JSON to path'''
+        if self.progress:
+            with self._lock:
+                self.stream.write("\r" + self.progress_line() + "\n")
+                self.stream.flush()
+        report = self.report()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+def retry_delay(retry_after, attempt : int):
+    '''seconds to wait before retry number attempt + 1
+    
+    Honors a Retry-After header in either form (delta-seconds or an HTTP-date),
+    falling back to exponential backoff when it is missing or unparseable.
+    The wait is capped at MAX_BACKOFF.
+    '''
+    delay = BACKOFF * 2 ** attempt
+    if retry_after:
+        value = str(retry_after).strip()
+        if value.isdigit():
+            delay = float(value)
+        else:
+            try:
+                when = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                when = None
+            if when is not None and when.tzinfo is not None:
+                delay = max(0.0, when.timestamp() - time.time())
+    return min(delay, MAX_BACKOFF)
+
+def get_json(url : str, cache : DiskCache = None, throttle = None, record : RequestRecord = None):
+    '''GET a JSON document, revalidating a cached copy with a conditional request
+    
+    When the server answers 304 Not Modified the cached body is reused.
+    throttle, if given, is called with the url before each attempt (rate limiting).
+    Connection errors, timeouts and RETRY_STATUSES are retried up to RETRIES times
+    with exponential backoff, or after the server's Retry-After (see retry_delay). record, if given, is filled with the timings and outcome.
+    Any other error status, or a retryable one still failing after the last retry, raises requests.HTTPError.
+    Only 200 responses are cached.
+    '''
+    record = record if record is not None else RequestRecord(url)
+    entry = cache.get(url, fresh_only=False) if cache is not None else None
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    for attempt in range(RETRIES + 1):
+        if throttle is not None:
+            waited = time.monotonic()
+            throttle(url)
+            record.throttled += time.monotonic() - waited
+        record.retries = attempt
+        sent = time.monotonic()
+        delay = None
+        try:
+            response = requests.get(url, headers=headers, timeout=TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            record.latency = time.monotonic() - sent
+            record.status, record.error = "error", f"{type(e).__name__}: {e}"
+            if attempt == RETRIES:
+                raise
+        else:
+            record.latency = time.monotonic() - sent
+            record.status, record.size = response.status_code, len(response.content)
+            ok = 200 <= response.status_code < 300 or response.status_code == 304
+            record.error = None if ok else f"HTTP {response.status_code}"
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                break
+            delay = record.retry_after = response.headers.get("Retry-After")
+        delay = retry_delay(delay, attempt)
+        time.sleep(delay)
+        record.backoff += delay
+    if response.status_code == 304 and entry is not None:
+        return entry["value"]
+    response.raise_for_status()
+    parsing = time.monotonic()
+    try:
+        jsonRes = response.json()
+    except ValueError as e:
+        record.error = f"HTTP {response.status_code}, not JSON: {e}"
+        raise
+    finally:
+        record.parse = time.monotonic() - parsing
+    if cache is not None and response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+        cache.set(url, jsonRes, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+    return jsonRes
+
+def fetch_json(section : str  , catgeory : int, item : int , printIt= False , page : int =0, limit : int = None, count : int = 0, cache : DiskCache = None, throttle = None, telemetry : CrawlTelemetry = None):
     '''generator to get all yad2 item and category pages and results 
     
     Args:
@@ -15,8 +271,21 @@ def fetch_json(section : str  , catgeory : int, item : int , printIt= False , pa
         page: current page number (used internally)
         limit: maximum number of items to fetch (None = unlimited)
         count: current count (used internally for recursion)
+        cache: optional DiskCache for pages, revalidated with conditional requests
+        throttle: optional callable(url) run before each page request
+        telemetry: optional CrawlTelemetry recording every page request
     '''
-    jsonRes = requests.get(LinkTemplate%( section , catgeory , item , page )).json()
+    url = LinkTemplate%( section , catgeory , item , page )
+    record = RequestRecord(url)
+    try:
+        jsonRes = get_json(url, cache, throttle, record)
+        record.items = len(jsonRes["data"]["feed"]["feed_items"])
+    except Exception as e:
+        record.status, record.error = "error", record.error or f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if telemetry is not None:
+            telemetry.add(record)
     for itemJson in jsonRes["data"]["feed"]["feed_items"]: 
         if limit is not None and count >= limit:
             return
@@ -26,11 +295,18 @@ def fetch_json(section : str  , catgeory : int, item : int , printIt= False , pa
             print(json.dumps(itemJson,ensure_ascii=False))
     if jsonRes["data"]["pagination"]["current_page"] < jsonRes["data"]["pagination"]["last_page"]: 
         if limit is None or count < limit:
-            yield from fetch_json(section , catgeory , item  , printIt, page+1, limit, count)
+            yield from fetch_json(section , catgeory , item  , printIt, page+1, limit, count, cache, throttle, telemetry)
 
-def items(section , catgeory : int , searchTerm):
-    cats = requests.get(f"https://gw.yad2.co.il/search-options/products/{section}?fields={searchTerm}&category={catgeory}").json()
-    yield from cats["data"][searchTerm] 
+def items(section , catgeory : int , searchTerm, cache : DiskCache = options_cache):
+    '''yield the search options (e.g. 'item', 'area') of a section/category, cached on disk for OPTIONS_TTL'''
+    key = [section, catgeory, searchTerm]
+    entry = cache.get(key) if cache is not None else None
+    if entry is None:
+        cats = requests.get(OptionsTemplate%( section , searchTerm , catgeory )).json()
+        entry = {"value": cats["data"][searchTerm]}
+        if cache is not None:
+            cache.set(key, entry["value"])
+    yield from entry["value"]
 
 def extract_rooms(area_rooms_field):
     '''Extract number of rooms from "Area and rooms of apartment" field
@@ -64,8 +340,12 @@ def to_csv(name, jsonList : list ):
 #to_csv("areas_codes.csv", items("cellular", 5, "area"))    
 #to_csv("fetched_data.csv", fetch_json("cellular", 5, 29, True, limit=10))
 
-# For real estate - limit to 50 properties for sale
-to_csv("realestate_sale_data.csv", fetch_json("realestate", 2, 1, True, limit=50))
+if __name__ == "__main__":
+    from crawl_scheduler import CrawlScheduler
 
-# For real estate - limit to 100 properties for rent
-# to_csv("realestate_rent_data.csv", fetch_json("realestate", 1, 1, True, limit=100))
\ No newline at end of file
+    scheduler = CrawlScheduler(max_workers=2, rate_per_host=2.0, report="crawl_report.json")
+    # For real estate - limit to 50 properties for sale
+    scheduler.add("realestate", 2, 1, priority=1, limit=50, output="realestate_sale_data.csv")
+    # For real estate - limit to 100 properties for rent
+    scheduler.add("realestate", 1, 1, limit=100, output="realestate_rent_data.csv")
+    scheduler.run()
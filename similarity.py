@@ -0,0 +1,80 @@
+"""
+"Areas that move like X": trajectory similarity search over price series
+
+Every Area x Rooms series is turned into a row of quarterly returns
+(taken from the ``QoQ %`` metric column), normalized once, so that a top-k
+query is a single matrix-vector product. Indexes are built once per data
+version by ``data_store``.
+"""
+import numpy as np
+import pandas as pd
+
+from metrics import SERIES_KEYS, quarter_number
+
+METHODS = ('correlation', 'cosine')
+
+
+class SimilarityIndex:
+    """Normalized (series x quarter) return matrix with top-k lookups.
+
+    Missing quarters contribute nothing: after centering (``correlation``)
+    or as-is (``cosine``) they are set to zero before normalizing. Series
+    with fewer than ``min_quarters`` observed returns are left out.
+    """
+
+    def __init__(self, df, method='correlation', min_quarters=8):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+        self.method = method
+
+        data = df.dropna(subset=['QoQ %'])
+        series_codes, series = pd.MultiIndex.from_frame(data[SERIES_KEYS]).factorize()
+        quarter_codes, _ = pd.factorize(quarter_number(data), sort=True)
+
+        returns = np.full((len(series), quarter_codes.max() + 1 if len(data) else 0), np.nan)
+        returns[series_codes, quarter_codes] = data['QoQ %'].to_numpy(dtype=float) / 100
+
+        observed = ~np.isnan(returns)
+        keep = observed.sum(axis=1) >= min_quarters
+        returns, observed = returns[keep], observed[keep]
+        self.series = pd.MultiIndex.from_tuples(series[keep], names=SERIES_KEYS)
+
+        if method == 'correlation':
+            counts = observed.sum(axis=1, keepdims=True)
+            returns = returns - np.nansum(returns, axis=1, keepdims=True) / counts
+        matrix = np.where(observed, returns, 0.0)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+        self._positions = {key: i for i, key in enumerate(self.series)}
+
+    def top_k(self, area, rooms='All', k=5, same_rooms=True):
+        """Return the ``k`` series most similar to (``area``, ``rooms``).
+
+        With ``same_rooms`` only series of the same room type are ranked,
+        which is what "areas that move like X" usually means. ``k`` must
+        be at least 1 (ValueError otherwise).
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        position = self._positions.get((area, rooms))
+        if position is None:
+            return pd.DataFrame(columns=SERIES_KEYS + ['Similarity'])
+
+        scores = self.matrix @ self.matrix[position]
+        scores[position] = -np.inf
+        if same_rooms:
+            scores[self.series.get_level_values('Rooms') != rooms] = -np.inf
+
+        candidates = np.flatnonzero(np.isfinite(scores))
+        k = min(k, len(candidates))
+        if k == 0:
+            return pd.DataFrame(columns=SERIES_KEYS + ['Similarity'])
+        best = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        best = best[np.argsort(-scores[best])]
+
+        result = self.series[best].to_frame(index=False)
+        result['Similarity'] = scores[best]
+        return result
+
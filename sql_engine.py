@@ -0,0 +1,86 @@
+"""
+Read-only SQL analytics over the housing snapshot, backed by embedded DuckDB
+
+The snapshot is copied once into a DuckDB columnar table named ``housing``;
+each query runs on its own cursor over that shared table, vectorized and
+multithreaded by DuckDB. Only a single SELECT statement is accepted, access
+to files and extensions is disabled and the configuration is locked.
+
+Example:
+    engine.query('SELECT District, median("Average Price") AS median_price '
+                 'FROM housing WHERE Rooms = \\'All\\' GROUP BY District')
+"""
+import os
+import threading
+
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+TABLE = 'housing'
+
+
+class QueryError(ValueError):
+    """The query was rejected or failed; the message is safe to show to users."""
+
+
+def available():
+    return duckdb is not None
+
+
+class QueryEngine:
+    """Embedded DuckDB database holding one snapshot of the dataset.
+
+    Args:
+        df: dataset to expose as the ``housing`` table
+        threads: DuckDB worker threads (defaults to the number of cores)
+        memory_limit: most memory DuckDB may use for the table and queries (e.g. '512MB');
+            every snapshot has its own engine, and two live side by side during a reload
+        max_rows: rows returned at most per query
+        timeout: seconds before a running query is interrupted
+    """
+
+    def __init__(self, df, threads=None, memory_limit='512MB', max_rows=10000, timeout=10):
+        if duckdb is None:
+            raise RuntimeError("duckdb is not installed (pip install duckdb)")
+        self.max_rows = max_rows
+        self.timeout = timeout
+
+        self._con = duckdb.connect(':memory:')
+        self._con.execute(f'SET threads = {int(threads or os.cpu_count() or 1)}')
+        self._con.execute("SET memory_limit = '{}'".format(str(memory_limit).replace("'", "''")))
+        self._con.register('snapshot_df', df)
+        self._con.execute(f'CREATE TABLE {TABLE} AS SELECT * FROM snapshot_df')
+        self._con.unregister('snapshot_df')
+        self._con.execute('SET enable_external_access = false')
+        self._con.execute('SET lock_configuration = true')
+
+    def _check(self, sql):
+        try:
+            statements = self._con.extract_statements(sql)
+        except duckdb.Error as e:
+            raise QueryError(str(e)) from None
+        if len(statements) != 1:
+            raise QueryError("Exactly one SQL statement is allowed")
+        if statements[0].type != duckdb.StatementType.SELECT:
+            raise QueryError("Only SELECT queries are allowed")
+
+    def query(self, sql, params=None):
+        """Run a read-only query and return at most ``max_rows`` rows as a DataFrame.
+
+        ``params`` fills the ``?`` placeholders of the query.
+        """
+        self._check(sql)
+        cursor = self._con.cursor()
+        timer = threading.Timer(self.timeout, cursor.interrupt)
+        timer.start()
+        try:
+            # Newline before ")" so a trailing "-- comment" cannot swallow it
+            limited = f"SELECT * FROM (\n{sql.strip().rstrip(';')}\n) LIMIT {int(self.max_rows)}"
+            return cursor.execute(limited, params or []).df()
+        except duckdb.Error as e:
+            raise QueryError(str(e)) from None
+        finally:
+            timer.cancel()
+            cursor.close()
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from analytics import Analytics, area_changes, latest, rank
+
+
+@pytest.fixture
+def df(housing):
+    return housing({
+        ('Haifa', 'All'): [1.0, 1.1, 1.5],
+        ('Haifa', '1-2'): [0.5, 0.5, 0.5],
+        ('Holon', 'All'): [2.0, 2.0, 1.8],
+        ('Hadera', 'All'): [1.0, 1.2, 1.3],
+        ('Ashdod', 'All'): [1.0, None, None],  # a single quarter has no change
+    })
+
+
+def test_latest(df):
+    rows = latest(df)
+    assert (rows['Quarter_ts'] == pd.Timestamp('2017-07-01')).all()
+    assert set(rows['Area']) == {'Haifa', 'Holon', 'Hadera'}
+
+
+def test_area_changes_average_over_series(df):
+    changes = area_changes(df).set_index('Area')
+
+    # Haifa: mean first price (1.0 + 0.5) / 2, mean last price (1.5 + 0.5) / 2
+    assert changes.loc['Haifa', 'Change %'] == pytest.approx((1.0 / 0.75 - 1) * 100)
+    assert changes.loc['Holon', 'Change %'] == pytest.approx(-10.0)
+    assert 'Ashdod' not in changes.index
+
+
+def test_rank(df):
+    changes = area_changes(df)
+    assert rank(changes, n=2)['Area'].tolist() == ['Haifa', 'Hadera']
+    assert rank(changes, n=1, ascending=True)['Area'].tolist() == ['Holon']
+    assert rank(changes, n=10).index.tolist() == [0, 1, 2]
+
+
+def test_rank_can_exclude_noisy_areas(df):
+    flagged = (df['Area'] == 'Haifa') & (df['Rooms'] == 'All') & (df['Quarter_ts'] == df['Quarter_ts'].max())
+    df = df.assign(Anomaly=flagged)
+    changes = area_changes(df)
+
+    assert changes.set_index('Area')['Noisy Quarters'].to_dict() == {'Haifa': 1, 'Hadera': 0, 'Holon': 0}
+    assert rank(changes, n=1)['Area'].tolist() == ['Haifa']
+    assert rank(changes, n=1, exclude_noisy=True)['Area'].tolist() == ['Hadera']
+
+
+def test_analytics_queries_are_memoized_and_filtered(df):
+    analytics = Analytics(df)
+
+    assert analytics.top_gainers(n=1)['Area'].tolist() == ['Haifa']
+    assert analytics.top_losers(n=1, rooms='All')['Area'].tolist() == ['Holon']
+    assert analytics.top_gainers(n=3, rooms='1-2')['Change %'].tolist() == [0.0]
+    assert analytics.select(areas=('Holon',)) is analytics.select(areas=('Holon',))
+    # Restricted to the first two quarters, Hadera leads
+    assert analytics.top_gainers(n=1, end='2017-04-01')['Area'].tolist() == ['Hadera']
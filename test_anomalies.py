@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomalies import add_anomaly_flags, leave_one_out_median, noisy_series
+from metrics import add_derived_metrics
+
+CITIES = ['Haifa', 'Hadera', 'Nesher', 'Tirat Carmel', 'Yokneam']
+
+
+def district(housing, jumps):
+    """Five cities of one district with small random moves plus ``{(city, quarter): factor}`` jumps."""
+    rng = np.random.default_rng(7)
+    series = {}
+    for city in CITIES:
+        returns = 1 + rng.normal(0.01, 0.01, 20)
+        for (jumped, quarter), factor in jumps.items():
+            if jumped == city:
+                returns[quarter] *= factor
+        series[(city, 'All')] = list(np.cumprod(np.concatenate(([1.0], returns))))
+    df = housing(series, districts=dict.fromkeys(CITIES, 'Haifa District'))
+    return add_anomaly_flags(add_derived_metrics(df))
+
+
+def flagged(df):
+    rows = df[df['Anomaly']]
+    return set(zip(rows['Area'], rows['Quarter_ts']))
+
+
+def test_isolated_jump_is_flagged(housing):
+    df = district(housing, {('Nesher', 10): 1.4})
+    quarter = df['Quarter_ts'].drop_duplicates().sort_values().iloc[11]
+
+    assert flagged(df) == {('Nesher', quarter)}
+    assert list(noisy_series(df)) == [('Nesher', 'All')]
+
+
+def test_district_wide_move_is_not_flagged(housing):
+    df = district(housing, {(city, 10): 1.4 for city in CITIES})
+    assert not df['Anomaly'].any()
+    assert df['QoQ z'].abs().max() > 3.5  # extreme for each series, but shared by its peers
+
+
+def test_flags_replace_previous_columns(housing):
+    df = district(housing, {('Nesher', 10): 1.4})
+    again = add_anomaly_flags(df)
+    assert list(again.columns) == list(df.columns)
+    assert again['Anomaly'].equals(df['Anomaly'])
+
+
+def test_leave_one_out_median():
+    values = pd.Series([1.0, 2.0, 3.0, 10.0, 5.0, np.nan, 7.0])
+    groups = [pd.Series(['a', 'a', 'a', 'a', 'b', 'b', None])]
+
+    # a: others of 1 are {2, 3, 10}; b: 5 has no other value; None keys are skipped
+    expected = [3.0, 3.0, 2.0, 2.0, np.nan, np.nan, np.nan]
+    assert leave_one_out_median(values, groups).tolist() == pytest.approx(expected, nan_ok=True)
@@ -0,0 +1,88 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+import sql_engine
+
+API_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'getahome', 'src', 'app.py')
+
+
+@pytest.fixture(scope='module')
+def api():
+    # Loaded under another name: the root app.py is the Streamlit dashboard
+    spec = importlib.util.spec_from_file_location('getahome_api', API_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    yield module
+    module.store.stop()
+    del sys.modules[spec.name]
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
+
+
+@pytest.mark.parametrize('url', [
+    '/api/areas',
+    '/api/data?area=Tel%20Aviv&rooms=All',
+    '/api/top_gainers?n=3',
+    '/api/similar?area=Tel%20Aviv',
+    '/api/rollup?area=Israel',
+])
+def test_etag_and_not_modified(client, url):
+    first = client.get(url)
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'public, max-age=60, must-revalidate'
+
+    again = client.get(url, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+
+    assert client.get(url, headers={'If-None-Match': '"stale"'}).status_code == 200
+
+
+def test_etag_depends_on_the_query(client):
+    haifa = client.get('/api/data?area=Haifa').headers['ETag']
+    assert client.get('/api/data?area=Haifa').headers['ETag'] == haifa
+    assert client.get('/api/data?area=Holon').headers['ETag'] != haifa
+
+
+def test_etag_changes_with_the_data_version(api, client, monkeypatch):
+    before = client.get('/api/areas').headers['ETag']
+    snapshot = api.store.current()
+    monkeypatch.setattr(snapshot, 'version', 'another-version')
+    assert client.get('/api/areas').headers['ETag'] != before
+
+
+def test_errors_are_not_cached(client):
+    for url in ['/api/data?start=not-a-date', '/api/similar?area=Haifa&k=-1', '/api/similar',
+                '/api/data?as_of=garbage', '/api/data?currency=XYZ']:
+        response = client.get(url)
+        assert response.status_code == 400, url
+        assert 'ETag' not in response.headers
+
+
+def test_currency_error_does_not_leak_paths(client):
+    error = client.get('/api/data?currency=XYZ').get_json()['error']
+    assert error == 'Exchange rates unavailable for XYZ'
+
+
+def test_similar_rejects_non_positive_k(client):
+    assert client.get('/api/similar?area=Haifa&k=0').get_json() == {'error': "'k' must be a positive integer"}
+    assert len(client.get('/api/similar?area=Haifa&k=2').get_json()) == 2
+
+
+@pytest.mark.skipif(not sql_engine.available(), reason="needs duckdb")
+def test_query(client):
+    response = client.post('/api/query', json={'sql': 'SELECT Rooms, list(Area) AS areas FROM housing GROUP BY Rooms'})
+    assert response.status_code == 200
+    assert all(isinstance(row['areas'], list) for row in response.get_json())
+
+    assert client.post('/api/query', json={'sql': 'DROP TABLE housing'}).status_code == 400
+    assert client.post('/api/query', json={}).status_code == 400
@@ -0,0 +1,43 @@
+import gzip
+
+import pytest
+
+import artifacts
+from artifacts import enforce_budgets, minify_html, minify_json, write_artifact
+
+
+@pytest.fixture(autouse=True)
+def over_budget(monkeypatch):
+    monkeypatch.setattr(artifacts, 'OVER_BUDGET', {})
+    return artifacts.OVER_BUDGET
+
+
+def test_write_artifact(tmp_path):
+    path = tmp_path / 'data.json'
+    sizes = write_artifact(str(path), minify_json({'city': 'חיפה', 'prices': [1.5, 2]}) + '\r\n',
+                           budgets={'*data.json': 1_000})
+
+    assert path.read_bytes() == '{"city":"חיפה","prices":[1.5,2]}\n'.encode('utf-8')
+    assert gzip.decompress((tmp_path / 'data.json.gz').read_bytes()) == path.read_bytes()
+    assert (sizes['budget'], sizes['ok']) == (1_000, True)
+    assert not [p for p in tmp_path.iterdir() if p.suffix == '.tmp']
+
+
+def test_over_budget_fails_the_generator(tmp_path, over_budget):
+    sizes = write_artifact(str(tmp_path / 'page.html'), 'x' * 5_000, budgets={'*page.html': 10})
+
+    assert not sizes['ok']
+    assert list(over_budget.values()) == [(sizes['gz'], 10)]
+    with pytest.raises(SystemExit) as exit_info:
+        enforce_budgets()
+    assert exit_info.value.code == 1
+
+
+def test_unbudgeted_artifacts_pass(tmp_path):
+    assert write_artifact(str(tmp_path / 'other.js'), 'x' * 5_000, budgets={})['ok']
+    enforce_budgets()
+
+
+def test_minify_html_keeps_line_breaks():
+    assert minify_html('<div>\n    <p>a</p>\n\n    <script>// note\nx()</script>\n</div>') == \
+        '<div>\n<p>a</p>\n<script>// note\nx()</script>\n</div>'
@@ -0,0 +1,58 @@
+import os
+
+import openpyxl
+import pandas as pd
+
+import cbs_ingest
+import housing_data
+
+SOURCE = os.path.join(housing_data.BASE_DIR, 'data_housing_fullhisto.xlsx')
+KEY = ['Area', 'Rooms', 'Quarter_ts']
+
+
+def cbs_workbook(path, keep):
+    """Copy the metadata block and the rows of the published CBS sheet whose label contains one of ``keep``."""
+    source = openpyxl.load_workbook(SOURCE, read_only=True)
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    header = False
+    for row in source.worksheets[0].iter_rows(values_only=True):
+        header = header or row[0] == 'Code'
+        if not header or row[0] == 'Code' or any(name in str(row[1]) for name in keep):
+            ws.append(row)
+    ws.append(('* Footnote',))
+    wb.create_sheet('notes').append(('No table here',))
+    wb.save(path)
+    source.close()
+    return str(path)
+
+
+def test_round_trip_matches_published_dataset(tmp_path):
+    path = cbs_workbook(tmp_path / 'sale.xlsx', ['Holon', 'Ashdod', 'Tel Aviv District'])
+    df = cbs_ingest.ingest([path], workers=1)
+
+    assert set(df['Table']) == {'sale'}
+    got = cbs_ingest.tables(df)['sale']
+    published = housing_data.load_data()
+    expected = published[published['Area'].isin(['Holon', 'Ashdod'])]  # district series are not published
+    pd.testing.assert_frame_equal(got.sort_values(KEY, ignore_index=True),
+                                  expected.sort_values(KEY, ignore_index=True), check_dtype=False)
+    assert set(got.loc[got['Area'] == 'Holon', 'District']) == {'center District'}
+
+
+def test_tables_keep_their_keys_apart(tmp_path):
+    sale = cbs_workbook(tmp_path / 'sale.xlsx', ['Holon'])
+    rent = cbs_workbook(tmp_path / 'rent.xlsx', ['Holon'])
+    df = cbs_ingest.ingest([sale, rent], workers=1)
+
+    assert df.duplicated(KEY).any()  # the same keys, in two tables
+    split = cbs_ingest.tables(df)
+    assert list(split) == ['sale', 'rent']
+    for table in split.values():
+        assert list(table.columns) == cbs_ingest.COLUMNS
+        assert not table.duplicated(KEY).any()
+
+
+def test_workbook_without_rows(tmp_path):
+    df = cbs_ingest.ingest([cbs_workbook(tmp_path / 'sale.xlsx', [])], workers=1)
+    assert df.empty and cbs_ingest.tables(df) == {}
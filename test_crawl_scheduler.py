@@ -0,0 +1,96 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import crawl_scheduler
+from crawl_scheduler import CrawlScheduler, RateLimiter
+from scrapper import DiskCache
+
+
+@pytest.fixture
+def feeds(monkeypatch):
+    """Stub fetch_json yielding one item per job after ``delay`` seconds; records calls and peak concurrency."""
+    stub = SimpleNamespace(calls=[], delay=0.0, active=0, peak=0)
+    lock = threading.Lock()
+
+    def fetch_json(section, category, item, **kwargs):
+        with lock:
+            stub.calls.append(dict(kwargs, feed=(section, category, item)))
+            stub.active += 1
+            stub.peak = max(stub.peak, stub.active)
+        time.sleep(stub.delay)
+        with lock:
+            stub.active -= 1
+        yield {'id': item}
+
+    monkeypatch.setattr(crawl_scheduler, 'fetch_json', fetch_json)
+    return stub
+
+
+def crawl(tmp_path, items, priorities=None, **kwargs):
+    scheduler = CrawlScheduler(verbose=False, cache=None, **kwargs)
+    for item, priority in zip(items, priorities or [0] * len(items)):
+        scheduler.add('realestate', 2, item, priority=priority, output=str(tmp_path / f'{item}.csv'))
+    return scheduler
+
+
+def test_higher_priority_runs_first(feeds, tmp_path):
+    summary = crawl(tmp_path, [1, 2, 3, 4], priorities=[0, 5, 1, 5], max_workers=1).run()
+
+    assert [call['feed'][2] for call in feeds.calls] == [2, 4, 3, 1]  # ties keep their order
+    assert (summary['done'], summary['items']) == (4, 4)
+    assert (tmp_path / '1.csv').exists()
+
+
+def test_max_workers_bounds_concurrency(feeds, tmp_path):
+    feeds.delay = 0.05
+    assert crawl(tmp_path, range(6), max_workers=2).run()['done'] == 6
+    assert feeds.peak == 2
+
+
+def test_jobs_past_the_deadline_are_skipped(feeds, tmp_path):
+    feeds.delay = 0.1
+    scheduler = crawl(tmp_path, [1, 2, 3], max_workers=1, deadline=0.05)
+    summary = scheduler.run()
+
+    assert [job.status for job in scheduler.jobs] == ['done', 'skipped', 'skipped']
+    assert (summary['done'], summary['skipped']) == (1, 2)
+    assert len(feeds.calls) == 1
+
+
+def test_jobs_share_the_page_cache(feeds, tmp_path):
+    cache = DiskCache(str(tmp_path), ttl=None)
+    scheduler = CrawlScheduler(max_workers=2, verbose=False, cache=cache)
+    for item in (1, 2):
+        scheduler.add('realestate', 2, item, output=str(tmp_path / f'{item}.csv'))
+
+    assert scheduler.run()['done'] == 2
+    assert [call['cache'] for call in feeds.calls] == [cache, cache]
+    assert CrawlScheduler(verbose=False).cache is crawl_scheduler.page_cache
+
+
+def test_rate_limiter_token_bucket(monkeypatch):
+    clock = SimpleNamespace(now=100.0, sleeps=[])
+
+    def sleep(seconds):
+        clock.sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(crawl_scheduler.time, 'monotonic', lambda: clock.now)
+    monkeypatch.setattr(crawl_scheduler.time, 'sleep', sleep)
+    limiter = RateLimiter(rate=4.0, burst=2)
+
+    for _ in range(2):
+        limiter.wait('https://gw.yad2.co.il/feed?page=1')
+    assert clock.sleeps == []  # the burst goes through at once
+    limiter.wait('https://gw.yad2.co.il/feed?page=2')
+    assert clock.sleeps == [pytest.approx(0.25)]
+    limiter.wait('https://www.yad2.co.il/')
+    assert len(clock.sleeps) == 1  # other hosts have their own bucket
+
+    clock.now += 10  # idle time refills at most ``burst`` tokens
+    for _ in range(3):
+        limiter.wait('https://gw.yad2.co.il/feed?page=3')
+    assert clock.sleeps == [pytest.approx(0.25)] * 2
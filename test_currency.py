@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import currency
+from analytics import Analytics
+
+
+@pytest.fixture
+def rates_file(tmp_path):
+    path = tmp_path / 'exchange_rates.csv'
+    path.write_text(
+        'Date,Currency,Rate\n'
+        '2017-01-01,EUR,4.0\n2017-02-01,EUR,4.0\n2017-03-01,EUR,4.3\n'
+        '2017-04-01,EUR,4.1\n2017-05-01,eur,4.1\n2017-06-01,EUR,4.1\n'
+        '2017-03-01,USD,3.6\n'
+    )
+    return str(path)
+
+
+@pytest.fixture
+def df(housing):
+    return housing({('Haifa', 'All'): [4.1, 8.2, 9.0], ('Holon', 'All'): [2.05, 4.1, None]})
+
+
+def test_three_month_averages(rates_file):
+    rates = currency.load_rates(rates_file)
+    eur = rates[rates['Currency'] == 'EUR'].set_index('Date')['Rate 3M']
+    assert eur[pd.Timestamp('2017-03-01')] == pytest.approx(4.1)
+    assert eur[pd.Timestamp('2017-06-01')] == pytest.approx(4.1)
+    assert currency.currencies(rates_file) == ['ILS', 'EUR', 'USD']
+
+
+def test_quarter_rates_merge_asof(rates_file):
+    quarters = pd.to_datetime(['2017-01-01', '2017-04-01', '2017-07-01', '2017-01-01'])
+    rate = currency.quarter_rates(quarters, 'EUR', currency.load_rates(rates_file))
+
+    assert rate[pd.Timestamp('2017-01-01')] == pytest.approx(4.1)  # Jan-Mar average
+    assert rate[pd.Timestamp('2017-04-01')] == pytest.approx(4.1)
+    assert np.isnan(rate[pd.Timestamp('2017-07-01')])  # no rate within a month of the quarter's end
+
+
+def test_convert(rates_file, df):
+    eur = currency.convert(df, 'EUR', currency.load_rates(rates_file))
+
+    haifa = eur[eur['Area'] == 'Haifa']['Average Price'].tolist()
+    assert haifa[:2] == pytest.approx([1.0, 2.0])
+    assert np.isnan(haifa[2])
+    assert set(eur['Currency']) == {'EUR millions'}
+    assert df['Average Price'].iloc[0] == 4.1  # the input is left alone
+    assert currency.convert(df, 'ILS') is df
+
+
+def test_to_currency(rates_file):
+    rates = currency.load_rates(rates_file)
+    assert currency.to_currency(4_100, 'EUR', rates) == pytest.approx(1_000)
+    assert currency.to_currency([3_600, 7_200], 'USD', rates).tolist() == pytest.approx([1_000, 2_000])
+    with pytest.raises(KeyError, match='Exchange rates unavailable for EUR'):
+        currency.to_currency(1, 'EUR', rates, on='2016-12-31')
+
+
+def test_converter(rates_file, df, tmp_path):
+    converter = currency.Converter(Analytics(df), rates_file)
+
+    assert converter.analytics('ILS') is converter.base
+    eur = converter.analytics('EUR')
+    assert eur is converter.analytics('EUR')
+    assert eur.df['Average Price'].iloc[0] == pytest.approx(1.0)
+
+    with pytest.raises(KeyError) as error:
+        converter.analytics('GBP')
+    assert str(tmp_path) not in error.value.args[0]
+
+    with pytest.raises(KeyError) as error:
+        currency.Converter(Analytics(df), str(tmp_path / 'missing.csv')).analytics('EUR')
+    assert error.value.args[0] == 'Exchange rates unavailable for EUR'
@@ -0,0 +1,56 @@
+import json
+
+import pandas as pd
+import pytest
+
+import data_quality
+from data_quality import DataQualityError
+
+
+@pytest.fixture
+def df(housing):
+    return housing({('Haifa', 'All'): [1.0, 1.1, 1.2], ('Holon', 'All'): [2.0, 2.1, 2.2]})
+
+
+def failures(report):
+    return {check.name: check.failures for check in report.checks if not check.passed}
+
+
+def test_clean_snapshot_passes(df, tmp_path):
+    path = tmp_path / 'report.quality.json'
+    report = data_quality.require(df, report_path=str(path))
+
+    assert report.passed and failures(report) == {}
+    assert json.loads(path.read_text())['passed'] is True
+
+
+def test_bad_snapshot_is_rejected(df, tmp_path):
+    bad = pd.concat([df, df.iloc[[0]]], ignore_index=True)  # duplicated key
+    bad['Average Price'] = bad['Average Price'].astype(object)
+    bad.loc[1, 'Average Price'] = '-'  # left over from the Excel sheet
+    bad.loc[bad['Area'] == 'Holon', 'Is_District'] = [True, False, False]
+
+    path = tmp_path / 'report.quality.json'
+    with pytest.raises(DataQualityError) as error:
+        data_quality.require(bad, report_path=str(path))
+
+    assert failures(error.value.report) == {'unique_key': 2, 'numeric_price': 1, 'is_district': 1}
+    written = json.loads(path.read_text())
+    assert written['passed'] is False
+    assert written['checks'][1]['examples'][0]['Area'] == 'Haifa'
+
+
+def test_missing_columns_stop_the_other_checks(df):
+    report = data_quality.validate(df.drop(columns=['Is_District']))
+    assert [c.name for c in report.checks] == ['schema']
+    assert report.checks[0].examples == ['Is_District']
+    assert not report.passed
+
+
+def test_gaps_are_warnings_unless_strict(housing):
+    gappy = housing({('Haifa', 'All'): [1.0, None, None, 1.2]})
+
+    report = data_quality.validate(gappy)
+    assert report.passed
+    assert failures(report) == {'continuity': 2}
+    assert not data_quality.validate(gappy, strict=True).passed
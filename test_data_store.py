@@ -0,0 +1,99 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from data_store import DataStore
+
+
+@pytest.fixture
+def write(housing, tmp_path):
+    """Write a snapshot with the given Haifa prices to the watched CSV file; returns its path."""
+    path = tmp_path / 'housing.csv'
+
+    def write(prices, duplicate=False):
+        df = housing({('Haifa', 'All'): prices, ('Holon', 'All'): [2.0] * len(prices)})
+        if duplicate:
+            df = pd.concat([df, df.iloc[[0]]])
+        tmp = tmp_path / 'housing.tmp'
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, path)  # the way publishers swap files in
+        return str(path)
+    return write
+
+
+def prices(snapshot):
+    df = snapshot.df
+    return df.loc[df['Area'] == 'Haifa', 'Average Price'].tolist()
+
+
+def test_replaced_file_is_swapped_in(write):
+    store = DataStore(write([1.0, 1.1]), builders={})
+    first = store.current()
+
+    assert not store.refresh()  # unchanged
+    write([1.0, 1.1, 1.2])
+    assert store.refresh()
+    assert store.current() is not first
+    assert prices(store.current()) == pytest.approx([1.0, 1.1, 1.2])
+    assert prices(first) == pytest.approx([1.0, 1.1])  # held snapshots keep their version
+
+
+def test_touched_file_is_reloaded_by_the_watcher(write):
+    path = write([1.0, 1.1])
+    store = DataStore(path, builders={}, interval=0.01)
+    first = store.current()
+    swapped = threading.Event()
+    refresh = store.refresh
+    store.refresh = lambda: refresh() and swapped.set()
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    store.start()
+    try:
+        assert swapped.wait(5)
+    finally:
+        store.stop()
+    assert store.current() is not first
+    assert store.current().version != first.version
+
+
+def test_failing_quality_gate_keeps_the_old_snapshot(write):
+    builds = []
+    store = DataStore(write([1.0, 1.1]), builders={'count': builds.append})
+    first = store.current()
+
+    write([1.0, 1.1, 1.2], duplicate=True)
+    assert not store.refresh()
+    assert not store.refresh()  # a broken version is not retried until the file changes
+    assert store.current() is first and len(builds) == 1
+
+    write([1.0, 1.1, 1.2])
+    assert store.refresh()
+    assert prices(store.current()) == pytest.approx([1.0, 1.1, 1.2])
+
+
+def test_readers_never_see_a_half_built_snapshot(write):
+    building, release = threading.Event(), threading.Event()
+
+    def slow(df):
+        if len(df) > 4:  # only the reload waits
+            building.set()
+            release.wait(5)
+        return len(df)
+
+    store = DataStore(write([1.0, 1.1]), builders={'fast': len, 'slow': slow})
+    first = store.current()
+    write([1.0, 1.1, 1.2])
+    reload = threading.Thread(target=store.refresh)
+    reload.start()
+    try:
+        assert building.wait(5)
+        # Mid-build, readers still get the complete previous version
+        assert store.current() is first
+        assert first.derived == {'fast': 4, 'slow': 4}
+    finally:
+        release.set()
+        reload.join()
+    assert store.current().derived == {'fast': 6, 'slow': 6}
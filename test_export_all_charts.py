@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import artifacts
+import export_all_charts
+
+
+@pytest.fixture(autouse=True)
+def over_budget(monkeypatch):
+    monkeypatch.setattr(artifacts, 'OVER_BUDGET', {})
+
+
+@pytest.fixture
+def df(housing):
+    return housing({('Tel Aviv', 'All'): [3.0, 3.1, 3.2], ('Haifa', '3-2.5'): [1.0, 1.1, None]})
+
+
+def manifest(directory):
+    return json.loads((directory / 'manifest.json').read_text())
+
+
+def test_export_is_deterministic(df, tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    assert export_all_charts.export_all(df, str(first), workers=1) == (2, 0)
+    assert export_all_charts.export_all(df, str(second), workers=1) == (2, 0)
+
+    names = sorted(p.name for p in first.iterdir() if not p.name.endswith('.gz'))
+    assert sorted(p.name for p in second.iterdir() if not p.name.endswith('.gz')) == names
+    scripts = manifest(first)['scripts']
+    assert names == sorted(['haifa_3-2-5.html', 'tel-aviv_all.html', 'manifest.json', *scripts.values()])
+    assert scripts['chart_js'].startswith('chart.') and scripts['plotly'].startswith('plotly.')
+    assert (first / 'manifest.json').read_bytes() == (second / 'manifest.json').read_bytes()
+    assert (first / 'tel-aviv_all.html').read_bytes() == (second / 'tel-aviv_all.html').read_bytes()
+    assert f'src="{scripts["chart_js"]}"' in (first / 'tel-aviv_all.html').read_text()
+
+
+def test_rebuild_only_rewrites_changed_pages(df, tmp_path):
+    export_all_charts.export_all(df, str(tmp_path), workers=1)
+    before = manifest(tmp_path)['pages']
+    assert export_all_charts.export_all(df, str(tmp_path), workers=1) == (0, 2)
+
+    df.loc[df['Area'] == 'Haifa', 'Average Price'] += 0.5
+    assert export_all_charts.export_all(df, str(tmp_path), workers=1) == (1, 1)
+    after = manifest(tmp_path)['pages']
+    assert after['tel-aviv_all.html'] == before['tel-aviv_all.html']
+    assert after['haifa_3-2-5.html'] != before['haifa_3-2-5.html']
+
+    export_all_charts.export_all(df[df['Area'] == 'Haifa'], str(tmp_path), workers=1)
+    assert not (tmp_path / 'tel-aviv_all.html').exists()  # series gone, page removed
+    assert list(manifest(tmp_path)['pages']) == ['haifa_3-2-5.html']
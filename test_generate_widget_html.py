@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import housing_data
+
+SCRIPT = os.path.join(housing_data.BASE_DIR, 'generate_widget_html.py')
+DROPPED = ('Is_District', 'Quarter_ts')  # not kept in the shards (the Area is the shard's)
+
+
+@pytest.fixture
+def records():
+    with open(os.path.join(housing_data.BASE_DIR, 'housing_data_lite.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def generate(directory, records):
+    """Run the generator on ``records`` in ``directory``; returns the manifest."""
+    (directory / 'housing_data_lite.json').write_text(json.dumps(records, ensure_ascii=False), encoding='utf-8')
+    env = dict(os.environ)
+    env.pop('WIDGET_DATA_URL', None)
+    subprocess.run([sys.executable, SCRIPT], cwd=directory, env=env, check=True, capture_output=True)
+    return json.loads((directory / 'widget_data' / 'manifest.json').read_text(encoding='utf-8'))
+
+
+def shard(directory, name):
+    return json.loads((directory / 'widget_data' / name).read_text(encoding='utf-8'))
+
+
+def test_shards_reproduce_the_dataset(tmp_path, records):
+    manifest = generate(tmp_path, records)
+
+    cities = [r for r in records if not r['Is_District']]
+    assert manifest['base'] == 'widget_data/'
+    assert manifest['rooms'] == sorted({r['Rooms'] for r in records})
+    assert sorted(manifest['cities']) == sorted({r['Area'] for r in cities})
+    rebuilt = [dict(row, Area=city) for city, name in manifest['cities'].items() for row in shard(tmp_path, name)]
+    expected = [{k: v for k, v in r.items() if k not in DROPPED} for r in cities]
+    key = lambda r: (r['Area'], r['Rooms'])
+    assert sorted(rebuilt, key=key) == sorted(expected, key=key)
+
+    page = (tmp_path / 'housing_searchprice.html').read_text(encoding='utf-8')
+    assert json.dumps(manifest['cities'], ensure_ascii=False, separators=(',', ':')) in page
+
+
+def test_hashes_follow_the_content(tmp_path, records):
+    before = generate(tmp_path, records)['cities']
+    assert generate(tmp_path, records)['cities'] == before
+
+    changed = [dict(r, **{'Average Price': r['Average Price'] + 0.01}) if r['Area'] == 'Haifa' else r for r in records]
+    after = generate(tmp_path, changed)['cities']
+    assert after['Haifa'] != before['Haifa']
+    assert {city: name for city, name in after.items() if city != 'Haifa'} == \
+        {city: name for city, name in before.items() if city != 'Haifa'}
+    assert not (tmp_path / 'widget_data' / before['Haifa']).exists()  # the stale shard is removed
+    assert shard(tmp_path, after['Haifa'])[0]['Average Price'] == pytest.approx(
+        next(r['Average Price'] for r in changed if r['Area'] == 'Haifa'))
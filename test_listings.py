@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from listings import BucketStats, ListingAggregator, P2Quantile, listing_rooms, parse_price, rooms_bucket
+
+
+@pytest.mark.parametrize('distribution', ['normal', 'lognormal', 'uniform'])
+def test_p2_median_tracks_numpy_median(distribution):
+    values = getattr(np.random.default_rng(42), distribution)(size=20_000)
+    sketch = P2Quantile(0.5)
+    for value in values:
+        sketch.add(value)
+
+    spread = np.percentile(values, 75) - np.percentile(values, 25)
+    assert sketch.value() == pytest.approx(np.median(values), abs=0.02 * spread)
+
+
+def test_p2_other_quantile():
+    values = np.random.default_rng(1).normal(size=20_000)
+    sketch = P2Quantile(0.9)
+    for value in values:
+        sketch.add(value)
+    assert sketch.value() == pytest.approx(np.percentile(values, 90), abs=0.05)
+
+
+def test_p2_is_exact_below_five_values():
+    sketch = P2Quantile(0.5)
+    assert np.isnan(sketch.value())
+    for value in (9.0, 1.0, 5.0):
+        sketch.add(value)
+    assert sketch.value() == 5.0
+
+
+def test_bucket_stats():
+    stats = BucketStats()
+    for price in (1_000_000, 2_000_000, 3_000_000):
+        stats.add(price)
+    assert (stats.count, stats.mean, stats.median.value()) == (3, 2_000_000, 2_000_000)
+
+
+def test_parsers():
+    assert parse_price('1,850,000 ₪') == 1_850_000
+    assert parse_price(0) is None
+    assert parse_price('') is None
+    assert listing_rooms({'rooms': '3.5-4'}) == 3.75
+    assert listing_rooms({'row_4': [{'key': 'rooms', 'value': 4}]}) == 4.0
+    # to_csv keeps the field list as its repr
+    assert listing_rooms({'row_4': "[{'key': 'rooms', 'value': 5}]"}) == 5.0
+    assert listing_rooms({}) is None
+    assert rooms_bucket(3.75) == '4-3.5'
+    assert rooms_bucket(9) is None
+
+
+def test_aggregator_buckets_listings():
+    aggregator = ListingAggregator().consume([
+        {'city': 'חיפה', 'price': '1,000,000 ₪', 'rooms': 3},
+        {'city': 'חיפה', 'price': '3,000,000 ₪', 'rooms': 5},
+        {'city': 'חיפה', 'price': 'לא צוין', 'rooms': 5},
+    ])
+
+    assert (aggregator.seen, aggregator.skipped) == (3, 1)
+    assert aggregator.buckets[('Haifa', 'All')].count == 2
+    assert aggregator.buckets[('Haifa', '3-2.5')].median.value() == 1_000_000
+    assert aggregator.buckets[('Haifa', '5-4.5')].median.value() == 3_000_000
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from metrics import add_derived_metrics
+
+
+def series(df, area, rooms='All'):
+    return df[(df['Area'] == area) & (df['Rooms'] == rooms)].sort_values('Quarter_ts').reset_index(drop=True)
+
+
+def test_changes_on_hand_computed_prices(housing):
+    df = add_derived_metrics(housing({('Haifa', 'All'): [1.0, 1.2, 0.9, 1.5, 2.0]}))
+    haifa = series(df, 'Haifa')
+
+    assert np.isnan(haifa.loc[0, 'QoQ %'])
+    assert haifa['QoQ %'][1:].tolist() == pytest.approx([20.0, -25.0, 200 / 3, 100 / 3])
+    # Four quarters back from the fifth quarter is the first one
+    assert haifa['YoY %'].isna()[:4].all()
+    assert haifa.loc[4, 'YoY %'] == pytest.approx(100.0)
+
+
+def test_five_year_change_and_cagr(housing):
+    prices = [1.1 ** t for t in range(24)]
+    haifa = series(add_derived_metrics(housing({('Haifa', 'All'): prices})), 'Haifa')
+
+    assert haifa['5Y %'].isna()[:20].all()
+    assert haifa.loc[20, '5Y %'] == pytest.approx((1.1 ** 20 - 1) * 100)
+    # Compounded over 5 years, 10% a quarter is 1.1^4 - 1 a year
+    assert haifa['CAGR 5Y %'][20:].tolist() == pytest.approx([(1.1 ** 4 - 1) * 100] * 4)
+
+
+def test_lookbacks_follow_quarters_not_rows(housing):
+    # The third quarter is missing: a plain shift would compare the fourth with the second
+    df = add_derived_metrics(housing({('Haifa', 'All'): [1.0, 1.1, None, 1.5, 1.6, 2.0]}))
+    haifa = series(df, 'Haifa')
+
+    assert len(haifa) == 5
+    assert np.isnan(haifa.loc[2, 'QoQ %'])  # 4th quarter, previous one unpublished
+    assert haifa.loc[4, 'YoY %'] == pytest.approx((2.0 / 1.1 - 1) * 100)
+
+
+def test_series_do_not_leak_into_each_other(housing):
+    df = add_derived_metrics(housing({
+        ('Haifa', 'All'): [1.0, 2.0],
+        ('Haifa', '1-2'): [5.0, 5.0],
+    }))
+
+    assert series(df, 'Haifa', 'All').loc[1, 'QoQ %'] == pytest.approx(100.0)
+    assert series(df, 'Haifa', '1-2').loc[1, 'QoQ %'] == pytest.approx(0.0)
+    assert len(df) == 4
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import monte_carlo
+from metrics import add_derived_metrics
+
+
+@pytest.fixture
+def df(housing):
+    rng = np.random.default_rng(1)
+    series = {(city, 'All'): list(np.cumprod(1 + rng.normal(0.01, 0.03, 12))) for city in ['Haifa', 'Holon', 'Ashdod']}
+    series[('Hadera', 'All')] = [1.0, 1.1, 1.2]  # too short to simulate
+    return add_derived_metrics(housing(series))
+
+
+def test_block_bootstrap():
+    returns = np.arange(10) / 100
+    sampled = monte_carlo.block_bootstrap(returns, n_paths=50, n_quarters=10, block=4, rng=7)
+
+    assert sampled.shape == (50, 10)
+    assert np.isin(sampled, returns).all()
+    # Each block is a run of consecutive quarters
+    for block in (sampled[:, 0:4], sampled[:, 4:8]):
+        assert np.allclose(np.diff(block, axis=1), 0.01)
+    np.testing.assert_array_equal(sampled, monte_carlo.block_bootstrap(returns, 50, 10, 4, rng=7))
+
+
+def test_quantiles_are_ordered(df):
+    fan = monte_carlo.simulate_all(df, n_paths=500, n_quarters=8, workers=1)
+
+    assert set(fan['Area']) == {'Haifa', 'Holon', 'Ashdod'}
+    assert len(fan) == 3 * 2 * 8
+    quantiles = fan[monte_carlo.QUANTILE_COLUMNS].to_numpy()
+    assert (np.diff(quantiles, axis=1) >= 0).all()
+    assert (fan.loc[fan['Measure'] == 'All-in Cost', 'P50'].to_numpy() >
+            fan.loc[fan['Measure'] == 'Price', 'P50'].to_numpy()).all()
+
+    summary = monte_carlo.horizon_summary(fan, 'Haifa')
+    assert summary['Horizon'].tolist() == ['1Y', '1Y']
+
+
+def test_pool_matches_in_process(df, monkeypatch):
+    monkeypatch.setattr(monte_carlo, 'MIN_SERIES_PER_WORKER', 1)
+    kwargs = dict(n_paths=200, n_quarters=4, seed=3)
+
+    in_process = monte_carlo.simulate_all(df, workers=1, **kwargs)
+    pd.testing.assert_frame_equal(monte_carlo.simulate_all(df, workers=2, **kwargs), in_process)
+    assert not in_process.equals(monte_carlo.simulate_all(df, workers=1, n_paths=200, n_quarters=4, seed=4))
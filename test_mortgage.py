@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from mortgage import amortize, compare_financing
+
+FIXED = [(0, 1, 0)]  # prime, fixed, cpi_fixed shares
+
+
+def annuity(principal, annual_rate, years):
+    r, n = annual_rate / 12, years * 12
+    return principal * r / (1 - (1 + r) ** -n)
+
+
+def test_single_track_annuity():
+    result = amortize([1_000_000], FIXED, [20])
+    payment = annuity(1_000_000, 0.05, 20)
+
+    assert result['payments'].shape == (1, 1, 1, 240)
+    assert result['payments'][0, 0, 0] == pytest.approx(np.full(240, payment))
+    assert result['total_paid'][0, 0, 0] == pytest.approx(payment * 240)
+    assert result['total_interest'][0, 0, 0] == pytest.approx(payment * 240 - 1_000_000)
+    assert result['balance'][0, 0, 0, -1] == pytest.approx(0, abs=1e-6)
+
+
+def test_zero_rate_is_straight_line():
+    result = amortize([120_000], FIXED, [10], rates=[0.06, 0.0, 0.035])
+    assert result['first_payment'][0, 0, 0] == pytest.approx(1_000)
+    assert result['total_interest'][0, 0, 0] == pytest.approx(0, abs=1e-6)
+
+
+def test_mixed_tracks_add_up():
+    mix = [(0.5, 0.5, 0)]
+    result = amortize([1_000_000], mix, [25])
+    expected = annuity(500_000, 0.06, 25) + annuity(500_000, 0.05, 25)
+    assert result['first_payment'][0, 0, 0] == pytest.approx(expected)
+
+
+def test_cpi_linked_track_is_indexed():
+    linked = amortize([1_000_000], [(0, 0, 1)], [20], inflation=0.03)
+    flat = amortize([1_000_000], [(0, 0, 1)], [20], inflation=0.0)
+
+    assert flat['total_paid'][0, 0, 0] == pytest.approx(annuity(1_000_000, 0.035, 20) * 240)
+    payments = linked['payments'][0, 0, 0]
+    assert payments[11] == pytest.approx(payments[0] * 1.03 ** (11 / 12))
+    assert linked['total_interest'][0, 0, 0] > flat['total_interest'][0, 0, 0]
+
+
+def test_broadcasting_over_loans_mixes_and_terms():
+    result = amortize([500_000, 1_000_000], FIXED * 3, [15, 30])
+
+    assert result['total_paid'].shape == (2, 3, 2)
+    assert result['payments'].shape == (2, 3, 2, 360)
+    # Shorter term: nothing is paid after its last month
+    assert not result['payments'][:, :, 0, 180:].any()
+    assert result['total_paid'][1, 0, 1] == pytest.approx(annuity(1_000_000, 0.05, 30) * 360)
+
+
+def test_compare_financing():
+    options = compare_financing(2_000_000, [25, 50], monthly_income=30_000, terms=(20, 30))
+
+    assert len(options) == 2 * 5 * 2
+    assert set(options['Loan']) == {1_500_000, 1_000_000}
+    assert options['Total Interest'].is_monotonic_increasing
+    cheapest = options.iloc[0]
+    assert (cheapest['Down Payment %'], cheapest['Years']) == (50, 20)
+    assert options['PTI %'].tolist() == pytest.approx((options['Max Payment'] / 30_000 * 100).tolist())
@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from revisions import ReleaseStore
+
+
+def assert_same_data(actual, expected):
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
+
+
+@pytest.fixture
+def editions(housing):
+    """Three successive publications: a revised price, then a new quarter and a dropped series."""
+    first = housing({('Haifa', 'All'): [1.0, 1.1], ('Holon', 'All'): [2.0, 2.1], ('Holon', '1-2'): [0.9, 1.0]})
+    second = first.copy()
+    second.loc[(second['Area'] == 'Haifa') & (second['Year'] == 2017) & (second['Quarter'] == '2Q'),
+               'Average Price'] = 1.15
+    third = housing({('Haifa', 'All'): [1.0, 1.15, 1.2], ('Holon', 'All'): [2.0, 2.1, 2.3]})
+    return {'2024-01-15': first, '2024-04-15': second, '2024-07-15': third}
+
+
+@pytest.mark.parametrize('checkpoint_every', [1, 2, 12])
+def test_round_trip(tmp_path, editions, checkpoint_every):
+    store = ReleaseStore(str(tmp_path), checkpoint_every=checkpoint_every)
+    for release, df in editions.items():
+        store.ingest(df, release)
+
+    assert store.releases() == list(editions)
+    for release, df in editions.items():
+        assert_same_data(store.as_of(release), df)
+    # Between releases, the one published before
+    assert_same_data(store.as_of('2024-05-01'), editions['2024-04-15'])
+
+
+def test_deltas_only_store_changed_cells(tmp_path, editions):
+    store = ReleaseStore(str(tmp_path), checkpoint_every=12)
+    store.ingest(editions['2024-01-15'], '2024-01-15')
+    assert store.ingest(editions['2024-04-15'], '2024-04-15') == 1
+
+    with gzip.open(tmp_path / '2024-04-15.json.gz', 'rt', encoding='utf-8') as f:
+        record = json.load(f)
+    assert not record['checkpoint']
+    assert [cell[-2:] for cell in record['cells']] == [['Average Price', 1.15]]
+
+    store.ingest(editions['2024-07-15'], '2024-07-15')
+    with gzip.open(tmp_path / '2024-07-15.json.gz', 'rt', encoding='utf-8') as f:
+        assert len(json.load(f)['removed']) == 2  # the two Holon 1-2 quarters
+
+
+def test_as_of_before_first_release(tmp_path, editions):
+    store = ReleaseStore(str(tmp_path))
+    store.ingest(editions['2024-01-15'], '2024-01-15')
+    assert store.release_for('2023-12-31') is None
+    with pytest.raises(KeyError):
+        store.as_of('2023-12-31')
+
+
+def test_releases_must_be_newer(tmp_path, editions):
+    store = ReleaseStore(str(tmp_path))
+    store.ingest(editions['2024-04-15'], '2024-04-15')
+    with pytest.raises(ValueError):
+        store.ingest(editions['2024-01-15'], '2024-01-15')
+
+
+def test_as_of_returns_a_copy(tmp_path, editions):
+    store = ReleaseStore(str(tmp_path))
+    store.ingest(editions['2024-01-15'], '2024-01-15')
+    df = store.as_of('2024-01-15')
+    df.loc[:, 'Average Price'] = 0
+    assert store.as_of('2024-01-15')['Average Price'].min() > 0
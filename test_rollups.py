@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from rollups import Rollups
+
+
+@pytest.fixture
+def rollups(housing):
+    df = housing(
+        {
+            ('Israel', 'All'): [1.5, 1.6],
+            ('Center District', 'All'): [2.5, 2.6],
+            ('Holon', 'All'): [2.0, 2.2],
+            ('Tel Aviv', 'All'): [3.0, 3.4],
+            ('Bat Yam', 'All'): [1.0, None],
+            ('South District', 'All'): [1.0, 1.1],
+            ('Ashdod', 'All'): [1.2, 1.3],
+            ('Holon', '3-2.5'): [1.8, 1.9],
+        },
+        # Cities name their district as the published dataset does
+        districts={'Holon': 'center District', 'Tel Aviv': 'center District', 'Bat Yam': 'center District',
+                   'Ashdod': 'South District', 'Israel': 'Israel'},
+    )
+    df['Is_District'] = df['Area'].str.endswith('District')
+    return Rollups(df)
+
+
+def test_hierarchy(rollups):
+    assert rollups.members['Center District'] == ['Bat Yam', 'Holon', 'Tel Aviv']
+    assert rollups.members['Israel'] == ['Center District', 'South District']
+    assert rollups.up('Holon') == 'Center District'
+    assert rollups.up('Center District') == 'Israel'
+    assert rollups.up('Israel') is None
+
+
+def test_districts_aggregate_their_cities(rollups):
+    center = rollups.series('Center District')
+
+    first, second = center.index
+    assert center.loc[first, ['Mean', 'Median', 'Min', 'Max', 'Cities']].tolist() == pytest.approx([2.0, 2.0, 1.0, 3.0, 3])
+    assert center.loc[second, ['Mean', 'Min', 'Max', 'Cities']].tolist() == pytest.approx([2.8, 2.2, 3.4, 2])
+    assert center['Published'].tolist() == pytest.approx([2.5, 2.6])
+    assert set(center['Level']) == {'District'}
+
+    national = rollups.series('Israel')
+    assert national.loc[first, 'Cities'] == 4
+    assert national.loc[first, 'Mean'] == pytest.approx((2.0 + 3.0 + 1.0 + 1.2) / 4)
+    assert national['Published'].tolist() == pytest.approx([1.5, 1.6])
+
+    rooms = rollups.series('Center District', '3-2.5')
+    assert rooms['Mean'].tolist() == pytest.approx([1.8, 1.9])
+    assert rollups.series('Nowhere').empty
+
+
+def test_drill_down_returns_the_children(rollups):
+    latest = rollups.down('Center District')
+    assert latest['Area'].tolist() == ['Bat Yam', 'Holon', 'Tel Aviv']
+    assert latest['Average Price'].tolist() == pytest.approx([1.0, 2.2, 3.4])  # each member's latest quarter
+    assert latest['Quarter_ts'].tolist() == pd.to_datetime(['2017-01-01', '2017-04-01', '2017-04-01']).tolist()
+
+    second = rollups.down('Center District', quarter='2017-04-01')
+    assert second['Area'].tolist() == ['Holon', 'Tel Aviv']  # Bat Yam has no figure that quarter
+
+    assert rollups.down('Israel')['Area'].tolist() == ['Center District', 'South District']
+    assert rollups.down('Holon').empty
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import scrapper
+from scrapper import DiskCache, RequestRecord
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl=60)
+    cache.set(['realestate', 2, 'area'], [{'id': 1, 'name': 'חיפה'}], etag='"v1"')
+
+    entry = cache.get(['realestate', 2, 'area'])
+    assert entry['value'] == [{'id': 1, 'name': 'חיפה'}]
+    assert entry['etag'] == '"v1"'
+    assert cache.get(['realestate', 1, 'area']) is None
+    assert [p.suffix for p in tmp_path.iterdir()] == ['.json']  # no temp file left behind
+
+
+def test_disk_cache_ttl(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), ttl=60)
+    cache.set('key', 'value')
+
+    later = scrapper.time.time() + 120
+    monkeypatch.setattr(scrapper.time, 'time', lambda: later)
+    assert cache.get('key') is None
+    assert cache.get('key', fresh_only=False)['value'] == 'value'
+
+
+def test_cache_dir_is_next_to_the_script():
+    assert os.path.dirname(scrapper.CACHE_DIR) == os.path.dirname(os.path.abspath(scrapper.__file__))
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body if body is not None else {'ok': True}
+        self.content = json.dumps(self._body).encode('utf-8')
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code} Error', response=self)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Stub requests.get answering from a queue (responses or exceptions); records requests and sleeps."""
+    stub = SimpleNamespace(queue=[], requests=[], sleeps=[])
+
+    def get(url, headers=None, timeout=None):
+        stub.requests.append(dict(headers or {}))
+        answer = stub.queue.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(scrapper.requests, 'get', get)
+    monkeypatch.setattr(scrapper.time, 'sleep', stub.sleeps.append)
+    return stub
+
+
+def test_get_json_honors_retry_after_seconds(server):
+    server.queue = [FakeResponse(503, headers={'Retry-After': '7'}), FakeResponse(200, {'data': 1})]
+    record = RequestRecord('u')
+
+    assert scrapper.get_json('u', record=record) == {'data': 1}
+    assert server.sleeps == [7.0]
+    assert (record.status, record.retries, record.backoff, record.retry_after) == (200, 1, 7.0, '7')
+
+
+def test_get_json_honors_retry_after_http_date(server):
+    when = formatdate(time.time() + 30, usegmt=True)
+    server.queue = [FakeResponse(429, headers={'Retry-After': when}), FakeResponse(200)]
+    record = RequestRecord('u')
+
+    scrapper.get_json('u', record=record)
+    assert server.sleeps == [pytest.approx(30, abs=2)]
+    assert record.retry_after == when
+
+
+def test_get_json_backs_off_exponentially(server):
+    server.queue = [FakeResponse(500, headers={'Retry-After': 'soon'})] * 3 + [FakeResponse(502, {'error': 'down'})]
+    record = RequestRecord('u')
+
+    # After RETRIES retries the last error is raised, not returned as data
+    with pytest.raises(requests.HTTPError):
+        scrapper.get_json('u', record=record)
+    assert server.sleeps == [scrapper.BACKOFF * 2 ** i for i in range(scrapper.RETRIES)]
+    assert (record.status, record.retries, record.error) == (502, scrapper.RETRIES, 'HTTP 502')
+
+
+def test_get_json_raises_after_connection_errors(server):
+    server.queue = [requests.ConnectionError('refused')] * (scrapper.RETRIES + 1)
+    record = RequestRecord('u')
+
+    with pytest.raises(requests.ConnectionError):
+        scrapper.get_json('u', record=record)
+    assert len(server.sleeps) == scrapper.RETRIES
+    assert record.status == 'error' and 'refused' in record.error
+
+
+def test_get_json_does_not_retry_client_errors(server):
+    server.queue = [FakeResponse(404, {'error': 'not found'})]
+    record = RequestRecord('u')
+
+    with pytest.raises(requests.HTTPError):
+        scrapper.get_json('u', record=record)
+    assert server.sleeps == []
+    assert record.error == 'HTTP 404'
+
+
+def test_fetch_json_counts_http_errors(server):
+    server.queue = [FakeResponse(503)] * (scrapper.RETRIES + 1)
+    telemetry = scrapper.CrawlTelemetry('test', progress=False)
+
+    with pytest.raises(requests.HTTPError):
+        list(scrapper.fetch_json('realestate', 2, 1, telemetry=telemetry))
+    report = telemetry.report()
+    assert report['error_rate'] == 1.0
+    assert report['errors'][0].endswith(': HTTP 503')
+
+
+def test_get_json_revalidates_cached_copy(server, tmp_path):
+    cache = DiskCache(str(tmp_path), ttl=None)
+    server.queue = [FakeResponse(200, {'page': 1}, {'ETag': '"v1"'}), FakeResponse(304, {})]
+
+    assert scrapper.get_json('u', cache) == {'page': 1}
+    assert scrapper.get_json('u', cache) == {'page': 1}
+    assert server.requests == [{}, {'If-None-Match': '"v1"'}]
+
+
+@pytest.mark.parametrize('status', [404, 500])
+def test_get_json_caches_only_ok_responses(server, tmp_path, monkeypatch, status):
+    monkeypatch.setattr(scrapper, 'RETRIES', 0)
+    cache = DiskCache(str(tmp_path), ttl=None)
+    server.queue = [FakeResponse(status, {'error': 'x'}, {'ETag': '"e"'}), FakeResponse(200, {'page': 1}, {'ETag': '"v1"'})]
+
+    with pytest.raises(requests.HTTPError):
+        scrapper.get_json('u', cache)
+    assert cache.get('u') is None
+    assert scrapper.get_json('u', cache) == {'page': 1}
+    assert cache.get('u')['etag'] == '"v1"'
+
+
+def test_retry_delay():
+    assert scrapper.retry_delay('12', 0) == 12.0
+    assert scrapper.retry_delay(None, 2) == scrapper.BACKOFF * 4
+    assert scrapper.retry_delay('Wed, 21 Oct 2015 07:28:00 GMT', 0) == 0.0  # already past
+    assert scrapper.retry_delay('86400', 0) == scrapper.MAX_BACKOFF
+    assert scrapper.retry_delay(formatdate(time.time() + 86400, usegmt=True), 0) == scrapper.MAX_BACKOFF
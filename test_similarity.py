@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from metrics import add_derived_metrics
+from similarity import SimilarityIndex
+
+RETURNS = [0.02, -0.01, 0.03, 0.00, 0.04, -0.02, 0.01, 0.05, -0.03, 0.02]
+
+
+def prices(returns, start=1.0):
+    return list(start * np.cumprod([1.0] + [1 + r for r in returns]))
+
+
+@pytest.fixture
+def df(housing):
+    noise = np.random.default_rng(0).normal(0, 0.02, len(RETURNS))
+    return add_derived_metrics(housing({
+        ('Haifa', 'All'): prices(RETURNS),
+        ('Holon', 'All'): prices([2 * r for r in RETURNS], 3.0),  # same moves, amplified
+        ('Hadera', 'All'): prices(noise, 2.0),
+        ('Ashdod', 'All'): prices([-r for r in RETURNS], 1.5),  # opposite moves
+        ('Holon', '1-2'): prices(RETURNS, 0.8),
+    }))
+
+
+@pytest.mark.parametrize('method', ['correlation', 'cosine'])
+def test_top_k_is_ordered_by_similarity(df, method):
+    similar = SimilarityIndex(df, method=method).top_k('Haifa', 'All', k=3)
+
+    assert similar['Area'].tolist() == ['Holon', 'Hadera', 'Ashdod']
+    assert similar['Similarity'].is_monotonic_decreasing
+    assert similar['Similarity'].iloc[0] == pytest.approx(1.0, abs=0.05)
+    assert similar['Similarity'].iloc[-1] < 0
+
+
+def test_top_k_limits_and_room_filter(df):
+    index = SimilarityIndex(df)
+
+    assert len(index.top_k('Haifa', k=1)) == 1
+    assert len(index.top_k('Haifa', k=100)) == 3  # every other 'All' series, never itself
+    mixed = index.top_k('Haifa', k=10, same_rooms=False)
+    assert ('Holon', '1-2') in set(zip(mixed['Area'], mixed['Rooms']))
+    assert index.top_k('Nowhere').empty
+
+
+@pytest.mark.parametrize('k', [0, -2])
+def test_top_k_rejects_non_positive_k(df, k):
+    with pytest.raises(ValueError):
+        SimilarityIndex(df).top_k('Haifa', k=k)
@@ -0,0 +1,75 @@
+import pytest
+
+import housing_data
+import sql_engine
+from sql_engine import QueryEngine, QueryError
+
+pytestmark = pytest.mark.skipif(not sql_engine.available(), reason="needs duckdb")
+
+
+@pytest.fixture
+def engine(housing):
+    df = housing({
+        ('Haifa', 'All'): [1.0, 1.2],
+        ('Haifa', '1-2'): [0.6, 0.7],
+        ('Holon', 'All'): [2.0, 2.2],
+    })
+    return QueryEngine(df, threads=1, max_rows=3)
+
+
+def test_select(engine):
+    result = engine.query('SELECT Area, max("Average Price") AS top FROM housing GROUP BY Area ORDER BY Area')
+    assert result.to_dict('list') == {'Area': ['Haifa', 'Holon'], 'top': [1.2, 2.2]}
+
+
+def test_params_and_row_limit(engine):
+    assert engine.query('SELECT * FROM housing WHERE Area = ?', ['Holon'])['Area'].tolist() == ['Holon'] * 2
+    assert len(engine.query('SELECT * FROM housing')) == 3
+
+
+@pytest.mark.parametrize('sql', [
+    'DROP TABLE housing',
+    "INSERT INTO housing (Area) VALUES ('x')",
+    "COPY housing TO '/tmp/leak.csv'",
+    'SELECT 1; DROP TABLE housing',
+    'SELECT 1; SELECT 2',
+    "SET threads = 64",
+    "SET memory_limit = '64GB'",
+    'SELEC * FROM housing',
+])
+def test_rejects_anything_but_one_select(engine, sql):
+    with pytest.raises(QueryError):
+        engine.query(sql)
+    assert len(engine.query('SELECT * FROM housing')) == 3
+
+
+@pytest.mark.parametrize('sql', [
+    "SELECT * FROM read_csv('/etc/passwd')",
+    "SELECT * FROM '/etc/passwd'",
+    "SELECT * FROM read_text('/etc/hostname')",
+])
+def test_rejects_external_files(engine, sql):
+    with pytest.raises(QueryError):
+        engine.query(sql)
+
+
+def test_resource_limits(engine, housing):
+    settings = engine.query("SELECT current_setting('threads') AS threads, current_setting('memory_limit') AS memory")
+    assert settings['threads'].tolist() == [1]
+    assert settings['memory'].tolist() == ['488.2 MiB']  # DuckDB reports 512MB in MiB
+
+    small = QueryEngine(housing({('Haifa', 'All'): [1.0]}), threads=1, memory_limit='64MB')
+    assert small.query("SELECT current_setting('memory_limit') AS memory")['memory'].tolist() == ['61.0 MiB']
+
+
+def test_comment_cannot_escape_the_row_limit(engine):
+    assert len(engine.query('SELECT * FROM housing -- trailing comment')) == 3
+
+
+def test_nested_columns_are_json_ready(engine):
+    result = engine.query('SELECT Rooms, list("Average Price" ORDER BY "Average Price") AS prices, '
+                          "{'n': count(*)} AS info FROM housing GROUP BY Rooms ORDER BY Rooms")
+    assert housing_data.to_records(result) == [
+        {'Rooms': '1-2', 'prices': [0.6, 0.7], 'info': {'n': 2}},
+        {'Rooms': 'All', 'prices': [1.0, 1.2, 2.0, 2.2], 'info': {'n': 4}},
+    ]
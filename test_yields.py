@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+import yields
+from yields import YieldEngine, feed_batches
+
+
+def listings(price, rooms, count, city='חיפה'):
+    return [{'city': city, 'price': f'{price:,} ₪', 'row_4': [{'key': 'rooms', 'value': rooms}]}] * count
+
+
+@pytest.fixture
+def engine():
+    engine = YieldEngine()
+    sale = listings(1_000_000, 3, 5) + listings(2_000_000, 5, 5) + listings(1, 3, 2)  # placeholder prices
+    rent = listings(4_000, 3, 5) + listings(6_000, 5, 5) + listings(4_000, 4, 1, city='')
+    return engine.consume(feed_batches(sale, batch_size=4), 'sale').consume(feed_batches(rent, batch_size=3), 'rent')
+
+
+def test_counts_and_skips(engine):
+    assert engine.seen == {'sale': 12, 'rent': 11}
+    assert engine.skipped == {'sale': 2, 'rent': 1}
+    assert engine.buckets['sale'][('Haifa', 'All')].count == 10
+
+
+def test_report(engine, housing):
+    cbs = housing({('Haifa', '3-2.5'): [0.9, 1.2], ('Haifa', 'All'): [1.0, 1.5]})
+    report = engine.report(cbs).set_index('Rooms')
+
+    assert list(report.columns) == [c for c in yields.COLUMNS if c != 'Rooms']
+    assert report.loc['3-2.5', 'Gross Yield %'] == pytest.approx(12 * 4_000 / 1_000_000 * 100)
+    assert report.loc['5-4.5', 'Gross Yield %'] == pytest.approx(12 * 6_000 / 2_000_000 * 100)
+    assert report.loc['3-2.5', 'CBS Yield %'] == pytest.approx(12 * 4_000 / 1_200_000 * 100)
+    assert pd.isna(report.loc['5-4.5', 'CBS Price'])
+
+
+def test_min_listings(engine):
+    assert engine.report(min_listings=6)['Rooms'].tolist() == ['All']
+
+
+def test_unknown_kind(engine):
+    with pytest.raises(ValueError):
+        engine.add_batch(pd.DataFrame({'city': [], 'price': []}), 'lease')
+
+
+def test_publish_round_trip(engine, housing, tmp_path):
+    path = str(tmp_path / 'rental_yields.csv')
+    assert yields.load_published(path).empty
+    assert list(yields.load_published(path).columns) == yields.COLUMNS
+
+    report = engine.report(housing({('Haifa', 'All'): [1.0, 1.5]}))
+    yields.publish(report, path)
+    pd.testing.assert_frame_equal(yields.load_published(path), report, check_dtype=False)
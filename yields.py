@@ -0,0 +1,177 @@
+"""
+Gross rental yields from the yad2 sale and rent crawls
+
+Both crawls (category 2 = sale, category 1 = rent, see scrapper.py) are
+read in columnar batches. Listings are parsed and mapped onto the CBS
+Area x Rooms buckets with the listings.py helpers, each batch is
+hash-grouped by bucket, and every bucket keeps the constant-size running
+statistics of ``listings.BucketStats`` (count and P-square median). Only
+these are merged across batches, so memory depends on the number of
+buckets, never on the size of the crawl.
+
+The gross yield of a bucket is twelve median monthly rents over the
+median asking price; it is also given against the latest CBS transaction
+price. ``publish`` writes the table next to the CBS dataset for the
+dashboard.
+
+Usage:
+    python yields.py [realestate_sale_data.csv] [realestate_rent_data.csv]
+"""
+import os
+import sys
+from itertools import islice
+
+import pandas as pd
+
+import housing_data
+from listings import CITY_NAMES, BucketStats, listing_rooms, parse_price, rooms_bucket
+
+YIELDS_FILE = os.path.join(housing_data.BASE_DIR, 'rental_yields.csv')
+KINDS = ('sale', 'rent')
+BATCH_SIZE = 50_000
+MIN_LISTINGS = 5
+COLUMNS = ['Area', 'Rooms', 'Sale Listings', 'Rent Listings', 'Median Asking', 'Median Rent',
+           'Gross Yield %', 'CBS Price', 'CBS Quarter', 'CBS Yield %']
+
+# Plausible asking prices in NIS; outside them are placeholders ('1 ₪') or ads in the wrong category
+PRICE_RANGES = {'sale': (100_000, 100_000_000), 'rent': (500, 100_000)}
+
+# Listing fields a batch needs (rooms may only be in the row_4 list)
+FIELDS = ['city', 'price', 'rooms', 'Rooms_text', 'row_4']
+
+
+def read_batches(path, batch_size=BATCH_SIZE):
+    """Columnar batches of a crawl written by ``scrapper.to_csv`` (all columns as strings)."""
+    reader = pd.read_csv(path, sep='\t', encoding='utf-16', dtype=str,
+                         usecols=lambda column: column in FIELDS, chunksize=batch_size)
+    with reader:
+        yield from reader
+
+
+def feed_batches(listings, batch_size=BATCH_SIZE):
+    """Columnar batches of listings as they come from ``scrapper.fetch_json``."""
+    listings = iter(listings)
+    while True:
+        chunk = list(islice(listings, batch_size))
+        if not chunk:
+            return
+        yield pd.DataFrame({field: [item.get(field) for item in chunk] for field in FIELDS})
+
+
+class YieldEngine:
+    """Sale and rent asking prices per CBS (Area, Rooms) bucket, merged batch by batch.
+
+    Every listing also feeds the city's ``'All'`` bucket, matching the CBS
+    all-rooms series.
+    """
+
+    def __init__(self, city_names=None):
+        self.city_names = dict(CITY_NAMES if city_names is None else city_names)
+        self.buckets = {kind: {} for kind in KINDS}
+        self.seen = dict.fromkeys(KINDS, 0)
+        self.skipped = dict.fromkeys(KINDS, 0)
+
+    def add_batch(self, batch, kind):
+        """Aggregate one columnar batch of ``kind`` ('sale' or 'rent') listings."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown listing kind '{kind}', expected one of {KINDS}")
+        # Missing CSV cells are NaN; the listings helpers expect None
+        batch = batch.astype(object).where(batch.notna(), None)
+        city = batch['city'].map(lambda value: str(value or '').strip())
+        area = city.map(lambda name: self.city_names.get(name, name))
+        price = batch['price'].map(parse_price).astype(float)
+        low, high = PRICE_RANGES[kind]
+        valid = (area != '') & price.between(low, high)
+
+        self.seen[kind] += len(batch)
+        self.skipped[kind] += int((~valid).sum())
+        if not valid.any():
+            return self
+
+        listings = batch.loc[valid, batch.columns.intersection(FIELDS)].to_dict('records')
+        rows = pd.DataFrame({
+            'Area': area[valid].to_numpy(),
+            'Rooms': [rooms_bucket(listing_rooms(item)) for item in listings],
+            'Price': price[valid].to_numpy(),
+        })
+        rows = pd.concat([rows.assign(Rooms='All'), rows.dropna(subset=['Rooms'])], ignore_index=True)
+
+        buckets = self.buckets[kind]
+        for key, prices in rows.groupby(['Area', 'Rooms'], sort=False)['Price']:
+            stats = buckets.setdefault(key, BucketStats())
+            for value in prices:
+                stats.add(value)
+        return self
+
+    def consume(self, batches, kind):
+        """Aggregate an iterable of batches (``read_batches`` / ``feed_batches``); returns self."""
+        for batch in batches:
+            self.add_batch(batch, kind)
+        return self
+
+    def report(self, cbs_df=None, min_listings=MIN_LISTINGS):
+        """Gross yield per (Area, Rooms) bucket with at least ``min_listings`` of each kind.
+
+        With ``cbs_df`` (the unpivoted CBS dataset), the yield is also given
+        against its latest quarter's transaction price (NIS millions).
+        """
+        keys = sorted(set(self.buckets['sale']) & set(self.buckets['rent']))
+        sale = [self.buckets['sale'][k] for k in keys]
+        rent = [self.buckets['rent'][k] for k in keys]
+        result = pd.DataFrame({
+            'Area': [k[0] for k in keys],
+            'Rooms': [k[1] for k in keys],
+            'Sale Listings': [s.count for s in sale],
+            'Rent Listings': [r.count for r in rent],
+            'Median Asking': [s.median.value() for s in sale],
+            'Median Rent': [r.median.value() for r in rent],
+        })
+        result = result[(result['Sale Listings'] >= min_listings) & (result['Rent Listings'] >= min_listings)]
+        result['Gross Yield %'] = 12 * result['Median Rent'] / result['Median Asking'] * 100
+
+        if cbs_df is not None:
+            latest = cbs_df[cbs_df['Quarter_ts'] == cbs_df['Quarter_ts'].max()]
+            cbs = pd.DataFrame({
+                '_key': latest['Area'].astype(str).str.lower(),
+                'Rooms': latest['Rooms'].astype(str),
+                'CBS Price': latest['Average Price'].astype(float) * 1_000_000,
+                'CBS Quarter': latest['Quarter_ts'],
+            })
+            # Match area names case-insensitively (yad2 and CBS spellings differ)
+            result = result.assign(_key=result['Area'].str.lower()).merge(
+                cbs, on=['_key', 'Rooms'], how='left').drop(columns='_key')
+            result['CBS Yield %'] = 12 * result['Median Rent'] / result['CBS Price'] * 100
+        return result.sort_values(['Area', 'Rooms']).reset_index(drop=True)
+
+
+def publish(report, path=YIELDS_FILE):
+    """Write the yield table for the dashboard (atomically, it may be reading the previous one)."""
+    tmp = path + '.tmp'
+    report.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def load_published(path=YIELDS_FILE):
+    """The published yield table; empty (same columns) when no crawl has been processed yet."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=COLUMNS)
+    report = pd.read_csv(path)
+    if 'CBS Quarter' in report.columns:
+        report['CBS Quarter'] = pd.to_datetime(report['CBS Quarter'])
+    return report
+
+
+if __name__ == '__main__':
+    sale_file = sys.argv[1] if len(sys.argv) > 1 else 'realestate_sale_data.csv'
+    rent_file = sys.argv[2] if len(sys.argv) > 2 else 'realestate_rent_data.csv'
+
+    engine = YieldEngine()
+    engine.consume(read_batches(sale_file), 'sale').consume(read_batches(rent_file), 'rent')
+    for kind in KINDS:
+        print(f"✅ {kind}: aggregated {engine.seen[kind] - engine.skipped[kind]} listings "
+              f"({engine.skipped[kind]} skipped) into {len(engine.buckets[kind])} buckets")
+
+    report = engine.report(housing_data.load_data())
+    publish(report)
+    print(report.to_string(index=False))
+    print(f"✅ Published {len(report)} buckets to {YIELDS_FILE}")